@@ -0,0 +1,5 @@
+"""Benchmarks for the flight manager model layer.
+
+Run ``python -m benchmarks --scale 100k`` from the repository root (with the
+package installed) to seed a synthetic database and time the model methods.
+"""
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generators import SCALES, seed_database
+from benchmarks.model import run_suite
+from flight_manager.models.db import get_connection
+from flight_manager.models.migrations import migrate
+
+
+def compare(current: dict, previous: dict) -> None:
+    print(f"\n{'benchmark':<28}{'previous':>12}{'current':>12}{'change':>9}")
+    for name, result in current["results"].items():
+        before = previous["results"].get(name)
+        if not before:
+            continue
+        ratio = result["best_s"] / before["best_s"] if before["best_s"] else 0
+        print(
+            f"{name:<28}{before['best_s']:>11.4f}s{result['best_s']:>11.4f}s"
+            f"{(ratio - 1) * 100:>+8.1f}%"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Time the flight manager models."
+    )
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        help="directory for the benchmark database, reused if already seeded",
+    )
+    parser.add_argument("--output", type=Path, help="where to write the JSON results")
+    parser.add_argument("--compare", type=Path, help="previous results to compare to")
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="flight-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    output = (args.output or Path("benchmarks") / "results").resolve()
+    if output.suffix != ".json":
+        output = output / f"{time.strftime('%Y%m%d-%H%M%S')}-{args.scale}.json"
+
+    # view_flights opens the default database, so run from the work directory.
+    os.chdir(workdir)
+    db_path = "airline.db"
+    with get_connection(db_path) as conn:
+        migrate(conn)
+        if conn.execute("SELECT COUNT(*) FROM flights").fetchone()[0] == 0:
+            print(f"Seeding {args.scale} flights in {workdir} ...", file=sys.stderr)
+            seed_database(conn, SCALES[args.scale], seed=args.seed)
+        flights = conn.execute("SELECT COUNT(*) FROM flights").fetchone()[0]
+
+    results = {
+        "scale": args.scale,
+        "flights": flights,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "results": run_suite(db_path, args.repeat, args.seed),
+    }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+
+    print(f"{'benchmark':<28}{'ops':>8}{'best':>12}{'per op':>14}")
+    for name, result in results["results"].items():
+        per_op = f"{result['us_per_op']:.1f}us" if result["us_per_op"] else "-"
+        print(f"{name:<28}{result['ops']:>8}{result['best_s']:>11.4f}s{per_op:>14}")
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+"""Compare concurrent read/write throughput between storage profiles.
+
+Runs reader processes that stream full flight listings alongside writer
+processes that update flight statuses, first with SQLite's legacy rollback
+journal and then with the default WAL profile, and prints operations per
+second and lock errors for each.
+
+    python -m benchmarks.concurrency --flights 20000 --readers 4 --writers 2
+"""
+
+import argparse
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generators import seed_database
+from flight_manager.models.db import (
+    DEFAULT_PROFILE,
+    LEGACY_PROFILE,
+    StorageProfile,
+    get_connection,
+    set_default_profile,
+)
+from flight_manager.models.flight import STATUS_TRANSITIONS, Flight
+from flight_manager.models.migrations import migrate
+
+
+def reader(db_path: str, profile: StorageProfile, deadline: float, results) -> None:
+    set_default_profile(profile)
+    ops = errors = 0
+    while time.time() < deadline:
+        try:
+            with get_connection(db_path) as conn:
+                for _ in Flight.iter_all(conn):
+                    pass
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put(("read", ops, errors))
+
+
+def writer(
+    db_path: str, profile: StorageProfile, deadline: float, flights: int, results
+) -> None:
+    set_default_profile(profile)
+    ops = errors = 0
+    while time.time() < deadline:
+        try:
+            with get_connection(db_path) as conn:
+                flight = Flight.get_by_id(conn, random.randint(1, flights))
+                statuses = STATUS_TRANSITIONS[flight.status] or (flight.status,)
+                flight.update_status(conn, random.choice(statuses))
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put(("write", ops, errors))
+
+
+def run(profile: StorageProfile, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        set_default_profile(profile)
+        with get_connection(db_path) as conn:
+            migrate(conn)
+            seed_database(conn, args.flights, seed=args.seed)
+
+        results = multiprocessing.Queue()
+        deadline = time.time() + args.seconds
+        workers = [
+            multiprocessing.Process(
+                target=reader, args=(db_path, profile, deadline, results)
+            )
+            for _ in range(args.readers)
+        ] + [
+            multiprocessing.Process(
+                target=writer, args=(db_path, profile, deadline, args.flights, results)
+            )
+            for _ in range(args.writers)
+        ]
+        for worker in workers:
+            worker.start()
+        totals = {"read": [0, 0], "write": [0, 0]}
+        for _ in workers:
+            kind, ops, errors = results.get()
+            totals[kind][0] += ops
+            totals[kind][1] += errors
+        for worker in workers:
+            worker.join()
+
+    return {
+        kind: {"ops_per_sec": ops / args.seconds, "lock_errors": errors}
+        for kind, (ops, errors) in totals.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flights", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, profile in (("legacy", LEGACY_PROFILE), ("wal", DEFAULT_PROFILE)):
+        result = run(profile, args)
+        print(
+            f"{name:>6}: "
+            f"reads {result['read']['ops_per_sec']:8.2f}/s "
+            f"({result['read']['lock_errors']} lock errors), "
+            f"writes {result['write']['ops_per_sec']:8.2f}/s "
+            f"({result['write']['lock_errors']} lock errors)"
+        )
+
+
+if __name__ == "__main__":
+    main()
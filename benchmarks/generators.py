@@ -0,0 +1,147 @@
+"""Seeded generators for synthetic airports, pilots and flights.
+
+Records use the same keys as ``manage-flight import``, so the same generators
+can write fixture files or feed the bulk importer directly. The same seed
+always produces the same data.
+"""
+
+import bisect
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from flight_manager.models import bulk
+from flight_manager.models.airports import AirportStatus
+from flight_manager.models.flight import FlightStatus
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+COMPANIES = [
+    "British Airways",
+    "Cathay Pacific",
+    "Delta",
+    "Emirates",
+    "Lufthansa",
+    "Qantas",
+    "Singapore Airlines",
+    "United",
+]
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie"]
+LAST_NAMES = ["Smith", "Leung", "Garcia", "Okafor", "Nguyen", "Müller", "Rossi", "Kim"]
+
+START = datetime(2025, 1, 1)
+
+Record = Dict[str, str]
+
+# How many pilots a flight is offered to before it is left unassigned.
+PILOT_ATTEMPTS = 5
+
+
+def airport_codes(count: int) -> List[str]:
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [
+        letters[i // 676 % 26] + letters[i // 26 % 26] + letters[i % 26]
+        for i in range(count)
+    ]
+
+
+def airports(count: int, seed: int = 0) -> Iterator[Record]:
+    rng = random.Random(seed)
+    statuses = [status.value for status in AirportStatus]
+    for code in airport_codes(count):
+        yield {
+            "code": code,
+            "name": f"{code} International Airport",
+            "address": f"{rng.randint(1, 999)} Runway Road",
+            "status": rng.choices(statuses, weights=[90, 8, 2])[0],
+        }
+
+
+def pilots(count: int, seed: int = 0) -> Iterator[Record]:
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "pilot_id": f"P{i:05d}",
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+        }
+
+
+def flights(
+    count: int,
+    codes: List[str],
+    pilot_ids: List[str],
+    seed: int = 0,
+    days: int = 365,
+    unassigned: float = 0.2,
+) -> Iterator[Record]:
+    """Yield flights spread over ``days`` with a skew towards the first hubs.
+
+    A flight is only given a pilot who is free for all of it, so the
+    importer's overlap check accepts every generated flight.
+    """
+    rng = random.Random(seed)
+    statuses = [status.value for status in FlightStatus]
+    weights = [1 / (rank + 1) for rank in range(len(codes))]
+    span = days * 24 * 60
+    # Each pilot's flights as sorted, non-overlapping (departure, arrival).
+    schedules: Dict[str, List[Tuple[datetime, datetime]]] = {}
+
+    def assign(departure: datetime, arrival: datetime) -> str:
+        if rng.random() < unassigned:
+            return ""
+        for _ in range(PILOT_ATTEMPTS):
+            pilot_id = rng.choice(pilot_ids)
+            schedule = schedules.setdefault(pilot_id, [])
+            index = bisect.bisect_left(schedule, (departure, arrival))
+            if (index == 0 or schedule[index - 1][1] <= departure) and (
+                index == len(schedule) or arrival <= schedule[index][0]
+            ):
+                schedule.insert(index, (departure, arrival))
+                return pilot_id
+        return ""
+
+    for i in range(count):
+        prefix = rng.choice("ABCDEFGHJK") + rng.choice("ABCDEFGHJK")
+        origin, destination = rng.choices(codes, weights=weights, k=2)
+        if origin == destination:
+            destination = codes[(codes.index(origin) + 1) % len(codes)]
+        departure = START + timedelta(minutes=rng.randrange(span))
+        arrival = departure + timedelta(minutes=rng.randint(45, 16 * 60))
+        yield {
+            "flight_number": f"{prefix}{i % 10000:04d}",
+            "origin_airport_code": origin,
+            "destination_airport_code": destination,
+            "scheduled_departure_time": departure.isoformat(),
+            "estimated_arrival_time": arrival.isoformat(),
+            "status": rng.choice(statuses),
+            "pilot_id": assign(departure, arrival),
+            "company": rng.choice(COMPANIES),
+        }
+
+
+def seed_database(
+    conn: sqlite3.Connection,
+    flight_count: int,
+    airport_count: Optional[int] = None,
+    pilot_count: Optional[int] = None,
+    seed: int = 0,
+) -> None:
+    """Fill an empty, migrated database through the bulk importer"""
+    airport_count = airport_count or min(500, max(50, flight_count // 1000))
+    pilot_count = pilot_count or max(20, flight_count // 100)
+
+    bulk.import_airports(conn, airports(airport_count, seed))
+    bulk.import_pilots(conn, pilots(pilot_count, seed))
+    bulk.import_flights(
+        conn,
+        flights(
+            flight_count,
+            airport_codes(airport_count),
+            [pilot["pilot_id"] for pilot in pilots(pilot_count, seed)],
+            seed,
+        ),
+        chunk_size=20_000,
+    )
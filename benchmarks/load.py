@@ -0,0 +1,272 @@
+"""Load test the HTTP API with many concurrent keep-alive clients.
+
+Seeds a temporary database and starts ``flight_manager.server`` on it, unless
+``--url`` points at a running server, then runs a mix of lookups, listings
+and status updates from asyncio clients and prints throughput and latency
+percentiles. Clients send back to back unless ``--rate`` spreads the given
+requests per second over them. Exits with status 1 if ``--max-p99-ms`` is
+given and exceeded.
+
+    python -m benchmarks.load --clients 50 --rate 500 --max-p99-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.generators import seed_database
+from flight_manager.models.db import get_connection
+from flight_manager.models.flight import FlightStatus
+from flight_manager.models.migrations import migrate
+
+# Flights can move back and forth between these, so concurrent updates never
+# make an invalid status transition.
+WRITE_STATUSES = (FlightStatus.BOARDING.value, FlightStatus.DELAYED.value)
+
+# (name, weight); "update_flight" is replaced by --write-ratio.
+MIX = [
+    ("get_flight", 40),
+    ("list_flights", 20),
+    ("get_airport", 20),
+    ("get_pilot", 20),
+]
+
+
+class Client:
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def send(self, method: str, path: str, body: Optional[dict] = None) -> None:
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+        if payload:
+            head += "Content-Type: application/json\r\n"
+            head += f"Content-Length: {len(payload)}\r\n"
+        self.writer.write(head.encode() + b"\r\n" + payload)
+
+    async def receive(self) -> Tuple[int, bytes]:
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ")[1])
+        length = 0
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, await self.reader.readexactly(length)
+
+    async def request(
+        self, method: str, path: str, body: Optional[dict] = None
+    ) -> Tuple[int, bytes]:
+        self.send(method, path, body)
+        return await self.receive()
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def sample_ids(host: str, port: int) -> Dict[str, List[str]]:
+    client = Client(host, port)
+    await client.connect()
+    try:
+        _, body = await client.request("GET", "/airports")
+        airports = [airport["code"] for airport in json.loads(body)]
+        _, body = await client.request("GET", "/pilots")
+        pilots = [pilot["pilot_id"] for pilot in json.loads(body)]
+        _, body = await client.request("GET", "/flights?limit=1000")
+        flights = json.loads(body)["flights"]
+    finally:
+        client.close()
+    return {
+        "airports": airports,
+        "pilots": pilots,
+        "flights": [str(flight["flight_id"]) for flight in flights],
+        "updatable": [
+            str(flight["flight_id"])
+            for flight in flights
+            if flight["status"] in WRITE_STATUSES
+        ],
+    }
+
+
+def next_request(
+    rng: random.Random, ids: Dict[str, List[str]], write_ratio: float
+) -> Tuple[str, str, str, Optional[dict]]:
+    if rng.random() < write_ratio:
+        status = rng.choice(WRITE_STATUSES)
+        path = f"/flights/{rng.choice(ids['updatable'])}"
+        return "update_flight", "PATCH", path, {"status": status}
+    name = rng.choices([name for name, _ in MIX], [weight for _, weight in MIX])[0]
+    if name == "get_flight":
+        path = f"/flights/{rng.choice(ids['flights'])}"
+    elif name == "list_flights":
+        path = f"/flights?origin={rng.choice(ids['airports'])}&limit=20"
+    elif name == "get_airport":
+        path = f"/airports/{rng.choice(ids['airports'])}"
+    else:
+        path = f"/pilots/{rng.choice(ids['pilots'])}"
+    return name, "GET", path, None
+
+
+async def run_client(
+    host: str,
+    port: int,
+    ids: Dict[str, List[str]],
+    args: argparse.Namespace,
+    deadline: float,
+    seed: int,
+    latencies: Dict[str, List[float]],
+    errors: Dict[int, int],
+) -> None:
+    rng = random.Random(seed)
+    client = Client(host, port)
+    await client.connect()
+    try:
+        while time.perf_counter() < deadline:
+            if args.rate:
+                # Users pause between requests; together the clients send
+                # about --rate requests per second.
+                await asyncio.sleep(rng.expovariate(args.rate / args.clients))
+            batch = [
+                next_request(rng, ids, args.write_ratio) for _ in range(args.pipeline)
+            ]
+            started = time.perf_counter()
+            for _, method, path, body in batch:
+                client.send(method, path, body)
+            await client.writer.drain()
+            for name, *_ in batch:
+                status, _ = await client.receive()
+                latencies[name].append(time.perf_counter() - started)
+                if status >= 400:
+                    errors[status] += 1
+    finally:
+        client.close()
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+
+
+async def load(host: str, port: int, args: argparse.Namespace) -> float:
+    ids = await sample_ids(host, port)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[int, int] = defaultdict(int)
+
+    started = time.perf_counter()
+    deadline = started + args.seconds
+    await asyncio.gather(
+        *(
+            run_client(
+                host, port, ids, args, deadline, args.seed + i, latencies, errors
+            )
+            for i in range(args.clients)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    everything = [value for values in latencies.values() for value in values]
+    if not everything:
+        raise RuntimeError("no requests completed")
+    print(
+        f"{len(everything)} requests from {args.clients} clients in {elapsed:.1f}s "
+        f"({len(everything) / elapsed:,.0f}/s), pipeline depth {args.pipeline}, "
+        f"{sum(errors.values())} errors"
+    )
+    print(f"\n{'request':<16}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, values in sorted(latencies.items()) + [("all", everything)]:
+        print(
+            f"{name:<16}{len(values):>8}"
+            + "".join(
+                f"{percentile(values, q) * 1000:>8.2f}ms" for q in (50, 95, 99, 100)
+            )
+        )
+    for status, count in sorted(errors.items()):
+        print(f"HTTP {status}: {count}", file=sys.stderr)
+    return percentile(everything, 99) * 1000
+
+
+def start_server(db_path: str, workers: int) -> Tuple[subprocess.Popen, str]:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "flight_manager.server",
+            "--db",
+            db_path,
+            "--port",
+            "0",
+            "--workers",
+            str(workers),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = server.stdout.readline()
+    if not line.startswith("Serving on "):
+        server.kill()
+        raise RuntimeError("the server did not start")
+    return server, line.split()[-1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="running server to test (default: start one)")
+    parser.add_argument("--flights", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument(
+        "--pipeline", type=int, default=1, help="requests sent per round trip"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="total requests per second (default: as fast as the server answers)",
+    )
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p99-ms", type=float)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        url = args.url
+        if url is None:
+            db_path = str(Path(tmp) / "load.db")
+            with get_connection(db_path) as conn:
+                migrate(conn)
+                seed_database(conn, args.flights, seed=args.seed)
+            server, url = start_server(db_path, args.workers)
+        try:
+            address = urlsplit(url)
+            p99 = asyncio.run(load(address.hostname, address.port, args))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    if args.max_p99_ms is not None and p99 > args.max_p99_ms:
+        print(f"p99 {p99:.2f}ms is over {args.max_p99_ms}ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
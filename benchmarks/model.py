@@ -0,0 +1,144 @@
+"""Timings for the model methods and the view_flights filter path."""
+
+import contextlib
+import os
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from unittest import mock
+
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.db import get_connection
+from flight_manager.models.flight import STATUS_TRANSITIONS, Flight, FlightStatus
+from flight_manager.models.pilot import Pilot
+from flight_manager.views.flight_menus import LISTING_COLUMNS, view_flights
+
+Result = Dict[str, Any]
+
+SAMPLE = 1000
+
+
+def measure(fn: Callable[[], int], repeat: int) -> Result:
+    """Run ``fn`` ``repeat`` times; ``fn`` returns how many operations it did"""
+    times: List[float] = []
+    ops = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        ops = fn()
+        times.append(time.perf_counter() - started)
+
+    best = min(times)
+    return {
+        "ops": ops,
+        "best_s": best,
+        "median_s": statistics.median(times),
+        "us_per_op": best / ops * 1e6 if ops else None,
+    }
+
+
+def measure_timed(fn: Callable[[], tuple], repeat: int) -> Result:
+    """Like measure, for functions that time their own section"""
+    runs = [fn() for _ in range(repeat)]
+    ops = runs[-1][0]
+    times = [elapsed for _, elapsed in runs]
+    best = min(times)
+    return {
+        "ops": ops,
+        "best_s": best,
+        "median_s": statistics.median(times),
+        "us_per_op": best / ops * 1e6 if ops else None,
+    }
+
+
+def run_suite(db_path: str, repeat: int = 3, seed: int = 0) -> Dict[str, Result]:
+    rng = random.Random(seed)
+
+    with get_connection(db_path) as conn:
+        max_id = conn.execute("SELECT MAX(flight_id) FROM flights").fetchone()[0]
+        hub = Airport.get_by_code(conn, "AAA")
+        pilot = Pilot.get_all(conn)[0]
+    flight_ids = [rng.randint(1, max_id) for _ in range(SAMPLE)]
+
+    def get_all() -> int:
+        with get_connection(db_path) as conn:
+            return len(Flight.get_all(conn))
+
+    def iter_all() -> int:
+        with get_connection(db_path) as conn:
+            return sum(1 for _ in Flight.iter_all(conn))
+
+    def iter_all_projected() -> int:
+        with get_connection(db_path) as conn:
+            return sum(1 for _ in Flight.iter_all(conn, columns=LISTING_COLUMNS))
+
+    def get_all_filtered(**filters: Any) -> Callable[[], int]:
+        def run() -> int:
+            with get_connection(db_path) as conn:
+                return len(Flight.get_all(conn, **filters))
+
+        return run
+
+    def get_by_id() -> int:
+        with get_connection(db_path) as conn:
+            for flight_id in flight_ids:
+                Flight.get_by_id(conn, flight_id)
+        return len(flight_ids)
+
+    def save() -> Tuple[int, float]:
+        with get_connection(db_path) as conn:
+            flights = [Flight.get_by_id(conn, flight_id) for flight_id in flight_ids]
+            started = time.perf_counter()
+            for flight in flights:
+                # One step along the status graph; arrived flights stay put.
+                following = STATUS_TRANSITIONS[flight.status]
+                flight.status = following[0] if following else flight.status
+                flight.company = flight.company + " "
+                flight.save(conn)
+            conn.rollback()
+        # Only the saves count, not loading the flights.
+        return len(flights), time.perf_counter() - started
+
+    def airport_create() -> int:
+        with get_connection(db_path) as conn:
+            for i in range(SAMPLE):
+                Airport.create(
+                    conn, f"Z{i:04d}", "Bench", "Bench", AirportStatus.ALL_CLEAR
+                )
+            conn.rollback()
+        return SAMPLE
+
+    def pilot_create() -> int:
+        with get_connection(db_path) as conn:
+            for _ in range(SAMPLE):
+                Pilot.create(conn, "Bench", "Pilot")
+            conn.rollback()
+        return SAMPLE
+
+    def view_filtered() -> int:
+        filters = f"status=delayed,origin={hub.code}"
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            with mock.patch("builtins.input", return_value=filters):
+                view_flights()
+        return 1
+
+    return {
+        "flight_get_all": measure(get_all, repeat),
+        "flight_iter_all": measure(iter_all, repeat),
+        "flight_iter_all_projected": measure(iter_all_projected, repeat),
+        "flight_get_all_by_status": measure(
+            get_all_filtered(status=FlightStatus.DELAYED), repeat
+        ),
+        "flight_get_all_by_origin": measure(
+            get_all_filtered(origin_airport=hub), repeat
+        ),
+        "flight_get_all_by_pilot": measure(get_all_filtered(pilot=pilot), repeat),
+        "flight_get_all_by_company": measure(
+            get_all_filtered(company="Delta"), repeat
+        ),
+        "flight_get_by_id": measure(get_by_id, repeat),
+        "flight_save": measure_timed(save, repeat),
+        "airport_create": measure(airport_create, repeat),
+        "pilot_create": measure(pilot_create, repeat),
+        "view_flights_filtered": measure(view_filtered, repeat),
+    }
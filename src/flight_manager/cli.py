@@ -0,0 +1,1090 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from flight_manager.models import analytics, bulk
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.changes import (
+    FlightChange,
+    follow_changes,
+    prune_changes,
+    read_changes,
+)
+from flight_manager.models.closures import ClosureImpact
+from flight_manager.models.db import DEFAULT_DB_PATH, get_connection
+from flight_manager.models.flight import Flight, FlightRow, FlightStatus
+from flight_manager.models.migrations import migrate
+from flight_manager.models.pilot import Pilot
+from flight_manager.models.references import (
+    DEFAULT_SAMPLE_SIZE,
+    DeleteMode,
+    FlightReferences,
+)
+from flight_manager.models.roster import apply_roster, plan_roster
+from flight_manager.models.routes import DEFAULT_MAX_HOPS, Leg, RouteGraph
+from flight_manager.models.scheduling import Conflict, find_all_conflicts
+from flight_manager.models.stats import (
+    AirportDayStats,
+    CompanyStats,
+    get_airport_stats,
+    get_company_stats,
+)
+from flight_manager.models.transitions import default_rules, sweep
+
+IMPORTERS = {
+    "airports": bulk.import_airports,
+    "pilots": bulk.import_pilots,
+    "flights": bulk.import_flights,
+}
+
+FORMATS = ("csv", "json", "ndjson")
+OUTPUT_FORMATS = ("ndjson", "json")
+
+Record = Dict[str, Any]
+
+
+class CommandError(Exception):
+    pass
+
+
+def read_records(path: Path, fmt: Optional[str] = None) -> Iterator[Record]:
+    """Stream records from a CSV, JSON array or newline-delimited JSON file"""
+    fmt = fmt or {".jsonl": "ndjson", ".ndjson": "ndjson", ".json": "json"}.get(
+        path.suffix.lower(), "csv"
+    )
+
+    with path.open(newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        elif fmt == "ndjson":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def write_records(records: Iterable[Record], fmt: str = "ndjson") -> None:
+    """Write records to stdout as they arrive, without collecting them first"""
+    out = sys.stdout
+    if fmt == "ndjson":
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+        return
+
+    out.write("[")
+    for i, record in enumerate(records):
+        out.write((",\n" if i else "\n") + json.dumps(record))
+    out.write("\n]\n")
+
+
+def airport_record(airport: Airport) -> Record:
+    return {
+        "code": airport.code,
+        "name": airport.name,
+        "address": airport.address,
+        "status": airport.status.value,
+    }
+
+
+def impact_record(impact: ClosureImpact) -> Record:
+    return {
+        "airport_code": impact.airport_code,
+        "flights": impact.flights,
+        "delayed": impact.delayed,
+        "companies": impact.companies,
+        "pilots": impact.pilots,
+    }
+
+
+def references_record(references: FlightReferences) -> Record:
+    return {"count": references.count, "flight_ids": references.flight_ids}
+
+
+def pilot_record(pilot: Pilot) -> Record:
+    return {
+        "pilot_id": pilot.pilot_id,
+        "first_name": pilot.first_name,
+        "last_name": pilot.last_name,
+    }
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def flight_record(flight: Flight) -> Record:
+    """Flatten a flight into its columns, the same shape import accepts"""
+    return {
+        "flight_id": flight.flight_id,
+        "flight_number": flight.flight_number,
+        "origin_airport_code": flight.origin_airport.code,
+        "destination_airport_code": flight.destination_airport.code,
+        "scheduled_departure_time": _isoformat(flight.scheduled_departure_time),
+        "estimated_arrival_time": _isoformat(flight.estimated_arrival_time),
+        "departure_time": _isoformat(flight.departure_time),
+        "arrival_time": _isoformat(flight.arrival_time),
+        "status": flight.status.value,
+        "pilot_id": flight.pilot.pilot_id if flight.pilot else None,
+        "company": flight.company,
+    }
+
+
+FLIGHT_COLUMNS = (
+    "flight_id",
+    "flight_number",
+    "origin_airport_code",
+    "destination_airport_code",
+    "scheduled_departure_time",
+    "estimated_arrival_time",
+    "departure_time",
+    "arrival_time",
+    "status",
+    "pilot_id",
+    "company",
+)
+
+
+def flight_row_record(row: FlightRow) -> Record:
+    """Same record as flight_record, built from a FLIGHT_COLUMNS projection"""
+    record = row.as_dict()
+    for name in (
+        "scheduled_departure_time",
+        "estimated_arrival_time",
+        "departure_time",
+        "arrival_time",
+    ):
+        record[name] = _isoformat(record[name])
+    record["status"] = record["status"].value
+    return record
+
+
+def change_record(change: FlightChange) -> Record:
+    return {
+        "seq": change.seq,
+        "changed_at": _isoformat(change.changed_at),
+        "operation": change.operation.value,
+        "flight_id": change.flight_id,
+        "flight_number": change.flight_number,
+        "origin_airport_code": change.origin_airport_code,
+        "destination_airport_code": change.destination_airport_code,
+        "scheduled_departure_time": _isoformat(change.scheduled_departure_time),
+        "estimated_arrival_time": _isoformat(change.estimated_arrival_time),
+        "departure_time": _isoformat(change.departure_time),
+        "arrival_time": _isoformat(change.arrival_time),
+        "status": change.status.value,
+        "pilot_id": change.pilot_id,
+        "company": change.company,
+    }
+
+
+def conflict_record(conflict: Conflict) -> Record:
+    return {
+        "pilot_id": conflict.pilot_id,
+        "flight_id": conflict.flight_id,
+        "other_flight_id": conflict.other_flight_id,
+        "overlap_start": _isoformat(conflict.overlap_start),
+        "overlap_end": _isoformat(conflict.overlap_end),
+    }
+
+
+def leg_record(leg: Leg) -> Record:
+    return {
+        "flight_id": leg.flight_id,
+        "flight_number": leg.flight_number,
+        "origin_airport_code": leg.origin,
+        "destination_airport_code": leg.destination,
+        "scheduled_departure_time": _isoformat(leg.departure),
+        "estimated_arrival_time": _isoformat(leg.arrival),
+    }
+
+
+def _rate(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 4)
+
+
+def company_stats_record(stats: CompanyStats) -> Record:
+    delay = stats.average_departure_delay
+    return {
+        "company": stats.company,
+        "flights": stats.flights,
+        "departed": stats.departed,
+        "delayed_departures": stats.delayed_departures,
+        "on_time_departure_rate": _rate(stats.on_time_departure_rate),
+        "average_departure_delay_minutes": (
+            None if delay is None else round(delay.total_seconds() / 60, 1)
+        ),
+        "arrived": stats.arrived,
+        "delayed_arrivals": stats.delayed_arrivals,
+        "on_time_arrival_rate": _rate(stats.on_time_arrival_rate),
+    }
+
+
+def airport_stats_record(stats: AirportDayStats) -> Record:
+    return {
+        "airport_code": stats.airport_code,
+        "day": stats.day.isoformat(),
+        "departures": {status.value: n for status, n in stats.departures.items()},
+        "arrivals": {status.value: n for status, n in stats.arrivals.items()},
+    }
+
+
+def _minutes(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+def delay_summary_record(summary: analytics.DelaySummary) -> Record:
+    record = {
+        "key": summary.key,
+        "flights": summary.flights,
+        "observed": summary.observed,
+        "on_time_rate": _rate(summary.on_time_rate),
+        "mean_delay_minutes": _minutes(summary.mean_delay),
+    }
+    for percentile, minutes in summary.percentiles.items():
+        record[f"p{percentile:g}_minutes"] = _minutes(minutes)
+    return record
+
+
+def rolling_delay_records(rolling: analytics.RollingDelay) -> Iterator[Record]:
+    for row, key in enumerate(rolling.keys):
+        for column, day in enumerate(rolling.days):
+            flights = int(rolling.flights[row, column])
+            if flights:
+                yield {
+                    "key": key,
+                    "day": day.isoformat(),
+                    "flights": flights,
+                    "mean_delay_minutes": _minutes(
+                        float(rolling.mean_delay[row, column])
+                    ),
+                    "on_time_rate": _rate(float(rolling.on_time_rate[row, column])),
+                }
+
+
+def _date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid date {value!r}, expected YYYY-MM-DD"
+        )
+
+
+def _datetime(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid datetime {value!r}, expected YYYY-MM-DD HH:MM"
+        )
+
+
+def _optional_datetime(value: str) -> Optional[datetime]:
+    return None if value.lower() == "none" else _datetime(value)
+
+
+def _airport(conn: sqlite3.Connection, code: str) -> Airport:
+    airport = Airport.get_by_code(conn, code.upper())
+    if airport is None:
+        raise CommandError(f"no airport found with code {code}")
+    return airport
+
+
+def _pilot(conn: sqlite3.Connection, pilot_id: str) -> Pilot:
+    pilot = Pilot.get_by_id(conn, pilot_id.upper())
+    if pilot is None:
+        raise CommandError(f"no pilot found with ID {pilot_id}")
+    return pilot
+
+
+def _flight(conn: sqlite3.Connection, flight_id: int) -> Flight:
+    flight = Flight.get_by_id(conn, flight_id)
+    if flight is None:
+        raise CommandError(f"no flight found with ID {flight_id}")
+    return flight
+
+
+def run_import(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    result = IMPORTERS[args.entity](
+        conn, read_records(args.file, args.format), args.chunk_size
+    )
+
+    print(
+        f"Imported {result.inserted} {args.entity} in {result.elapsed:.2f}s "
+        f"({result.rows_per_second:,.0f} rows/s), {result.rejected} rejected"
+    )
+    for error in result.errors:
+        print(error, file=sys.stderr)
+    if result.rejected > len(result.errors):
+        print(f"... and {result.rejected - len(result.errors)} more", file=sys.stderr)
+    return 1 if result.rejected else 0
+
+
+def list_airports(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    write_records(map(airport_record, Airport.get_all(conn)), args.format)
+    return 0
+
+
+def add_airport(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    airport = Airport.create(
+        conn, args.code.upper(), args.name, args.address, AirportStatus(args.status)
+    )
+    write_records([airport_record(airport)])
+    return 0
+
+
+def update_airport(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    airport = _airport(conn, args.code)
+    if args.name is not None:
+        airport.name = args.name
+    if args.address is not None:
+        airport.address = args.address
+    if args.status is not None:
+        airport.status = AirportStatus(args.status)
+    impact = airport.update(conn)
+    write_records([airport_record(airport)])
+    if impact is not None:
+        print(
+            f"Delayed {impact.delayed} of {impact.flights} flights from or to "
+            f"{impact.airport_code} ({len(impact.companies)} companies, "
+            f"{len(impact.pilots)} pilots)",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def airport_references(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    references = _airport(conn, args.code).references(conn, args.sample)
+    write_records([references_record(references)])
+    return 0
+
+
+def delete_airport(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    airport = _airport(conn, args.code)
+    if args.cascade:
+        count = airport.delete(conn, DeleteMode.CASCADE)
+        print(f"Deleted {count} flights from or to {airport.code}", file=sys.stderr)
+    elif args.reassign_to:
+        target = args.reassign_to.upper()
+        count = airport.delete(conn, DeleteMode.REASSIGN, target)
+        print(f"Moved {count} flights to {target}", file=sys.stderr)
+    else:
+        airport.delete(conn)
+    return 0
+
+
+def list_pilots(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    write_records(map(pilot_record, Pilot.get_all(conn)), args.format)
+    return 0
+
+
+def add_pilot(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    pilot = Pilot.create(conn, args.first_name, args.last_name)
+    write_records([pilot_record(pilot)])
+    return 0
+
+
+def update_pilot(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    pilot = _pilot(conn, args.pilot_id)
+    if args.first_name is not None:
+        pilot.first_name = args.first_name
+    if args.last_name is not None:
+        pilot.last_name = args.last_name
+    pilot.save(conn)
+    write_records([pilot_record(pilot)])
+    return 0
+
+
+def pilot_references(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    references = _pilot(conn, args.pilot_id).references(conn, args.sample)
+    write_records([references_record(references)])
+    return 0
+
+
+def delete_pilot(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    pilot = _pilot(conn, args.pilot_id)
+    if args.cascade:
+        count = pilot.delete(conn, DeleteMode.CASCADE)
+        print(f"Deleted {count} flights of {pilot.pilot_id}", file=sys.stderr)
+    elif args.reassign_to or args.unassign:
+        count = pilot.delete(conn, DeleteMode.REASSIGN, args.reassign_to)
+        target = args.reassign_to or "no pilot"
+        print(f"Gave {count} flights to {target}", file=sys.stderr)
+    else:
+        pilot.delete(conn)
+    return 0
+
+
+def list_flights(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    flights = Flight.iter_all(
+        conn,
+        flight_number=args.flight_number,
+        status=FlightStatus(args.status) if args.status else None,
+        company=args.company,
+        pilot=_pilot(conn, args.pilot_id) if args.pilot_id else None,
+        origin_airport=_airport(conn, args.origin) if args.origin else None,
+        destination_airport=(
+            _airport(conn, args.destination) if args.destination else None
+        ),
+        departure_after=args.departure_after,
+        departure_before=args.departure_before,
+        arrival_after=args.arrival_after,
+        arrival_before=args.arrival_before,
+        q=args.search,
+        columns=FLIGHT_COLUMNS,
+    )
+    write_records(map(flight_row_record, flights), args.format)
+    return 0
+
+
+def add_flight(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    flight = Flight.create(
+        conn,
+        flight_number=args.flight_number,
+        origin_airport=_airport(conn, args.origin),
+        destination_airport=_airport(conn, args.destination),
+        scheduled_departure_time=args.departure,
+        estimated_arrival_time=args.arrival,
+        company=args.company,
+        pilot=_pilot(conn, args.pilot_id) if args.pilot_id else None,
+        status=FlightStatus(args.status),
+    )
+    write_records([flight_record(flight)])
+    return 0
+
+
+def update_flight(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    flight = _flight(conn, args.flight_id)
+    if args.flight_number is not None:
+        flight.flight_number = args.flight_number
+    if args.origin is not None:
+        flight.origin_airport = _airport(conn, args.origin)
+    if args.destination is not None:
+        flight.destination_airport = _airport(conn, args.destination)
+    if args.departure is not None:
+        flight.scheduled_departure_time = args.departure
+    if args.arrival is not None:
+        flight.estimated_arrival_time = args.arrival
+    if args.status is not None:
+        flight.status = FlightStatus(args.status)
+    if args.company is not None:
+        flight.company = args.company
+    if args.pilot_id is not None:
+        flight.pilot = (
+            None if args.pilot_id.lower() == "none" else _pilot(conn, args.pilot_id)
+        )
+    if args.departure_time is not None:
+        flight.departure_time = args.departure_time
+    if args.arrival_time is not None:
+        flight.arrival_time = args.arrival_time
+    flight.save(conn)
+    write_records([flight_record(flight)])
+    return 0
+
+
+def delete_flight(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    _flight(conn, args.flight_id).delete(conn)
+    return 0
+
+
+def list_changes(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    code = _airport(conn, args.airport).code if args.airport else None
+    if not args.follow:
+        page = read_changes(conn, args.since or 0, code, args.limit)
+        write_records(map(change_record, page.changes), args.format)
+        return 0
+
+    try:
+        for change in follow_changes(conn, args.since, code, args.interval):
+            write_records([change_record(change)])
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def prune_flight_changes(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    removed = prune_changes(conn, args.before)
+    print(f"Removed {removed} changes logged before {args.before.isoformat()}")
+    return 0
+
+
+def sweep_flights(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    rules = default_rules(
+        timedelta(minutes=args.boarding_minutes),
+        timedelta(minutes=args.alighting_minutes),
+    )
+    result = sweep(conn, args.now, rules, dry_run=args.dry_run)
+    write_records(
+        (
+            {
+                "rule": rule.name,
+                "from": rule.source.value,
+                "to": rule.target.value,
+                "flights": result.counts[rule.name],
+            }
+            for rule in rules
+        ),
+        args.format,
+    )
+    return 0
+
+
+def list_conflicts(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    found = 0
+
+    def records() -> Iterator[Record]:
+        nonlocal found
+        for conflict in find_all_conflicts(conn):
+            found += 1
+            yield conflict_record(conflict)
+
+    write_records(records(), args.format)
+    return 1 if found else 0
+
+
+def roster_flights(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    plan = plan_roster(
+        conn, args.start, args.end, timedelta(minutes=args.min_rest_minutes)
+    )
+    if args.apply:
+        apply_roster(conn, plan)
+    records = [
+        {"flight_id": flight_id, "pilot_id": pilot_id}
+        for flight_id, pilot_id in plan.assignments
+    ]
+    records += [
+        {"flight_id": flight_id, "pilot_id": None} for flight_id in plan.unstaffed
+    ]
+    write_records(records, args.format)
+    return 0
+
+
+def route_flights(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    origin, destination = args.origin.upper(), args.destination.upper()
+    for code in (origin, destination):
+        _airport(conn, code)
+    graph = RouteGraph.load(
+        conn,
+        args.after,
+        args.after + timedelta(hours=args.window_hours),
+        timedelta(minutes=args.min_connection_minutes),
+    )
+    if args.fewest_hops:
+        journey = graph.fewest_hops(origin, destination, args.after, args.max_hops)
+    else:
+        journey = graph.earliest_arrival(origin, destination, args.after)
+    if journey is None:
+        raise CommandError(
+            f"no connection from {origin} to {destination} "
+            f"within {args.window_hours} hours"
+        )
+    write_records(map(leg_record, journey.legs), args.format)
+    return 0
+
+
+def company_stats(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    stats = get_company_stats(conn, args.company)
+    write_records(map(company_stats_record, stats), args.format)
+    return 0
+
+
+def airport_stats(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    code = _airport(conn, args.code).code
+    stats = get_airport_stats(conn, code, args.start, args.end)
+    write_records(map(airport_stats_record, stats), args.format)
+    return 0
+
+
+def _flight_arrays(
+    args: argparse.Namespace, conn: sqlite3.Connection
+) -> analytics.FlightArrays:
+    try:
+        return analytics.FlightArrays.load(conn, args.start, args.end)
+    except ImportError as e:
+        raise CommandError(e)
+
+
+def delay_stats(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    summaries = analytics.delay_summary(
+        _flight_arrays(args, conn), args.by, args.kind, args.percentiles
+    )
+    write_records(map(delay_summary_record, summaries), args.format)
+    return 0
+
+
+def delay_distribution(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    bins = analytics.delay_distribution(
+        _flight_arrays(args, conn), args.kind, args.bin_minutes
+    )
+    write_records(
+        ({"from_minutes": start, "flights": flights} for start, flights in bins),
+        args.format,
+    )
+    return 0
+
+
+def rolling_delay(args: argparse.Namespace, conn: sqlite3.Connection) -> int:
+    rolling = analytics.rolling_delay(
+        _flight_arrays(args, conn),
+        args.by,
+        args.kind,
+        timedelta(days=args.window_days),
+    )
+    write_records(rolling_delay_records(rolling), args.format)
+    return 0
+
+
+def _entity_parser(
+    subparsers: argparse._SubParsersAction,
+    name: str,
+    common: argparse.ArgumentParser,
+) -> argparse._SubParsersAction:
+    parser = subparsers.add_parser(name, help=f"list, add, update or delete {name}")
+    actions = parser.add_subparsers(dest="action", required=True)
+
+    lister = actions.add_parser("list", parents=[common], help=f"list {name}")
+    lister.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="ndjson",
+        help="output format (default: %(default)s)",
+    )
+    return actions
+
+
+def _add_airport_commands(
+    subparsers: argparse._SubParsersAction, common: argparse.ArgumentParser
+) -> None:
+    actions = _entity_parser(subparsers, "airports", common)
+    actions.choices["list"].set_defaults(handler=list_airports)
+    statuses = [status.value for status in AirportStatus]
+
+    adder = actions.add_parser("add", parents=[common], help="add an airport")
+    adder.add_argument("code")
+    adder.add_argument("--name", required=True)
+    adder.add_argument("--address", required=True)
+    adder.add_argument("--status", choices=statuses, default="all_clear")
+    adder.set_defaults(handler=add_airport)
+
+    updater = actions.add_parser("update", parents=[common], help="update an airport")
+    updater.add_argument("code")
+    updater.add_argument("--name")
+    updater.add_argument("--address")
+    updater.add_argument("--status", choices=statuses)
+    updater.set_defaults(handler=update_airport)
+
+    references = actions.add_parser(
+        "references", parents=[common], help="count the flights from or to an airport"
+    )
+    references.add_argument("code")
+    references.add_argument(
+        "--sample",
+        type=int,
+        default=DEFAULT_SAMPLE_SIZE,
+        help="flight IDs to list (default: %(default)s)",
+    )
+    references.set_defaults(handler=airport_references)
+
+    deleter = actions.add_parser("delete", parents=[common], help="delete an airport")
+    deleter.add_argument("code")
+    mode = deleter.add_mutually_exclusive_group()
+    mode.add_argument("--cascade", action="store_true", help="also delete its flights")
+    mode.add_argument("--reassign-to", metavar="CODE", help="move its flights here")
+    deleter.set_defaults(handler=delete_airport)
+
+
+def _add_pilot_commands(
+    subparsers: argparse._SubParsersAction, common: argparse.ArgumentParser
+) -> None:
+    actions = _entity_parser(subparsers, "pilots", common)
+    actions.choices["list"].set_defaults(handler=list_pilots)
+
+    adder = actions.add_parser("add", parents=[common], help="add a pilot")
+    adder.add_argument("--first-name", required=True)
+    adder.add_argument("--last-name", required=True)
+    adder.set_defaults(handler=add_pilot)
+
+    updater = actions.add_parser("update", parents=[common], help="update a pilot")
+    updater.add_argument("pilot_id")
+    updater.add_argument("--first-name")
+    updater.add_argument("--last-name")
+    updater.set_defaults(handler=update_pilot)
+
+    references = actions.add_parser(
+        "references", parents=[common], help="count the flights of a pilot"
+    )
+    references.add_argument("pilot_id")
+    references.add_argument(
+        "--sample",
+        type=int,
+        default=DEFAULT_SAMPLE_SIZE,
+        help="flight IDs to list (default: %(default)s)",
+    )
+    references.set_defaults(handler=pilot_references)
+
+    deleter = actions.add_parser("delete", parents=[common], help="delete a pilot")
+    deleter.add_argument("pilot_id")
+    mode = deleter.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--cascade", action="store_true", help="also delete their flights"
+    )
+    mode.add_argument(
+        "--reassign-to", metavar="PILOT_ID", help="give their flights to this pilot"
+    )
+    mode.add_argument(
+        "--unassign", action="store_true", help="leave their flights unassigned"
+    )
+    deleter.set_defaults(handler=delete_pilot)
+
+
+def _add_flight_commands(
+    subparsers: argparse._SubParsersAction, common: argparse.ArgumentParser
+) -> None:
+    actions = _entity_parser(subparsers, "flights", common)
+    statuses = [status.value for status in FlightStatus]
+
+    lister = actions.choices["list"]
+    lister.add_argument("--flight-number")
+    lister.add_argument("--status", choices=statuses)
+    lister.add_argument("--company")
+    lister.add_argument("--pilot-id")
+    lister.add_argument("--origin")
+    lister.add_argument("--destination")
+    lister.add_argument(
+        "-q", "--search", help="text in the flight number, company or names"
+    )
+    lister.add_argument("--departure-after", type=_datetime)
+    lister.add_argument("--departure-before", type=_datetime)
+    lister.add_argument("--arrival-after", type=_datetime)
+    lister.add_argument("--arrival-before", type=_datetime)
+    lister.set_defaults(handler=list_flights)
+
+    adder = actions.add_parser("add", parents=[common], help="add a flight")
+    adder.add_argument("--flight-number", required=True)
+    adder.add_argument("--company", required=True)
+    adder.add_argument("--origin", required=True)
+    adder.add_argument("--destination", required=True)
+    adder.add_argument("--departure", type=_datetime, required=True)
+    adder.add_argument("--arrival", type=_datetime, required=True)
+    adder.add_argument("--pilot-id")
+    adder.add_argument("--status", choices=statuses, default="pending")
+    adder.set_defaults(handler=add_flight)
+
+    updater = actions.add_parser("update", parents=[common], help="update a flight")
+    updater.add_argument("flight_id", type=int)
+    updater.add_argument("--flight-number")
+    updater.add_argument("--company")
+    updater.add_argument("--origin")
+    updater.add_argument("--destination")
+    updater.add_argument("--departure", type=_datetime)
+    updater.add_argument("--arrival", type=_datetime)
+    updater.add_argument("--status", choices=statuses)
+    updater.add_argument("--pilot-id", help="pilot ID, or 'none' to unassign")
+    updater.add_argument(
+        "--departure-time", type=_optional_datetime, help="actual departure or 'none'"
+    )
+    updater.add_argument(
+        "--arrival-time", type=_optional_datetime, help="actual arrival or 'none'"
+    )
+    updater.set_defaults(handler=update_flight)
+
+    deleter = actions.add_parser("delete", parents=[common], help="delete a flight")
+    deleter.add_argument("flight_id", type=int)
+    deleter.set_defaults(handler=delete_flight)
+
+    changes = actions.add_parser(
+        "changes",
+        parents=[common],
+        help="list changes to flights in the order they were made",
+    )
+    changes.add_argument(
+        "--since", type=int, help="only changes after this seq (default: all)"
+    )
+    changes.add_argument("--airport", help="only flights from or to this airport")
+    changes.add_argument("--limit", type=int, default=1000, help="default: %(default)s")
+    changes.add_argument(
+        "-f",
+        "--follow",
+        action="store_true",
+        help="keep printing new changes as ndjson; starts after the newest "
+        "change unless --since is given",
+    )
+    changes.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="seconds between polls with --follow (default: %(default)s)",
+    )
+    changes.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="ndjson",
+        help="output format (default: %(default)s)",
+    )
+    changes.set_defaults(handler=list_changes)
+
+    pruner = actions.add_parser(
+        "prune-changes", parents=[common], help="delete old entries of the change log"
+    )
+    pruner.add_argument("--before", type=_datetime, required=True)
+    pruner.set_defaults(handler=prune_flight_changes)
+
+    sweeper = actions.add_parser(
+        "sweep",
+        parents=[common],
+        help="move flights to the status their times call for, e.g. pending "
+        "flights past departure to delayed",
+    )
+    sweeper.add_argument(
+        "--now", type=_datetime, help="time to sweep at, in UTC (default: now)"
+    )
+    sweeper.add_argument(
+        "--boarding-minutes",
+        type=int,
+        default=30,
+        help="boarding starts this long before departure (default: %(default)s)",
+    )
+    sweeper.add_argument(
+        "--alighting-minutes",
+        type=int,
+        default=30,
+        help="flights count as arrived this long after landing "
+        "(default: %(default)s)",
+    )
+    sweeper.add_argument(
+        "--dry-run", action="store_true", help="report the counts without saving"
+    )
+    sweeper.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="ndjson",
+        help="output format (default: %(default)s)",
+    )
+    sweeper.set_defaults(handler=sweep_flights)
+
+    checker = actions.add_parser(
+        "conflicts",
+        parents=[common],
+        help="list pilots booked on overlapping flights; exits 1 if there are any",
+    )
+    checker.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="ndjson",
+        help="output format (default: %(default)s)",
+    )
+    checker.set_defaults(handler=list_conflicts)
+
+    roster = actions.add_parser(
+        "roster",
+        parents=[common],
+        help="propose pilots for unassigned flights departing in a window",
+    )
+    roster.add_argument("--from", dest="start", type=_datetime, required=True)
+    roster.add_argument("--to", dest="end", type=_datetime, required=True)
+    roster.add_argument(
+        "--min-rest-minutes",
+        type=int,
+        default=60,
+        help="rest between a pilot's flights (default: %(default)s)",
+    )
+    roster.add_argument(
+        "--apply", action="store_true", help="save the assignments (default: dry run)"
+    )
+    roster.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="ndjson",
+        help="output format (default: %(default)s)",
+    )
+    roster.set_defaults(handler=roster_flights)
+
+    router = actions.add_parser(
+        "route", parents=[common], help="find a connection between two airports"
+    )
+    router.add_argument("origin")
+    router.add_argument("destination")
+    router.add_argument("--after", type=_datetime, required=True)
+    router.add_argument(
+        "--fewest-hops",
+        action="store_true",
+        help="fewest flights instead of earliest arrival",
+    )
+    router.add_argument("--max-hops", type=int, default=DEFAULT_MAX_HOPS)
+    router.add_argument(
+        "--min-connection-minutes",
+        type=int,
+        default=45,
+        help="time needed to change flights (default: %(default)s)",
+    )
+    router.add_argument(
+        "--window-hours",
+        type=int,
+        default=24,
+        help="how far ahead of --after to search (default: %(default)s)",
+    )
+    router.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="ndjson",
+        help="output format (default: %(default)s)",
+    )
+    router.set_defaults(handler=route_flights)
+
+
+def _add_stats_commands(
+    subparsers: argparse._SubParsersAction, common: argparse.ArgumentParser
+) -> None:
+    parser = subparsers.add_parser("stats", help="summary statistics")
+    reports = parser.add_subparsers(dest="report", required=True)
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="ndjson",
+        help="output format (default: %(default)s)",
+    )
+
+    companies = reports.add_parser(
+        "companies",
+        parents=[common, output],
+        help="flight counts, delays and on-time rates per company",
+    )
+    companies.add_argument("--company")
+    companies.set_defaults(handler=company_stats)
+
+    airport = reports.add_parser(
+        "airport",
+        parents=[common, output],
+        help="departures and arrivals by status per day at an airport",
+    )
+    airport.add_argument("code")
+    airport.add_argument("--from", dest="start", type=_date, required=True)
+    airport.add_argument("--to", dest="end", type=_date, help="default: --from")
+    airport.set_defaults(handler=airport_stats)
+
+    # Computed from the flights table with NumPy rather than read from the
+    # summary tables.
+    delays = argparse.ArgumentParser(add_help=False)
+    delays.add_argument(
+        "--from", dest="start", type=_datetime, help="earliest scheduled departure"
+    )
+    delays.add_argument(
+        "--to", dest="end", type=_datetime, help="scheduled departure before"
+    )
+    delays.add_argument(
+        "--kind",
+        choices=analytics.DELAY_KINDS,
+        default="departure",
+        help="delay to measure (default: %(default)s)",
+    )
+
+    summary = reports.add_parser(
+        "delays",
+        parents=[common, output, delays],
+        help="delay percentiles, mean and on-time rate per group",
+    )
+    summary.add_argument("--by", choices=analytics.GROUPINGS)
+    summary.add_argument(
+        "--percentiles",
+        type=float,
+        nargs="+",
+        default=list(analytics.DEFAULT_PERCENTILES),
+        help="default: %(default)s",
+    )
+    summary.set_defaults(handler=delay_stats)
+
+    distribution = reports.add_parser(
+        "distribution",
+        parents=[common, output, delays],
+        help="number of flights per delay bin",
+    )
+    distribution.add_argument(
+        "--bin-minutes", type=int, default=15, help="default: %(default)s"
+    )
+    distribution.set_defaults(handler=delay_distribution)
+
+    rolling = reports.add_parser(
+        "rolling",
+        parents=[common, output, delays],
+        help="trailing-window mean delay and on-time rate per day",
+    )
+    rolling.add_argument("--by", choices=analytics.GROUPINGS)
+    rolling.add_argument(
+        "--window-days", type=int, default=7, help="default: %(default)s"
+    )
+    rolling.set_defaults(handler=rolling_delay)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="manage-flight",
+        description="Airline management system. Run without a command for the menu.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--db", default=DEFAULT_DB_PATH, help="database file (default: %(default)s)"
+    )
+
+    importer = subparsers.add_parser(
+        "import",
+        parents=[common],
+        help="bulk load airports, pilots or flights from a file",
+        description=(
+            "Bulk load records from CSV, a JSON array, or newline-delimited JSON. "
+            "Columns match the table columns, e.g. flights need flight_number, "
+            "origin_airport_code, destination_airport_code, "
+            "scheduled_departure_time, estimated_arrival_time and company."
+        ),
+    )
+    importer.add_argument("entity", choices=IMPORTERS)
+    importer.add_argument("file", type=Path)
+    importer.add_argument(
+        "--format", choices=FORMATS, help="file format (default: from extension)"
+    )
+    importer.add_argument(
+        "--chunk-size",
+        type=int,
+        default=5000,
+        help="rows per transaction (default: %(default)s)",
+    )
+    importer.set_defaults(handler=run_import)
+
+    _add_airport_commands(subparsers, common)
+    _add_pilot_commands(subparsers, common)
+    _add_flight_commands(subparsers, common)
+    _add_stats_commands(subparsers, common)
+
+    return parser
+
+
+def run(argv: Optional[List[str]] = None) -> Optional[int]:
+    """Run a subcommand and return its exit code, or None if none was given"""
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        return None
+
+    handler: Callable[[argparse.Namespace, sqlite3.Connection], int] = args.handler
+    with get_connection(args.db) as conn:
+        migrate(conn)
+        try:
+            return handler(args, conn)
+        except (CommandError, ValueError, KeyError) as e:
+            conn.rollback()
+            print(f"manage-flight: error: {e}", file=sys.stderr)
+            return 1
+        except BrokenPipeError:
+            # The reader (e.g. `head`) went away; silence the final flush.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
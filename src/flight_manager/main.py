@@ -1,31 +1,43 @@
-from flight_manager.models.pilot import Pilot
-from flight_manager.models.airports import Airport
-from flight_manager.models.flight import Flight
+import os
+
+from flight_manager.cli import run
 from flight_manager.views.airport_menus import menu_options as aiport_menu
 from flight_manager.views.pilot_menus import menu_options as pilot_menu
 from flight_manager.views.flight_menus import menu_options as flight_menu
+from flight_manager.views.report_menus import menu_options as report_menu
 from flight_manager.views.menu import create_menu
 
-from flight_manager.models.db import get_connection
+from flight_manager.models.db import enable_profiling, get_connection
+from flight_manager.models.migrations import migrate
 
 
 def initialize_database():
     with get_connection() as conn:
-        Airport.create_table(conn)
-        Pilot.create_table(conn)
-        Flight.create_table(conn)
+        migrate(conn)
+
+
+def main(argv=None):
+    report_path = os.environ.get("FLIGHT_MANAGER_PROFILE")
+    if report_path:
+        enable_profiling(
+            slow_ms=float(os.environ.get("FLIGHT_MANAGER_SLOW_MS", 100)),
+            report_path=report_path,
+        )
 
+    exit_code = run(argv)
+    if exit_code is not None:
+        return exit_code
 
-def main():
     initialize_database()
     menu_options = [
         ("View/Edit Airports", create_menu("Airports", aiport_menu)),
         ("View/Edit Pilots", create_menu("Pilots", pilot_menu)),
-        ("View/Edit Flights", create_menu("Flights", flight_menu))
+        ("View/Edit Flights", create_menu("Flights", flight_menu)),
+        ("Reports", create_menu("Reports", report_menu)),
     ]
     create_menu("Airline Management System", menu_options)()
     print("\nGoodbye!")
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
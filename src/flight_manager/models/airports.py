@@ -1,8 +1,23 @@
 from dataclasses import dataclass
 import sqlite3
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from enum import Enum
 
+from flight_manager.models.db import transaction
+from flight_manager.models.identity import identity_map
+from flight_manager.models.references import (
+    DEFAULT_SAMPLE_SIZE,
+    DeleteMode,
+    FlightReferences,
+    find_references,
+    has_references,
+    release_references,
+)
+from flight_manager.models.tracking import Tracked, as_is
+
+if TYPE_CHECKING:
+    from flight_manager.models.closures import ClosureImpact
+
 
 class AirportStatus(Enum):
     ALL_CLEAR = "all_clear"
@@ -11,12 +26,31 @@ class AirportStatus(Enum):
 
 
 @dataclass
-class Airport:
+class Airport(Tracked):
     code: str
     name: str
     address: str
     status: AirportStatus
 
+    _key = "code"
+    _references = ("origin_airport_code", "destination_airport_code")
+    _columns = {
+        "name": ("name", as_is),
+        "address": ("address", as_is),
+        "status": ("status", lambda status: status.value),
+    }
+
+    @classmethod
+    def _from_row(cls, row: tuple, start: int = 0) -> "Airport":
+        airport = cls(
+            code=row[start],
+            name=row[start + 1],
+            address=row[start + 2],
+            status=AirportStatus(row[start + 3]),
+        )
+        airport.mark_clean()
+        return airport
+
     @classmethod
     def create_table(cls, conn: sqlite3.Connection) -> None:
         conn.execute(
@@ -34,19 +68,34 @@ class Airport:
     def drop_table(cls, conn: sqlite3.Connection) -> None:
         conn.execute("DROP TABLE IF EXISTS airports")
 
-    def update(self, conn: sqlite3.Connection) -> None:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            UPDATE airports 
-            SET name = ?, address = ?, status = ?
-            WHERE code = ?
-        """,
-            (self.name, self.address, self.status.value, self.code),
-        )
+    def update(self, conn: sqlite3.Connection) -> Optional["ClosureImpact"]:
+        """Write the changed columns.
 
-        if cursor.rowcount == 0:
-            raise KeyError(f"Airport with code {self.code} not found")
+        When the status becomes WARNING or CLOSED, the airport's future
+        flights are delayed in the same transaction and the impact returned.
+        """
+        # closures imports the flight model, which imports this module.
+        from flight_manager.models.closures import DISRUPTED_STATUSES, delay_flights_at
+
+        changes = self.changed_columns()
+        if not changes:
+            return None
+
+        impact = None
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        with transaction(conn):
+            cursor = conn.execute(
+                f"UPDATE airports SET {assignments} WHERE code = ?",
+                (*changes.values(), self.code),
+            )
+            if cursor.rowcount == 0:
+                raise KeyError(f"Airport with code {self.code} not found")
+            if "status" in changes and self.status in DISRUPTED_STATUSES:
+                impact = delay_flights_at(conn, self.code)
+
+        self.mark_clean()
+        identity_map(conn).put(self)
+        return impact
 
     @classmethod
     def create(
@@ -59,16 +108,18 @@ class Airport:
     ) -> "Airport":
         airport = cls(code, name, address, status)
         cursor = conn.cursor()
-        if Airport.get_by_code(conn, code) is not None:
+        try:
+            cursor.execute(
+                """
+                INSERT INTO airports (code, name, address, status)
+                VALUES (?, ?, ?, ?)
+            """,
+                (code, name, address, status.value),
+            )
+        except sqlite3.IntegrityError:
             raise ValueError("Airport with the same code already created")
-
-        cursor.execute(
-            """
-            INSERT INTO airports (code, name, address, status)
-            VALUES (?, ?, ?, ?)
-        """,
-            (code, name, address, status.value),
-        )
+        airport.mark_clean()
+        identity_map(conn).put(airport)
         return airport
 
     @classmethod
@@ -79,23 +130,55 @@ class Airport:
         )
         row = cursor.fetchone()
         if row:
-            return cls(
-                code=row[0], name=row[1], address=row[2], status=AirportStatus(row[3])
-            )
+            return identity_map(conn).intern(cls, row)
         return None
 
     @classmethod
     def get_all(cls, conn: sqlite3.Connection) -> List["Airport"]:
         cursor = conn.cursor()
         cursor.execute("SELECT code, name, address, status FROM airports")
-        return [
-            cls(code=row[0], name=row[1], address=row[2], status=AirportStatus(row[3]))
-            for row in cursor.fetchall()
-        ]
+        session = identity_map(conn)
+        return [session.intern(cls, row) for row in cursor.fetchall()]
 
-    def delete(self, conn: sqlite3.Connection) -> None:
-        conn.execute("DELETE FROM airports WHERE code = ?", (self.code,))
+    def is_referenced(self, conn: sqlite3.Connection) -> bool:
+        """Whether any flight departs from or arrives at this airport"""
+        return has_references(conn, self._references, self.code)
+
+    def references(
+        self, conn: sqlite3.Connection, sample_size: int = DEFAULT_SAMPLE_SIZE
+    ) -> FlightReferences:
+        return find_references(conn, self._references, self.code, sample_size)
+
+    def delete(
+        self,
+        conn: sqlite3.Connection,
+        mode: DeleteMode = DeleteMode.RESTRICT,
+        reassign_to: Optional[str] = None,
+    ) -> int:
+        """Delete the airport and return how many of its flights went with it.
+
+        RESTRICT raises ReferencedError if the airport has flights. CASCADE
+        deletes them and REASSIGN moves them to the airport ``reassign_to``.
+        """
+        if mode is DeleteMode.REASSIGN and (
+            reassign_to is None or Airport.get_by_code(conn, reassign_to) is None
+        ):
+            raise KeyError(f"Airport with code {reassign_to} not found")
+
+        with transaction(conn):
+            count = release_references(
+                conn,
+                f"airport {self.code}",
+                self._references,
+                self.code,
+                mode,
+                reassign_to,
+            )
+            conn.execute("DELETE FROM airports WHERE code = ?", (self.code,))
+        identity_map(conn).discard(type(self), self.code)
+        return count
 
     @classmethod
     def delete_by_code(cls, conn: sqlite3.Connection, code: str) -> None:
         conn.execute("DELETE FROM airports WHERE code = ?", (code,))
+        identity_map(conn).discard(cls, code)
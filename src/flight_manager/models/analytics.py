@@ -0,0 +1,301 @@
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from flight_manager.models.flight import FlightStatus
+from flight_manager.models.stats import LATE_AFTER
+from flight_manager.models.timestamps import EPOCH, to_epoch
+
+try:
+    import numpy as np
+except ImportError:  # installed with the "analytics" extra
+    np = None
+
+DELAY_KINDS = ("departure", "arrival")
+GROUPINGS = ("company", "route", "origin", "destination", "hour")
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+_DAY = 86400
+_STATUSES = tuple(FlightStatus)
+_STATUS_CODES = {status.value: code for code, status in enumerate(_STATUSES)}
+
+_COLUMNS = [
+    ("flight_id", "i8"),
+    ("scheduled_departure", "i8"),
+    ("estimated_arrival", "i8"),
+    ("departure_delay", "f8"),
+    ("arrival_delay", "f8"),
+    ("status", "i1"),
+    ("origin", "i4"),
+    ("destination", "i4"),
+    ("company", "i4"),
+]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "flight analytics need NumPy: pip install 'flight-manager[analytics]'"
+        )
+
+
+@dataclass
+class FlightArrays:
+    """Flight columns as parallel arrays with one element per flight.
+
+    Times are epoch seconds and delays are minutes, NaN until the flight has
+    departed or arrived. ``status``, ``origin``, ``destination`` and
+    ``company`` are integer codes indexing ``statuses``, ``airports`` and
+    ``companies``.
+    """
+
+    flight_id: "np.ndarray"
+    scheduled_departure: "np.ndarray"
+    estimated_arrival: "np.ndarray"
+    departure_delay: "np.ndarray"
+    arrival_delay: "np.ndarray"
+    status: "np.ndarray"
+    origin: "np.ndarray"
+    destination: "np.ndarray"
+    company: "np.ndarray"
+    airports: List[str]
+    companies: List[str]
+    statuses: Tuple[FlightStatus, ...] = _STATUSES
+
+    def __len__(self) -> int:
+        return len(self.flight_id)
+
+    @classmethod
+    def load(
+        cls,
+        conn: sqlite3.Connection,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> "FlightArrays":
+        """Read the flights departing in [start, end) straight from a cursor"""
+        _require_numpy()
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("scheduled_departure_time >= ?")
+            params.append(to_epoch(start))
+        if end is not None:
+            conditions.append("scheduled_departure_time < ?")
+            params.append(to_epoch(end))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        rows = conn.execute(
+            f"""
+            SELECT flight_id, scheduled_departure_time, estimated_arrival_time,
+                (departure_time - scheduled_departure_time) / 60.0,
+                (arrival_time - estimated_arrival_time) / 60.0,
+                status, origin_airport_code, destination_airport_code, company
+            FROM flights
+            {where}
+        """,
+            params,
+        )
+
+        # Category codes are handed out in order of first appearance.
+        airports: Dict[str, int] = {}
+        companies: Dict[str, int] = {}
+
+        def coded() -> Iterator[tuple]:
+            for row in rows:
+                yield (
+                    *row[:5],
+                    _STATUS_CODES[row[5]],
+                    airports.setdefault(row[6], len(airports)),
+                    airports.setdefault(row[7], len(airports)),
+                    companies.setdefault(row[8], len(companies)),
+                )
+
+        table = np.fromiter(coded(), dtype=_COLUMNS)
+        return cls(
+            *(table[name] for name, _ in _COLUMNS),
+            airports=list(airports),
+            companies=list(companies),
+        )
+
+    def delays(self, kind: str = "departure") -> "np.ndarray":
+        if kind not in DELAY_KINDS:
+            raise ValueError(f"unknown delay kind {kind!r}")
+        return self.departure_delay if kind == "departure" else self.arrival_delay
+
+    def groups(self, by: Optional[str]) -> Tuple["np.ndarray", List[str]]:
+        """Return a group code per flight and each group's label"""
+        if by is None:
+            return np.zeros(len(self), dtype=np.int64), ["all"]
+        if by == "company":
+            return self.company, list(self.companies)
+        if by == "origin":
+            return self.origin, list(self.airports)
+        if by == "destination":
+            return self.destination, list(self.airports)
+        if by == "route":
+            pairs = self.origin.astype(np.int64) * len(self.airports) + self.destination
+            routes, codes = np.unique(pairs, return_inverse=True)
+            labels = [
+                f"{self.airports[pair // len(self.airports)]}-"
+                f"{self.airports[pair % len(self.airports)]}"
+                for pair in routes.tolist()
+            ]
+            return codes, labels
+        if by == "hour":
+            hours = self.scheduled_departure % _DAY // 3600
+            return hours, [f"{hour:02d}:00" for hour in range(24)]
+        raise ValueError(f"unknown grouping {by!r}")
+
+
+@dataclass
+class DelaySummary:
+    key: str
+    flights: int
+    # Flights that have departed, or arrived, so have a delay.
+    observed: int
+    on_time: int
+    # Minutes; early flights count as on schedule, as in the stats tables.
+    mean_delay: Optional[float]
+    # Percentile -> minutes, over the signed delays.
+    percentiles: Dict[float, float]
+
+    @property
+    def on_time_rate(self) -> Optional[float]:
+        return self.on_time / self.observed if self.observed else None
+
+
+def _group_percentiles(
+    codes: "np.ndarray", values: "np.ndarray", counts: "np.ndarray", q: Iterable[float]
+) -> Dict[float, "np.ndarray"]:
+    """Linearly interpolated percentiles of ``values`` within each group"""
+    ordered = values[np.lexsort((values, codes))]
+    starts = np.cumsum(counts) - counts
+    last = np.maximum(counts - 1, 0)
+    result = {}
+    for percentile in q:
+        position = starts + last * (percentile / 100)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, starts + last)
+        if len(ordered):
+            low_values = ordered[np.minimum(low, len(ordered) - 1)]
+            high_values = ordered[np.minimum(high, len(ordered) - 1)]
+            values_at = low_values + (high_values - low_values) * (position - low)
+        else:
+            values_at = np.zeros(len(counts))
+        result[percentile] = np.where(counts > 0, values_at, np.nan)
+    return result
+
+
+def delay_summary(
+    flights: FlightArrays,
+    by: Optional[str] = None,
+    kind: str = "departure",
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+) -> List[DelaySummary]:
+    """Delay percentiles, mean and on-time rate per group, sorted by group"""
+    codes, labels = flights.groups(by)
+    delays = flights.delays(kind)
+    size = len(labels)
+
+    totals = np.bincount(codes, minlength=size)
+    observed = ~np.isnan(delays)
+    codes, delays = codes[observed], delays[observed]
+    counts = np.bincount(codes, minlength=size)
+    on_time = np.bincount(codes, weights=delays <= LATE_AFTER / 60, minlength=size)
+    delay_sums = np.bincount(codes, weights=np.maximum(delays, 0), minlength=size)
+    quantiles = _group_percentiles(codes, delays, counts, percentiles)
+
+    summaries = []
+    for group in np.flatnonzero(totals).tolist():
+        count = int(counts[group])
+        summaries.append(
+            DelaySummary(
+                labels[group],
+                int(totals[group]),
+                count,
+                int(on_time[group]),
+                float(delay_sums[group] / count) if count else None,
+                {q: float(values[group]) for q, values in quantiles.items() if count},
+            )
+        )
+    summaries.sort(key=lambda summary: summary.key)
+    return summaries
+
+
+def delay_distribution(
+    flights: FlightArrays, kind: str = "departure", bin_minutes: int = 15
+) -> List[Tuple[int, int]]:
+    """Return (bin start in minutes, flights) for each non-empty delay bin"""
+    delays = flights.delays(kind)
+    delays = delays[~np.isnan(delays)]
+    bins, counts = np.unique(
+        np.floor(delays / bin_minutes).astype(np.int64), return_counts=True
+    )
+    return list(zip((bins * bin_minutes).tolist(), counts.tolist()))
+
+
+@dataclass
+class RollingDelay:
+    """Trailing-window delay averages, one row per group and column per day.
+
+    Days without an observed flight in their window are NaN.
+    """
+
+    keys: List[str]
+    days: List[date]
+    flights: "np.ndarray"
+    mean_delay: "np.ndarray"
+    on_time_rate: "np.ndarray"
+
+
+def rolling_delay(
+    flights: FlightArrays,
+    by: Optional[str] = None,
+    kind: str = "departure",
+    window: timedelta = timedelta(days=7),
+) -> RollingDelay:
+    """Average delay and on-time rate over the ``window`` up to each day.
+
+    Flights count on the day of their scheduled departure. Each group's
+    daily sums are accumulated once, so every window is a difference of two
+    running totals whatever its length.
+    """
+    codes, labels = flights.groups(by)
+    delays = flights.delays(kind)
+    observed = ~np.isnan(delays)
+    codes, delays = codes[observed], delays[observed]
+    if not len(delays):
+        empty = np.empty((0, 0))
+        return RollingDelay([], [], empty, empty, empty)
+
+    present, codes = np.unique(codes, return_inverse=True)
+    keys = [labels[group] for group in present.tolist()]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    days = flights.scheduled_departure[observed] // _DAY
+    first = int(days.min())
+    span = int(days.max()) - first + 1
+    cells = codes * span + (days - first)
+    shape = (len(present), span)
+
+    def running(weights: Optional["np.ndarray"]) -> "np.ndarray":
+        daily = np.bincount(cells, weights=weights, minlength=shape[0] * span)
+        totals = np.zeros((shape[0], span + 1))
+        np.cumsum(daily.reshape(shape), axis=1, out=totals[:, 1:])
+        width = max(window // timedelta(days=1), 1)
+        ends = np.arange(1, span + 1)
+        return totals[:, ends] - totals[:, np.maximum(ends - width, 0)]
+
+    counts = running(None)
+    delay_sums = running(np.maximum(delays, 0))
+    on_time = running((delays <= LATE_AFTER / 60).astype(np.float64))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_delay = np.where(counts > 0, delay_sums / counts, np.nan)
+        on_time_rate = np.where(counts > 0, on_time / counts, np.nan)
+
+    return RollingDelay(
+        [keys[group] for group in order],
+        [EPOCH.date() + timedelta(days=first + day) for day in range(span)],
+        counts[order].astype(np.int64),
+        mean_delay[order],
+        on_time_rate[order],
+    )
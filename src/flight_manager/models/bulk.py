@@ -0,0 +1,365 @@
+import contextlib
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from flight_manager.models.airports import AirportStatus
+from flight_manager.models.changes import deferred_changes
+from flight_manager.models.flight import FlightStatus
+from flight_manager.models.pilot import Pilot
+from flight_manager.models.db import transaction
+from flight_manager.models.scheduling import find_all_conflicts
+from flight_manager.models.search import deferred_indexing
+from flight_manager.models.stats import deferred_stats
+from flight_manager.models.timestamps import to_epoch
+
+Record = Dict[str, Any]
+# A prepared row and the number of the record it came from.
+Row = Tuple[int, tuple]
+
+MAX_REPORTED_ERRORS = 20
+
+# Stay well below SQLite's limit on host parameters per statement.
+_LOOKUP_BATCH = 500
+
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, line: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"record {line}: {message}")
+
+
+def _chunks(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _existing(
+    conn: sqlite3.Connection, table: str, column: str, keys: Set[str]
+) -> Set[str]:
+    found = set()
+    keys = list(keys)
+    for start in range(0, len(keys), _LOOKUP_BATCH):
+        batch = keys[start : start + _LOOKUP_BATCH]
+        placeholders = ", ".join("?" * len(batch))
+        found.update(
+            row[0]
+            for row in conn.execute(
+                f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})",
+                batch,
+            )
+        )
+    return found
+
+
+def _required(record: Record, key: str) -> str:
+    value = record.get(key)
+    if value is None or str(value).strip() == "":
+        raise ValueError(f"missing {key}")
+    return str(value).strip()
+
+
+def _optional(record: Record, key: str) -> Optional[str]:
+    value = record.get(key)
+    if value is None or str(value).strip() == "":
+        return None
+    return str(value).strip()
+
+
+def _timestamp(value: Optional[str]) -> Optional[int]:
+    """Accept ISO 8601 text or epoch seconds and return epoch seconds"""
+    if not value:
+        return None
+    return int(value) if value.lstrip("-").isdigit() else to_epoch(value)
+
+
+class _Rejected(Exception):
+    """Rolls a chunk back so it can be inserted again without some rows"""
+
+    def __init__(self, errors: Dict[int, str]) -> None:
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _load(
+    conn: sqlite3.Connection,
+    records: Iterable[Record],
+    chunk_size: int,
+    insert: str,
+    prepare: Callable[[sqlite3.Connection, List[Record], int, ImportResult], List[Row]],
+    indexing: Callable[[sqlite3.Connection], ContextManager[None]] = (
+        lambda conn: contextlib.nullcontext()
+    ),
+    check: Optional[Callable[[sqlite3.Connection, List[Row]], Dict[int, str]]] = None,
+) -> ImportResult:
+    """Insert each chunk in one transaction.
+
+    ``check`` runs on the inserted rows before the chunk is committed and
+    returns the records to reject, with the reason. The chunk is then rolled
+    back and inserted again without them.
+    """
+    result = ImportResult()
+    started = time.perf_counter()
+    line = 0
+
+    for chunk in _chunks(records, chunk_size):
+        rows = prepare(conn, chunk, line, result)
+        line += len(chunk)
+        while rows:
+            try:
+                with transaction(conn), indexing(conn):
+                    conn.executemany(insert, [row for _, row in rows])
+                    errors = check(conn, rows) if check is not None else {}
+                    if errors:
+                        raise _Rejected(errors)
+            except _Rejected as e:
+                for offset, message in sorted(e.errors.items()):
+                    result.reject(offset, message)
+                rows = [row for row in rows if row[0] not in e.errors]
+                continue
+            conn.commit()
+            result.inserted += len(rows)
+            break
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+@contextlib.contextmanager
+def _deferred_flight_triggers(conn: sqlite3.Connection) -> Iterator[None]:
+    with deferred_indexing(conn), deferred_stats(conn), deferred_changes(conn):
+        yield
+
+
+def _prepare_airports(
+    conn: sqlite3.Connection, chunk: List[Record], line: int, result: ImportResult
+) -> List[Row]:
+    rows = []
+    seen = _existing(
+        conn, "airports", "code", {str(r.get("code", "")).upper() for r in chunk}
+    )
+
+    for offset, record in enumerate(chunk, line + 1):
+        try:
+            code = _required(record, "code").upper()
+            status = AirportStatus(_optional(record, "status") or "all_clear")
+            row = (
+                code,
+                _required(record, "name"),
+                _required(record, "address"),
+                status.value,
+            )
+        except ValueError as e:
+            result.reject(offset, str(e))
+            continue
+
+        if code in seen:
+            result.reject(offset, f"airport {code} already exists")
+            continue
+        seen.add(code)
+        rows.append((offset, row))
+
+    return rows
+
+
+def _prepare_pilots(
+    conn: sqlite3.Connection, chunk: List[Record], line: int, result: ImportResult
+) -> List[Row]:
+    rows = []
+    seen = _existing(
+        conn,
+        "pilots",
+        "pilot_id",
+        {str(r["pilot_id"]).upper() for r in chunk if r.get("pilot_id")},
+    )
+
+    for offset, record in enumerate(chunk, line + 1):
+        try:
+            pilot_id = (_optional(record, "pilot_id") or "").upper()
+            row = [
+                pilot_id,
+                _required(record, "first_name"),
+                _required(record, "last_name"),
+            ]
+        except ValueError as e:
+            result.reject(offset, str(e))
+            continue
+
+        if not pilot_id:
+            pilot_id = Pilot.generate_pilot_id()
+            while pilot_id in seen:
+                pilot_id = Pilot.generate_pilot_id()
+            row[0] = pilot_id
+        elif pilot_id in seen:
+            result.reject(offset, f"pilot {pilot_id} already exists")
+            continue
+        seen.add(pilot_id)
+        rows.append((offset, tuple(row)))
+
+    return rows
+
+
+def _prepare_flights(
+    conn: sqlite3.Connection, chunk: List[Record], line: int, result: ImportResult
+) -> List[Row]:
+    rows = []
+    airports = _existing(
+        conn,
+        "airports",
+        "code",
+        {
+            str(r.get(key, "")).upper()
+            for r in chunk
+            for key in ("origin_airport_code", "destination_airport_code")
+        },
+    )
+    pilots = _existing(
+        conn,
+        "pilots",
+        "pilot_id",
+        {str(r["pilot_id"]).upper() for r in chunk if r.get("pilot_id")},
+    )
+
+    for offset, record in enumerate(chunk, line + 1):
+        try:
+            origin = _required(record, "origin_airport_code").upper()
+            destination = _required(record, "destination_airport_code").upper()
+            pilot_id = (_optional(record, "pilot_id") or "").upper() or None
+            row = (
+                _required(record, "flight_number"),
+                origin,
+                destination,
+                _timestamp(_required(record, "scheduled_departure_time")),
+                _timestamp(_required(record, "estimated_arrival_time")),
+                _timestamp(_optional(record, "departure_time")),
+                _timestamp(_optional(record, "arrival_time")),
+                FlightStatus(_optional(record, "status") or "pending").value,
+                pilot_id,
+                _required(record, "company"),
+            )
+        except ValueError as e:
+            result.reject(offset, str(e))
+            continue
+
+        missing = [code for code in (origin, destination) if code not in airports]
+        if missing:
+            result.reject(offset, f"unknown airport {', '.join(missing)}")
+            continue
+        if pilot_id is not None and pilot_id not in pilots:
+            result.reject(offset, f"unknown pilot {pilot_id}")
+            continue
+        rows.append((offset, row))
+
+    return rows
+
+
+def _pilot_conflicts(conn: sqlite3.Connection, rows: List[Row]) -> Dict[int, str]:
+    """Find the imported flights that overlap another flight of their pilot.
+
+    Runs after the chunk is inserted, so overlaps within the chunk are found
+    as well as those with stored flights. Of two imported flights the later
+    record is rejected; once it is, its other overlaps no longer count.
+    """
+    # Flight ids only grow, so the newest ids are the chunk's, in row order.
+    ids = conn.execute(
+        "SELECT flight_id FROM flights ORDER BY flight_id DESC LIMIT ?", (len(rows),)
+    ).fetchall()
+    lines = {row[0]: offset for row, (offset, _) in zip(reversed(ids), rows)}
+
+    rejected: Dict[int, str] = {}
+    for pilot_id in sorted({row[8] for _, row in rows if row[8] is not None}):
+        for conflict in find_all_conflicts(conn, pilot_id):
+            pair = (conflict.flight_id, conflict.other_flight_id)
+            imported = [flight_id for flight_id in pair if flight_id in lines]
+            if not imported or any(lines.get(f) in rejected for f in pair):
+                continue
+            flight_id = max(imported)
+            other = pair[0] if flight_id == pair[1] else pair[1]
+            other = f"record {lines[other]}" if other in lines else f"flight {other}"
+            rejected[lines[flight_id]] = (
+                f"pilot {pilot_id} is already flying {other} from "
+                f"{conflict.overlap_start:%Y-%m-%d %H:%M} "
+                f"to {conflict.overlap_end:%Y-%m-%d %H:%M}"
+            )
+    return rejected
+
+
+def import_airports(
+    conn: sqlite3.Connection, records: Iterable[Record], chunk_size: int = 5000
+) -> ImportResult:
+    return _load(
+        conn,
+        records,
+        chunk_size,
+        "INSERT INTO airports (code, name, address, status) VALUES (?, ?, ?, ?)",
+        _prepare_airports,
+    )
+
+
+def import_pilots(
+    conn: sqlite3.Connection, records: Iterable[Record], chunk_size: int = 5000
+) -> ImportResult:
+    return _load(
+        conn,
+        records,
+        chunk_size,
+        "INSERT INTO pilots (pilot_id, first_name, last_name) VALUES (?, ?, ?)",
+        _prepare_pilots,
+    )
+
+
+def import_flights(
+    conn: sqlite3.Connection, records: Iterable[Record], chunk_size: int = 5000
+) -> ImportResult:
+    """Insert flights in chunks.
+
+    Rows with unknown airports or pilots are rejected, and so are those that
+    would book a pilot on two overlapping flights.
+    """
+    return _load(
+        conn,
+        records,
+        chunk_size,
+        """
+        INSERT INTO flights (
+            flight_number,
+            origin_airport_code,
+            destination_airport_code,
+            scheduled_departure_time,
+            estimated_arrival_time,
+            departure_time,
+            arrival_time,
+            status,
+            pilot_id,
+            company
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        _prepare_flights,
+        _deferred_flight_triggers,
+        _pilot_conflicts,
+    )
@@ -0,0 +1,279 @@
+import asyncio
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from flight_manager.models.db import ConnectionPool
+from flight_manager.models.flight import FlightStatus
+from flight_manager.models.timestamps import from_epoch, to_epoch
+
+# Flight columns copied into every change: the row after an insert or update,
+# or before a delete, so consumers rarely need to read the flight itself.
+LOGGED_COLUMNS = (
+    "flight_number",
+    "origin_airport_code",
+    "destination_airport_code",
+    "scheduled_departure_time",
+    "estimated_arrival_time",
+    "departure_time",
+    "arrival_time",
+    "status",
+    "pilot_id",
+    "company",
+)
+
+DEFAULT_PAGE_SIZE = 500
+
+_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def _log(row: str, operation: str) -> str:
+    values = ", ".join(f"{row}.{column}" for column in LOGGED_COLUMNS)
+    return f"""
+        INSERT INTO flight_changes
+            (changed_at, operation, flight_id, {", ".join(LOGGED_COLUMNS)})
+        VALUES ({_NOW}, '{operation}', {row}.flight_id, {values});
+    """
+
+
+# seq is AUTOINCREMENT so a number is never handed out twice, even after the
+# newest entries are pruned. SQLite has one writer at a time, so entries
+# become visible in seq order and a reader that resumes after the last seq it
+# saw cannot miss one.
+_TABLE = """
+    CREATE TABLE IF NOT EXISTS flight_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        changed_at INTEGER NOT NULL,
+        operation TEXT NOT NULL,
+        flight_id INTEGER NOT NULL,
+        flight_number TEXT NOT NULL,
+        origin_airport_code TEXT NOT NULL,
+        destination_airport_code TEXT NOT NULL,
+        scheduled_departure_time INTEGER NOT NULL,
+        estimated_arrival_time INTEGER NOT NULL,
+        departure_time INTEGER,
+        arrival_time INTEGER,
+        status TEXT NOT NULL,
+        pilot_id TEXT,
+        company TEXT NOT NULL
+    )
+"""
+
+_INSERT_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS flights_changes_insert AFTER INSERT ON flights
+    BEGIN
+        {_log("new", "insert")}
+    END
+"""
+
+# Saving a flight can write columns that end up unchanged; those are skipped.
+_CHANGED = " OR ".join(f"old.{column} IS NOT new.{column}" for column in LOGGED_COLUMNS)
+
+_TRIGGERS = (
+    _INSERT_TRIGGER,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS flights_changes_update
+    AFTER UPDATE OF {", ".join(LOGGED_COLUMNS)} ON flights
+    WHEN {_CHANGED}
+    BEGIN
+        {_log("new", "update")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS flights_changes_delete AFTER DELETE ON flights
+    BEGIN
+        {_log("old", "delete")}
+    END
+    """,
+)
+
+
+def create_change_log(conn: sqlite3.Connection) -> None:
+    """Create the flight_changes table and the triggers that append to it"""
+    conn.execute(_TABLE)
+    for trigger in _TRIGGERS:
+        conn.execute(trigger)
+
+
+@contextmanager
+def deferred_changes(conn: sqlite3.Connection) -> Iterator[None]:
+    """Log flights inserted inside the block with one statement at the end.
+
+    Works like search.deferred_indexing; the entries are written in
+    flight_id order, the order the rows were inserted.
+    """
+    last_id = conn.execute(
+        "SELECT IFNULL(MAX(flight_id), 0) FROM flights"
+    ).fetchone()[0]
+    conn.execute("DROP TRIGGER IF EXISTS flights_changes_insert")
+    try:
+        yield
+        conn.execute(
+            f"""
+            INSERT INTO flight_changes
+                (changed_at, operation, flight_id, {", ".join(LOGGED_COLUMNS)})
+            SELECT {_NOW}, 'insert', flight_id, {", ".join(LOGGED_COLUMNS)}
+            FROM flights
+            WHERE flight_id > ?
+            ORDER BY flight_id
+        """,
+            (last_id,),
+        )
+    finally:
+        conn.execute(_INSERT_TRIGGER)
+
+
+class ChangeOperation(Enum):
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+@dataclass
+class FlightChange:
+    seq: int
+    changed_at: datetime
+    operation: ChangeOperation
+    flight_id: int
+    flight_number: str
+    origin_airport_code: str
+    destination_airport_code: str
+    scheduled_departure_time: datetime
+    estimated_arrival_time: datetime
+    departure_time: Optional[datetime]
+    arrival_time: Optional[datetime]
+    status: FlightStatus
+    pilot_id: Optional[str]
+    company: str
+
+    @classmethod
+    def _from_row(cls, row: tuple) -> "FlightChange":
+        return cls(
+            seq=row[0],
+            changed_at=from_epoch(row[1]),
+            operation=ChangeOperation(row[2]),
+            flight_id=row[3],
+            flight_number=row[4],
+            origin_airport_code=row[5],
+            destination_airport_code=row[6],
+            scheduled_departure_time=from_epoch(row[7]),
+            estimated_arrival_time=from_epoch(row[8]),
+            departure_time=from_epoch(row[9]),
+            arrival_time=from_epoch(row[10]),
+            status=FlightStatus(row[11]),
+            pilot_id=row[12],
+            company=row[13],
+        )
+
+
+@dataclass
+class ChangePage:
+    changes: List[FlightChange]
+    # Pass as ``since`` to read on from the end of this page. With an airport
+    # filter it can be past the last returned change, as the entries in
+    # between were read and did not match.
+    last_seq: int
+
+
+def latest_seq(conn: sqlite3.Connection) -> int:
+    """The seq of the newest change ever logged, 0 if there has been none"""
+    row = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'flight_changes'"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def read_changes(
+    conn: sqlite3.Connection,
+    since: int = 0,
+    airport_code: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> ChangePage:
+    """Return up to ``limit`` changes logged after seq ``since``, oldest first.
+
+    Only flights from or to ``airport_code`` are returned if it is given.
+    Reading is a range scan on seq, so asking again with the page's
+    ``last_seq`` costs next to nothing while there is nothing new.
+    """
+    # Bound the scan first; entries committed while it runs are left for the
+    # next page instead of being skipped by an advanced last_seq.
+    newest = latest_seq(conn)
+    query = f"""
+        SELECT seq, changed_at, operation, flight_id, {", ".join(LOGGED_COLUMNS)}
+        FROM flight_changes
+        WHERE seq > ? AND seq <= ?
+    """
+    params: List[Any] = [since, newest]
+    if airport_code is not None:
+        query += " AND (origin_airport_code = ? OR destination_airport_code = ?)"
+        params += [airport_code, airport_code]
+    query += " ORDER BY seq LIMIT ?"
+    params.append(limit)
+
+    changes = [FlightChange._from_row(row) for row in conn.execute(query, params)]
+    if len(changes) == limit:
+        return ChangePage(changes, changes[-1].seq)
+    return ChangePage(changes, max(since, newest))
+
+
+def follow_changes(
+    conn: sqlite3.Connection,
+    since: Optional[int] = None,
+    airport_code: Optional[str] = None,
+    poll_interval: float = 1.0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[FlightChange]:
+    """Yield changes as they are logged, polling every ``poll_interval`` seconds.
+
+    Starts after seq ``since``, or with the next change if it is None. Runs
+    until the caller stops iterating. ``conn`` must not be inside a
+    transaction, or it keeps reading the same snapshot.
+    """
+    if since is None:
+        since = latest_seq(conn)
+    while True:
+        page = read_changes(conn, since, airport_code, page_size)
+        yield from page.changes
+        since = page.last_seq
+        if len(page.changes) < page_size:
+            time.sleep(poll_interval)
+
+
+async def subscribe(
+    pool: ConnectionPool,
+    since: Optional[int] = None,
+    airport_code: Optional[str] = None,
+    poll_interval: float = 1.0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> AsyncIterator[FlightChange]:
+    """Async version of follow_changes that reads on a worker thread"""
+
+    def start() -> int:
+        with pool.connection() as conn:
+            return latest_seq(conn)
+
+    def read(since: int) -> ChangePage:
+        with pool.connection() as conn:
+            return read_changes(conn, since, airport_code, page_size)
+
+    if since is None:
+        since = await asyncio.to_thread(start)
+    while True:
+        page = await asyncio.to_thread(read, since)
+        for change in page.changes:
+            yield change
+        since = page.last_seq
+        if len(page.changes) < page_size:
+            await asyncio.sleep(poll_interval)
+
+
+def prune_changes(conn: sqlite3.Connection, before: datetime) -> int:
+    """Delete changes logged before ``before`` and return how many were removed"""
+    cursor = conn.execute(
+        "DELETE FROM flight_changes WHERE changed_at < ?", (to_epoch(before),)
+    )
+    return cursor.rowcount
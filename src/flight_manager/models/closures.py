@@ -0,0 +1,127 @@
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from flight_manager.models.airports import AirportStatus
+from flight_manager.models.db import transaction
+from flight_manager.models.flight import STATUS_TRANSITIONS, FlightStatus
+from flight_manager.models.timestamps import to_epoch
+
+# Airport statuses that hold up the flights departing from or arriving at it.
+DISRUPTED_STATUSES = (AirportStatus.WARNING, AirportStatus.CLOSED)
+
+# Flights that have not left yet; those in the air keep their status.
+_DELAYABLE = tuple(
+    status
+    for status, following in STATUS_TRANSITIONS.items()
+    if FlightStatus.DELAYED in following
+)
+
+# One range scan of idx_flights_origin and one of idx_flights_destination.
+_AFFECTED = """
+    SELECT flight_id, status, company, pilot_id FROM flights
+    WHERE origin_airport_code = :code
+        AND scheduled_departure_time >= :now
+        AND status IN ({statuses})
+    UNION
+    SELECT flight_id, status, company, pilot_id FROM flights
+    WHERE destination_airport_code = :code
+        AND scheduled_departure_time >= :now
+        AND status IN ({statuses})
+"""
+
+
+# The flights delay_flights_at delayed, so a sweep boards only those again
+# once the airports are clear, and not flights delayed for other reasons. A
+# row goes when its flight leaves DELAYED or is deleted.
+_CLOSURE_DELAYS = (
+    """
+    CREATE TABLE IF NOT EXISTS closure_delays (
+        flight_id INTEGER PRIMARY KEY,
+        airport_code TEXT NOT NULL
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS flights_closure_delays_update
+    AFTER UPDATE OF status ON flights
+    WHEN new.status != '{FlightStatus.DELAYED.value}'
+    BEGIN
+        DELETE FROM closure_delays WHERE flight_id = new.flight_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_closure_delays_delete
+    AFTER DELETE ON flights
+    BEGIN
+        DELETE FROM closure_delays WHERE flight_id = old.flight_id;
+    END
+    """,
+)
+
+
+def create_closure_delays(conn: sqlite3.Connection) -> None:
+    """Create the closure_delays table and the triggers that clear it"""
+    for statement in _CLOSURE_DELAYS:
+        conn.execute(statement)
+
+
+def _values(statuses: Tuple[FlightStatus, ...]) -> str:
+    return ", ".join(f"'{status.value}'" for status in statuses)
+
+
+@dataclass
+class ClosureImpact:
+    """The future flights held up by a disruption at ``airport_code``"""
+
+    airport_code: str
+    now: datetime
+    # Flights from or to the airport that have not departed, including those
+    # that were delayed already.
+    flights: int
+    # How many of them this disruption moved to DELAYED.
+    delayed: int
+    companies: List[str]
+    pilots: List[str]
+
+
+def delay_flights_at(
+    conn: sqlite3.Connection, airport_code: str, now: Optional[datetime] = None
+) -> ClosureImpact:
+    """Mark every flight from or to the airport departing from ``now`` on DELAYED.
+
+    The flights are found with the origin and destination indexes and
+    updated with one statement, in a single transaction. They are recorded
+    in closure_delays so a sweep boards them again once the airport clears.
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    params = {"code": airport_code, "now": to_epoch(now)}
+    affected = _AFFECTED.format(statuses=_values((*_DELAYABLE, FlightStatus.DELAYED)))
+    delayable = _AFFECTED.format(statuses=_values(_DELAYABLE))
+
+    with transaction(conn):
+        rows = conn.execute(affected, params).fetchall()
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO closure_delays (flight_id, airport_code)
+            SELECT flight_id, :code FROM ({delayable})
+        """,
+            params,
+        )
+        conn.execute(
+            f"""
+            UPDATE flights SET status = '{FlightStatus.DELAYED.value}'
+            WHERE flight_id IN (SELECT flight_id FROM ({delayable}))
+        """,
+            params,
+        )
+
+    to_delay = [row for row in rows if row[1] != FlightStatus.DELAYED.value]
+    return ClosureImpact(
+        airport_code,
+        now,
+        flights=len(rows),
+        delayed=len(to_delay),
+        companies=sorted({row[2] for row in rows}),
+        pilots=sorted({row[3] for row in rows if row[3] is not None}),
+    )
@@ -1,19 +1,301 @@
+import atexit
+import itertools
 import sqlite3
-from typing import Iterator
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from contextlib import contextmanager
+from dataclasses import dataclass
+
+from flight_manager.models.identity import IdentityMap
+from flight_manager.models.profiling import ProfilingCursor, QueryProfiler
+
+DEFAULT_DB_PATH = "airline.db"
+
+_savepoint_ids = itertools.count(1)
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """PRAGMA settings applied to every pooled connection.
+
+    The default uses WAL journaling, which lets any number of readers run
+    alongside one writer, so a long listing no longer blocks updates from
+    another ``manage-flight`` process. ``synchronous = normal`` is safe in WAL
+    mode and only risks the last transactions on power loss, not corruption.
+
+    Read-only profiles open the file with ``mode=ro`` and skip anything that
+    would write. Use them for reporting processes, which then never take a
+    write lock and cannot modify data by accident::
+
+        with get_connection(profile=READ_ONLY_PROFILE) as conn:
+            ...
+    """
+
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    cache_size: int = -16000  # negative values are KiB, so about 16 MB
+    mmap_size: int = 128 * 1024 * 1024
+    busy_timeout: int = 5000  # milliseconds to wait for a lock
+    temp_store: str = "memory"
+    read_only: bool = False
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        if not self.read_only:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+        conn.execute("PRAGMA foreign_keys = ON")
+
+
+DEFAULT_PROFILE = StorageProfile()
+READ_ONLY_PROFILE = StorageProfile(read_only=True)
+# SQLite's own defaults, kept for comparison in benchmarks.
+LEGACY_PROFILE = StorageProfile(
+    journal_mode="delete",
+    synchronous="full",
+    cache_size=-2000,
+    mmap_size=0,
+    temp_store="default",
+)
+
+_default_profile = DEFAULT_PROFILE
+
+
+def set_default_profile(profile: StorageProfile) -> None:
+    """Use ``profile`` for connections that do not ask for one explicitly"""
+    global _default_profile
+    _default_profile = profile
+
+
+_profiler: Optional[QueryProfiler] = None
+
+
+def enable_profiling(
+    slow_ms: float = 100.0, explain: bool = True, report_path: Optional[str] = None
+) -> QueryProfiler:
+    """Time every statement on pooled connections until the process exits.
+
+    If ``report_path`` is given the JSON summary is written there on exit, or
+    to stderr when it is ``-``.
+    """
+    global _profiler
+    _profiler = QueryProfiler(slow_ms, explain)
+
+    if report_path is not None:
+        profiler = _profiler
+
+        @atexit.register
+        def write_report() -> None:
+            if report_path == "-":
+                profiler.report(sys.stderr)
+            else:
+                with open(report_path, "w", encoding="utf-8") as f:
+                    profiler.report(f)
+
+    return _profiler
+
+
+def disable_profiling() -> Optional[QueryProfiler]:
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+class Connection(sqlite3.Connection):
+    """sqlite3 connection that carries the identity map of its session.
+
+    While profiling is enabled, cursors and the execute shortcuts go through
+    ProfilingCursor so each statement is timed.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.identity_map = IdentityMap()
+
+    def cursor(self, factory: Optional[type] = None) -> sqlite3.Cursor:
+        if factory is not None:
+            return super().cursor(factory)
+        if _profiler is None:
+            return super().cursor()
+        cursor = super().cursor(ProfilingCursor)
+        cursor.profiler = _profiler
+        return cursor
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        if _profiler is None:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        if _profiler is None:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+@dataclass
+class PoolStats:
+    opened: int = 0
+    reused: int = 0
+    nested: int = 0
+    waits: int = 0
+
+
+class ConnectionPool:
+    """Keeps warm connections to one database and hands them out per thread"""
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        max_size: int = 5,
+        profile: StorageProfile = DEFAULT_PROFILE,
+    ) -> None:
+        self.db_path = db_path
+        self.max_size = max_size
+        self.profile = profile
+        self.stats = PoolStats()
+        self._idle: List[sqlite3.Connection] = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.profile.read_only:
+            conn = sqlite3.connect(
+                Path(self.db_path).resolve().as_uri() + "?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                factory=Connection,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path, check_same_thread=False, factory=Connection
+            )
+        self.profile.apply(conn)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._cond:
+            while not self._idle and self._size >= self.max_size:
+                self.stats.waits += 1
+                self._cond.wait()
+            if self._idle:
+                self.stats.reused += 1
+                return self._idle.pop()
+            self._size += 1
+            self.stats.opened += 1
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.identity_map.clear()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def active(self) -> Optional[sqlite3.Connection]:
+        """Return the connection currently checked out by this thread, if any"""
+        return getattr(self._local, "conn", None)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self.active()
+        if conn is not None:
+            with self._cond:
+                self.stats.nested += 1
+            yield conn
+            return
+
+        conn = self.acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self.release(conn)
+
+    def close(self) -> None:
+        with self._cond:
+            for conn in self._idle:
+                conn.close()
+            self._size -= len(self._idle)
+            self._idle.clear()
+
+
+_pools: Dict[Tuple[str, StorageProfile], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    db_path: str = DEFAULT_DB_PATH, profile: Optional[StorageProfile] = None
+) -> ConnectionPool:
+    key = (db_path, profile or _default_profile)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path, profile=key[1])
+        return pool
+
+
+@atexit.register
+def close_all() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+
 
 @contextmanager
-def get_connection(db_path: str = "airline.db") -> Iterator[sqlite3.Connection]:
-    conn = sqlite3.connect(db_path)
-    conn.execute("PRAGMA foreign_keys = ON")
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run a block inside a savepoint so it can roll back without the caller"""
+    name = f"sp_{next(_savepoint_ids)}"
+    conn.execute(f"SAVEPOINT {name}")
     try:
         yield conn
-        conn.commit()
-    except (ValueError, KeyError) as e:
-        conn.rollback()
-        print(f"\n{e}")
-    except Exception:
-        conn.rollback()
+    except BaseException:
+        session = getattr(conn, "identity_map", None)
+        if session is not None:
+            session.clear()
+        conn.execute(f"ROLLBACK TO {name}")
+        conn.execute(f"RELEASE {name}")
         raise
-    finally:
-        conn.close()
+    else:
+        conn.execute(f"RELEASE {name}")
+
+
+@contextmanager
+def get_connection(
+    db_path: str = DEFAULT_DB_PATH, profile: Optional[StorageProfile] = None
+) -> Iterator[sqlite3.Connection]:
+    pool = get_pool(db_path, profile)
+
+    if pool.active() is not None:
+        with pool.connection() as conn:
+            try:
+                with transaction(conn):
+                    yield conn
+            except (ValueError, KeyError) as e:
+                print(f"\n{e}")
+        return
+
+    with pool.connection() as conn:
+        try:
+            yield conn
+            conn.commit()
+        except (ValueError, KeyError) as e:
+            conn.rollback()
+            print(f"\n{e}")
+        except Exception:
+            conn.rollback()
+            raise
@@ -1,11 +1,32 @@
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 import sqlite3
 
 from flight_manager.models.pilot import Pilot
 from flight_manager.models.airports import Airport
+from flight_manager.models.identity import IdentityMap, identity_map
+from flight_manager.models.tracking import Tracked, as_is
+from flight_manager.models.timestamps import LazyDateTime, from_epoch, to_epoch
+from flight_manager.models.db import transaction
+from flight_manager.models.scheduling import ScheduleConflictError, find_conflicts
+from flight_manager.models.search import (
+    create_search_index,
+    like_condition,
+    text_condition,
+)
 
 
 class FlightStatus(Enum):
@@ -17,20 +38,147 @@ class FlightStatus(Enum):
     ARRIVED = "arrived"
 
 
+# The statuses a flight may move to from each status, next step first. A
+# delayed flight goes back to pending if it is rescheduled. Every departure
+# passes through boarding, so record_departure boards a pending or delayed
+# flight first; record_arrival may skip alight. Keeping the same status is
+# always allowed.
+STATUS_TRANSITIONS: Dict[FlightStatus, Tuple[FlightStatus, ...]] = {
+    FlightStatus.PENDING: (FlightStatus.BOARDING, FlightStatus.DELAYED),
+    FlightStatus.BOARDING: (FlightStatus.IN_FLIGHT, FlightStatus.DELAYED),
+    FlightStatus.DELAYED: (FlightStatus.BOARDING, FlightStatus.PENDING),
+    FlightStatus.IN_FLIGHT: (FlightStatus.ALIGHT, FlightStatus.ARRIVED),
+    FlightStatus.ALIGHT: (FlightStatus.ARRIVED,),
+    FlightStatus.ARRIVED: (),
+}
+
+
+def can_transition(current: FlightStatus, new: FlightStatus) -> bool:
+    return new == current or new in STATUS_TRANSITIONS[current]
+
+
+class InvalidTransitionError(ValueError):
+    def __init__(
+        self, flight_id: Optional[int], current: FlightStatus, new: FlightStatus
+    ) -> None:
+        allowed = ", ".join(status.value for status in STATUS_TRANSITIONS[current])
+        super().__init__(
+            f"flight {flight_id} cannot go from {current.value} to {new.value}"
+            f" (allowed: {allowed or 'none'})"
+        )
+        self.flight_id = flight_id
+        self.current = current
+        self.new = new
+
+
+# Columns a listing can project, mapped to the expression that selects them.
+# Names follow the flights table; joined columns are prefixed by their table.
+ROW_COLUMNS: Dict[str, str] = {
+    "flight_id": "f.flight_id",
+    "flight_number": "f.flight_number",
+    "origin_airport_code": "f.origin_airport_code",
+    "destination_airport_code": "f.destination_airport_code",
+    "scheduled_departure_time": "f.scheduled_departure_time",
+    "estimated_arrival_time": "f.estimated_arrival_time",
+    "departure_time": "f.departure_time",
+    "arrival_time": "f.arrival_time",
+    "status": "f.status",
+    "pilot_id": "f.pilot_id",
+    "company": "f.company",
+    "origin_airport_name": "a1.name",
+    "destination_airport_name": "a2.name",
+    "pilot_first_name": "p.first_name",
+    "pilot_last_name": "p.last_name",
+}
+
+# Columns that decide whether a pilot's flights overlap.
+_SCHEDULE_COLUMNS = {"pilot_id", "scheduled_departure_time", "estimated_arrival_time"}
+
+_ROW_JOINS = {
+    "a1.": "JOIN airports a1 ON f.origin_airport_code = a1.code",
+    "a2.": "JOIN airports a2 ON f.destination_airport_code = a2.code",
+    "p.": "LEFT JOIN pilots p ON f.pilot_id = p.pilot_id",
+}
+
+_ROW_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "scheduled_departure_time": from_epoch,
+    "estimated_arrival_time": from_epoch,
+    "departure_time": from_epoch,
+    "arrival_time": from_epoch,
+    "status": FlightStatus,
+}
+
+
+class FlightRow:
+    """Read-only view over one result tuple of a projected flight listing.
+
+    Only the projected columns are available. Values are converted when they
+    are read (timestamps to ``datetime``, status to ``FlightStatus``), so a
+    row costs one small object on top of the tuple SQLite already returns.
+    """
+
+    __slots__ = ("_row", "_fields")
+
+    def __init__(self, row: tuple, fields: Dict[str, int]) -> None:
+        self._row = row
+        self._fields = fields
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            value = self._row[self._fields[name]]
+        except KeyError:
+            raise AttributeError(
+                f"{name!r} is not in this projection of flights"
+            ) from None
+        convert = _ROW_CONVERTERS.get(name)
+        return value if convert is None or value is None else convert(value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """All projected columns by name, converted in one pass"""
+        values = {}
+        for name, index in self._fields.items():
+            value = self._row[index]
+            convert = _ROW_CONVERTERS.get(name)
+            if convert is not None and value is not None:
+                value = convert(value)
+            values[name] = value
+        return values
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"FlightRow({values})"
+
+
 @dataclass
-class Flight:
+class Flight(Tracked):
     flight_id: int
     flight_number: str
     origin_airport: Airport
     destination_airport: Airport
-    scheduled_departure_time: datetime
-    estimated_arrival_time: datetime
-    departure_time: Optional[datetime]
-    arrival_time: Optional[datetime]
+    scheduled_departure_time: datetime = LazyDateTime()
+    estimated_arrival_time: datetime = LazyDateTime()
+    departure_time: Optional[datetime] = LazyDateTime()
+    arrival_time: Optional[datetime] = LazyDateTime()
     status: FlightStatus
     pilot: Optional[Pilot]
     company: str
 
+    _columns = {
+        "flight_number": ("flight_number", as_is),
+        "origin_airport": ("origin_airport_code", lambda airport: airport.code),
+        "destination_airport": (
+            "destination_airport_code",
+            lambda airport: airport.code,
+        ),
+        "scheduled_departure_time": ("scheduled_departure_time", to_epoch),
+        "estimated_arrival_time": ("estimated_arrival_time", to_epoch),
+        "departure_time": ("departure_time", to_epoch),
+        "arrival_time": ("arrival_time", to_epoch),
+        "status": ("status", lambda status: status.value),
+        "pilot": ("pilot_id", lambda pilot: pilot.pilot_id if pilot else None),
+        "company": ("company", as_is),
+    }
+
     @classmethod
     def create_table(cls, conn: sqlite3.Connection) -> None:
         conn.execute(
@@ -40,10 +188,10 @@ class Flight:
                 flight_number TEXT NOT NULL,
                 origin_airport_code TEXT NOT NULL,
                 destination_airport_code TEXT NOT NULL,
-                scheduled_departure_time TEXT NOT NULL,
-                estimated_arrival_time TEXT NOT NULL,
-                departure_time TEXT,
-                arrival_time TEXT,
+                scheduled_departure_time INTEGER NOT NULL,
+                estimated_arrival_time INTEGER NOT NULL,
+                departure_time INTEGER,
+                arrival_time INTEGER,
                 status TEXT NOT NULL,
                 pilot_id TEXT,
                 company TEXT NOT NULL,
@@ -53,73 +201,156 @@ class Flight:
             )
         """
         )
+        cls.create_indexes(conn)
+        create_search_index(conn)
+
+    @classmethod
+    def create_indexes(cls, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_flights_departure
+            ON flights (scheduled_departure_time)
+        """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_flights_arrival
+            ON flights (estimated_arrival_time)
+        """
+        )
+        for column, name in (
+            ("pilot_id", "idx_flights_pilot"),
+            ("origin_airport_code", "idx_flights_origin"),
+            ("destination_airport_code", "idx_flights_destination"),
+            ("status", "idx_flights_status"),
+        ):
+            conn.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS {name}
+                ON flights ({column}, scheduled_departure_time)
+            """
+            )
 
     @classmethod
     def drop_table(cls, conn: sqlite3.Connection) -> None:
         conn.execute("DROP TABLE IF EXISTS flights")
 
     def save(self, conn: sqlite3.Connection) -> None:
-        cursor = conn.cursor()
-        if self.flight_id:  
-            cursor.execute(
-                """
-                UPDATE flights SET
-                    flight_number = ?,
-                    origin_airport_code = ?,
-                    destination_airport_code = ?,
-                    scheduled_departure_time = ?,
-                    estimated_arrival_time = ?,
-                    departure_time = ?,
-                    arrival_time = ?,
-                    status = ?,
-                    pilot_id = ?,
-                    company = ?
-                WHERE flight_id = ?
-            """,
-                (
-                    self.flight_number,
-                    self.origin_airport.code,
-                    self.destination_airport.code,
-                    self.scheduled_departure_time.isoformat(),
-                    self.estimated_arrival_time.isoformat(),
-                    self.departure_time.isoformat() if self.departure_time else None,
-                    self.arrival_time.isoformat() if self.arrival_time else None,
-                    self.status.value,
-                    self.pilot.pilot_id if self.pilot else None,
-                    self.company,
-                    self.flight_id,
-                ),
-            )
-        else:  
-            cursor.execute(
-                """
-                INSERT INTO flights (
-                    flight_number,
-                    origin_airport_code,
-                    destination_airport_code,
-                    scheduled_departure_time,
-                    estimated_arrival_time,
-                    departure_time,
-                    arrival_time,
-                    status,
-                    pilot_id,
-                    company
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """Insert the flight, or write the columns changed since it was loaded.
+
+        Raises ScheduleConflictError, without writing, if the change would
+        have the pilot flying another flight at the same time, and
+        InvalidTransitionError if the status change is not in
+        STATUS_TRANSITIONS.
+        """
+        self.check_transition()
+        if self._reschedules():
+            self.check_schedule(conn)
+        self._write(conn)
+
+    def _reschedules(self) -> bool:
+        """Whether the pilot or the scheduled interval is new or changed"""
+        if self.pilot is None:
+            return False
+        if not self.flight_id:
+            return True
+        return not _SCHEDULE_COLUMNS.isdisjoint(self.changed_columns())
+
+    @property
+    def saved_status(self) -> FlightStatus:
+        """The status as last loaded or saved, where a status change starts"""
+        if not self.is_tracked:
+            return self.status
+        return self._original.get("status", self.status)
+
+    def check_transition(self) -> None:
+        """Raise InvalidTransitionError if the status moved along no allowed edge"""
+        if not can_transition(self.saved_status, self.status):
+            raise InvalidTransitionError(self.flight_id, self.saved_status, self.status)
+
+    def check_schedule(self, conn: sqlite3.Connection) -> None:
+        """Raise ScheduleConflictError if the pilot is busy during this flight"""
+        if self.pilot is None:
+            return
+        conflicts = find_conflicts(
+            conn,
+            self.pilot.pilot_id,
+            self.scheduled_departure_time,
+            self.estimated_arrival_time,
+            self.flight_id,
+        )
+        if conflicts:
+            raise ScheduleConflictError(conflicts)
+
+    def _write(self, conn: sqlite3.Connection) -> None:
+        if self.flight_id:
+            changes = self.changed_columns()
+            if changes:
+                conn.execute(
+                    self._update_sql(tuple(changes)),
+                    (*changes.values(), self.flight_id),
+                )
+        else:
+            values = self.column_values()
+            cursor = conn.execute(
+                f"""
+                INSERT INTO flights ({", ".join(values)})
+                VALUES ({", ".join("?" * len(values))})
             """,
-                (
-                    self.flight_number,
-                    self.origin_airport.code,
-                    self.destination_airport.code,
-                    self.scheduled_departure_time.isoformat(),
-                    self.estimated_arrival_time.isoformat(),
-                    self.departure_time.isoformat() if self.departure_time else None,
-                    self.arrival_time.isoformat() if self.arrival_time else None,
-                    self.status.value,
-                    self.pilot.pilot_id if self.pilot else None,
-                    self.company,
-                ),
+                tuple(values.values()),
             )
             self.flight_id = cursor.lastrowid
+        self.mark_clean()
+
+    @staticmethod
+    def _update_sql(columns: Tuple[str, ...]) -> str:
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        return f"UPDATE flights SET {assignments} WHERE flight_id = ?"
+
+    @classmethod
+    def save_many(cls, conn: sqlite3.Connection, flights: Iterable["Flight"]) -> int:
+        """Save flights in one transaction and return how many were written.
+
+        Updates that touch the same set of columns are sent as one executemany,
+        and flights with no changes are skipped entirely. Pilot schedules are
+        checked once every flight is written, so flights in the batch may swap
+        slots; any conflict raises ScheduleConflictError and nothing is saved.
+        Status changes are checked first, as in ``save``.
+        """
+        flights = list(flights)
+        for flight in flights:
+            flight.check_transition()
+        updates: Dict[Tuple[str, ...], List[tuple]] = {}
+        rescheduled = [flight for flight in flights if flight._reschedules()]
+        inserted = []
+        written = 0
+
+        try:
+            with transaction(conn):
+                for flight in flights:
+                    if not flight.flight_id:
+                        flight._write(conn)
+                        inserted.append(flight)
+                        written += 1
+                        continue
+                    changes = flight.changed_columns()
+                    if changes:
+                        updates.setdefault(tuple(changes), []).append(
+                            (*changes.values(), flight.flight_id)
+                        )
+                for columns, rows in updates.items():
+                    conn.executemany(cls._update_sql(columns), rows)
+                    written += len(rows)
+                for flight in rescheduled:
+                    flight.check_schedule(conn)
+        except Exception:
+            for flight in inserted:
+                flight.flight_id = None
+            raise
+
+        for flight in flights:
+            flight.mark_clean()
+        return written
 
     @classmethod
     def create(
@@ -150,103 +381,94 @@ class Flight:
         flight.save(conn)
         return flight
 
-    @classmethod
-    def get_by_id(cls, conn: sqlite3.Connection, flight_id: int) -> Optional["Flight"]:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT 
-                f.flight_id,
-                f.flight_number,
-                f.scheduled_departure_time,
-                f.estimated_arrival_time,
-                f.departure_time,
-                f.arrival_time,
-                f.status,
-                f.company,
-                a1.code, a1.name, a1.address, a1.status,
-                a2.code, a2.name, a2.address, a2.status,
-                p.pilot_id, p.first_name, p.last_name
-            FROM flights f
-            JOIN airports a1 ON f.origin_airport_code = a1.code
-            JOIN airports a2 ON f.destination_airport_code = a2.code
-            LEFT JOIN pilots p ON f.pilot_id = p.pilot_id
-            WHERE f.flight_id = ?
-        """,
-            (flight_id,),
-        )
+    _SELECT = """
+        SELECT 
+            f.flight_id,
+            f.flight_number,
+            f.scheduled_departure_time,
+            f.estimated_arrival_time,
+            f.departure_time,
+            f.arrival_time,
+            f.status,
+            f.company,
+            a1.code, a1.name, a1.address, a1.status,
+            a2.code, a2.name, a2.address, a2.status,
+            p.pilot_id, p.first_name, p.last_name
+        FROM flights f
+        JOIN airports a1 ON f.origin_airport_code = a1.code
+        JOIN airports a2 ON f.destination_airport_code = a2.code
+        LEFT JOIN pilots p ON f.pilot_id = p.pilot_id
+    """
 
-        row = cursor.fetchone()
-        if not row:
-            return None
-
-        origin = Airport(row[8], row[9], row[10], row[11])
-        destination = Airport(row[12], row[13], row[14], row[15])
-        pilot = Pilot(row[16], row[17], row[18]) if row[16] else None
+    @classmethod
+    def _from_row(cls, row: tuple, session: IdentityMap) -> "Flight":
+        origin = session.intern(Airport, row, 8)
+        destination = session.intern(Airport, row, 12)
+        pilot = session.intern(Pilot, row, 16) if row[16] else None
 
-        return cls(
+        flight = cls(
             flight_id=row[0],
             flight_number=row[1],
             origin_airport=origin,
             destination_airport=destination,
-            scheduled_departure_time=datetime.fromisoformat(row[2]),
-            estimated_arrival_time=datetime.fromisoformat(row[3]),
-            departure_time=datetime.fromisoformat(row[4]) if row[4] else None,
-            arrival_time=datetime.fromisoformat(row[5]) if row[5] else None,
+            scheduled_departure_time=row[2],
+            estimated_arrival_time=row[3],
+            departure_time=row[4],
+            arrival_time=row[5],
             status=FlightStatus(row[6]),
             pilot=pilot,
             company=row[7],
         )
+        flight.mark_clean()
+        return flight
 
     @classmethod
-    def get_all(
+    def get_by_id(cls, conn: sqlite3.Connection, flight_id: int) -> Optional["Flight"]:
+        cursor = conn.cursor()
+        cursor.execute(cls._SELECT + " WHERE f.flight_id = ?", (flight_id,))
+
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return cls._from_row(row, identity_map(conn))
+
+    @classmethod
+    def _filter(
         cls,
-        conn: sqlite3.Connection,
         flight_number: Optional[str] = None,
         status: Optional[FlightStatus] = None,
         company: Optional[str] = None,
         pilot: Optional[Pilot] = None,
         origin_airport: Optional[Airport] = None,
-        destination_airport: Optional[Airport] = None
-    ) -> List["Flight"]:
-        cursor = conn.cursor()
-
-        
-        query = """
-            SELECT 
-                f.flight_id,
-                f.flight_number,
-                f.scheduled_departure_time,
-                f.estimated_arrival_time,
-                f.departure_time,
-                f.arrival_time,
-                f.status,
-                f.company,
-                a1.code, a1.name, a1.address, a1.status,
-                a2.code, a2.name, a2.address, a2.status,
-                p.pilot_id, p.first_name, p.last_name
-            FROM flights f
-            JOIN airports a1 ON f.origin_airport_code = a1.code
-            JOIN airports a2 ON f.destination_airport_code = a2.code
-            LEFT JOIN pilots p ON f.pilot_id = p.pilot_id
-        """
-
-        
+        destination_airport: Optional[Airport] = None,
+        departure_after: Optional[datetime] = None,
+        departure_before: Optional[datetime] = None,
+        arrival_after: Optional[datetime] = None,
+        arrival_before: Optional[datetime] = None,
+        q: Optional[str] = None,
+    ) -> Tuple[List[str], List[Any]]:
         conditions = []
         params = []
 
-        if flight_number is not None:
-            conditions.append("f.flight_number LIKE ?")
-            params.append(f"%{flight_number}%")
+        # Substring filters go through the flights_search trigram index.
+        for column, value in (
+            ("flight_number", flight_number),
+            ("company", company),
+        ):
+            if value is not None:
+                condition, values = like_condition(column, value)
+                conditions.append(condition)
+                params.extend(values)
+
+        if q:
+            condition, values = text_condition(q)
+            conditions.append(condition)
+            params.extend(values)
 
         if status is not None:
             conditions.append("f.status = ?")
             params.append(status.value)
 
-        if company is not None:
-            conditions.append("f.company LIKE ?")
-            params.append(f"%{company}%")
-
         if pilot is not None:
             conditions.append("f.pilot_id = ?")
             params.append(pilot.pilot_id)
@@ -259,35 +481,178 @@ class Flight:
             conditions.append("f.destination_airport_code = ?")
             params.append(destination_airport.code)
 
+        # Windows are half-open, [after, before), and each side is a range
+        # scan on the departure or arrival index.
+        for column, bound, operator in (
+            ("scheduled_departure_time", departure_after, ">="),
+            ("scheduled_departure_time", departure_before, "<"),
+            ("estimated_arrival_time", arrival_after, ">="),
+            ("estimated_arrival_time", arrival_before, "<"),
+        ):
+            if bound is not None:
+                conditions.append(f"f.{column} {operator} ?")
+                params.append(to_epoch(bound))
+
+        return conditions, params
+
+    @staticmethod
+    def _projection(columns: Sequence[str]) -> Tuple[str, Dict[str, int]]:
+        """Build the SELECT for a projection and the field positions in its rows.
+
+        The paging key columns are always selected so ``iter_all`` can resume
+        after the last row of a page.
+        """
+        unknown = [name for name in columns if name not in ROW_COLUMNS]
+        if unknown:
+            raise ValueError(f"unknown flight columns: {', '.join(unknown)}")
+
+        names = list(dict.fromkeys(columns))
+        for key in ("flight_id", "scheduled_departure_time"):
+            if key not in names:
+                names.append(key)
+        expressions = [ROW_COLUMNS[name] for name in names]
+        joins = [
+            join
+            for prefix, join in _ROW_JOINS.items()
+            if any(expression.startswith(prefix) for expression in expressions)
+        ]
+        query = f"SELECT {', '.join(expressions)} FROM flights f {' '.join(joins)}"
+        return query, {name: index for index, name in enumerate(names)}
+
+    @classmethod
+    def get_all(
+        cls,
+        conn: sqlite3.Connection,
+        flight_number: Optional[str] = None,
+        status: Optional[FlightStatus] = None,
+        company: Optional[str] = None,
+        pilot: Optional[Pilot] = None,
+        origin_airport: Optional[Airport] = None,
+        destination_airport: Optional[Airport] = None,
+        columns: Optional[Sequence[str]] = None,
+        departure_after: Optional[datetime] = None,
+        departure_before: Optional[datetime] = None,
+        arrival_after: Optional[datetime] = None,
+        arrival_before: Optional[datetime] = None,
+        q: Optional[str] = None,
+    ) -> Union[List["Flight"], List[FlightRow]]:
+        """Return matching flights in departure order.
+
+        With ``columns`` (names from ``ROW_COLUMNS``) only those columns are
+        read and each result is a lightweight ``FlightRow`` instead of a
+        ``Flight`` with its airports and pilot. The ``*_after``/``*_before``
+        bounds select scheduled departures or estimated arrivals in
+        ``[after, before)``. ``q`` matches text anywhere in the flight number,
+        company, pilot name or airport names.
+        """
+        cursor = conn.cursor()
+
+        conditions, params = cls._filter(
+            flight_number,
+            status,
+            company,
+            pilot,
+            origin_airport,
+            destination_airport,
+            departure_after,
+            departure_before,
+            arrival_after,
+            arrival_before,
+            q,
+        )
+
+        if columns is not None:
+            query, fields = cls._projection(columns)
+        else:
+            query = cls._SELECT
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
 
-        query += " ORDER BY f.scheduled_departure_time"
+        query += " ORDER BY f.scheduled_departure_time, f.flight_id"
 
         cursor.execute(query, params)
+        if columns is not None:
+            return [FlightRow(row, fields) for row in cursor.fetchall()]
+        session = identity_map(conn)
+        return [cls._from_row(row, session) for row in cursor.fetchall()]
 
-        flights = []
-        for row in cursor.fetchall():
-            origin = Airport(row[8], row[9], row[10], row[11])
-            destination = Airport(row[12], row[13], row[14], row[15])
-            pilot = Pilot(row[16], row[17], row[18]) if row[16] else None
-
-            flights.append(
-                cls(
-                    flight_id=row[0],
-                    flight_number=row[1],
-                    origin_airport=origin,
-                    destination_airport=destination,
-                    scheduled_departure_time=datetime.fromisoformat(row[2]),
-                    estimated_arrival_time=datetime.fromisoformat(row[3]),
-                    departure_time=datetime.fromisoformat(row[4]) if row[4] else None,
-                    arrival_time=datetime.fromisoformat(row[5]) if row[5] else None,
-                    status=FlightStatus(row[6]),
-                    pilot=pilot,
-                    company=row[7],
-                )
-            )
-        return flights
+    @classmethod
+    def iter_all(
+        cls,
+        conn: sqlite3.Connection,
+        flight_number: Optional[str] = None,
+        status: Optional[FlightStatus] = None,
+        company: Optional[str] = None,
+        pilot: Optional[Pilot] = None,
+        origin_airport: Optional[Airport] = None,
+        destination_airport: Optional[Airport] = None,
+        departure_after: Optional[datetime] = None,
+        departure_before: Optional[datetime] = None,
+        arrival_after: Optional[datetime] = None,
+        arrival_before: Optional[datetime] = None,
+        q: Optional[str] = None,
+        page_size: int = 500,
+        after: Optional[Union["Flight", FlightRow]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Iterator[Union["Flight", FlightRow]]:
+        """Stream flights in departure order, fetching one page at a time.
+
+        Pages are keyed on (scheduled_departure_time, flight_id), so each page
+        is an index range scan rather than an OFFSET. Pass the last flight seen
+        as ``after`` to resume a previous listing. ``columns`` projects the
+        listing onto ``FlightRow`` results as in ``get_all``.
+        """
+        conditions, params = cls._filter(
+            flight_number,
+            status,
+            company,
+            pilot,
+            origin_airport,
+            destination_airport,
+            departure_after,
+            departure_before,
+            arrival_after,
+            arrival_before,
+            q,
+        )
+        if columns is not None:
+            select, fields = cls._projection(columns)
+            departure = fields["scheduled_departure_time"]
+            flight_id = fields["flight_id"]
+        else:
+            select, departure, flight_id = cls._SELECT, 2, 0
+        first_page = select
+        if conditions:
+            first_page += " WHERE " + " AND ".join(conditions)
+        conditions.append(
+            "f.scheduled_departure_time >= ? AND "
+            "(f.scheduled_departure_time > ? OR f.flight_id > ?)"
+        )
+        next_page = select + " WHERE " + " AND ".join(conditions)
+        order = " ORDER BY f.scheduled_departure_time, f.flight_id LIMIT ?"
+
+        if after is not None:
+            query = next_page + order
+            keyset = [
+                to_epoch(after.scheduled_departure_time),
+                to_epoch(after.scheduled_departure_time),
+                after.flight_id,
+            ]
+        else:
+            query, keyset = first_page + order, []
+
+        session = identity_map(conn)
+        while True:
+            rows = conn.execute(query, [*params, *keyset, page_size]).fetchall()
+            if columns is not None:
+                yield from (FlightRow(row, fields) for row in rows)
+            else:
+                yield from (cls._from_row(row, session) for row in rows)
+            if len(rows) < page_size:
+                return
+            last = rows[-1]
+            query = next_page + order
+            keyset = [last[departure], last[departure], last[flight_id]]
 
     def delete(self, conn: sqlite3.Connection) -> None:
         if self.flight_id:
@@ -304,9 +669,18 @@ class Flight:
     def record_departure(
         self, conn: sqlite3.Connection, departure_time: datetime
     ) -> None:
-        self.departure_time = departure_time
-        self.status = FlightStatus.IN_FLIGHT
-        self.save(conn)
+        """Record the actual departure and put the flight in the air.
+
+        A pending or delayed flight is saved as boarding on the way, so the
+        change log shows both steps.
+        """
+        with transaction(conn):
+            if self.saved_status in (FlightStatus.PENDING, FlightStatus.DELAYED):
+                self.status = FlightStatus.BOARDING
+                self.save(conn)
+            self.departure_time = departure_time
+            self.status = FlightStatus.IN_FLIGHT
+            self.save(conn)
 
     def record_arrival(self, conn: sqlite3.Connection, arrival_time: datetime) -> None:
         self.arrival_time = arrival_time
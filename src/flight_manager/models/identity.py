@@ -0,0 +1,62 @@
+import sqlite3
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class IdentityMap:
+    """Hands out one model instance per primary key for the life of a session.
+
+    Models opt in by providing ``_key`` (the primary key attribute name) and a
+    ``_from_row(row, start)`` classmethod that builds an instance from the
+    columns of ``row`` beginning at ``start``, and are Tracked.
+    """
+
+    def __init__(self) -> None:
+        self._objects: Dict[Tuple[type, Any], Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def get(self, cls: Type[T], key: Any) -> Optional[T]:
+        return self._objects.get((cls, key))
+
+    def intern(self, cls: Type[T], row: tuple, start: int = 0) -> T:
+        """Return the session's instance for the row, creating it if needed.
+
+        A cached instance without unsaved changes is refreshed from ``row``,
+        so a query sees what is stored, including other connections' writes.
+        One with unsaved changes keeps them until it is saved or discarded.
+        """
+        key = (cls, row[start])
+        obj = self._objects.get(key)
+        if obj is None:
+            obj = self._objects[key] = cls._from_row(row, start)
+        elif not obj.changed_columns():
+            fresh = cls._from_row(row, start)
+            for name in cls._columns:
+                # Past the change tracking, as the instance stays clean.
+                object.__setattr__(obj, name, getattr(fresh, name))
+        return obj
+
+    def put(self, obj: Any) -> None:
+        self._objects[(type(obj), getattr(obj, obj._key))] = obj
+
+    def discard(self, cls: type, key: Any) -> None:
+        self._objects.pop((cls, key), None)
+
+    def clear(self) -> None:
+        self._objects.clear()
+
+
+def identity_map(conn: sqlite3.Connection) -> IdentityMap:
+    """Return the identity map for the session that owns ``conn``.
+
+    Pooled connections carry their own map, which is cleared when the
+    connection goes back to the pool. Plain sqlite3 connections get a fresh
+    map, so instances are only shared within a single call.
+    """
+    session = getattr(conn, "identity_map", None)
+    if session is None:
+        return IdentityMap()
+    return session
@@ -0,0 +1,650 @@
+import logging
+import sqlite3
+from itertools import islice
+from typing import Callable, List, Sequence, Tuple
+
+from flight_manager.models.airports import Airport
+from flight_manager.models.changes import create_change_log
+from flight_manager.models.closures import create_closure_delays
+from flight_manager.models.pilot import Pilot
+from flight_manager.models.flight import Flight
+from flight_manager.models.db import transaction
+from flight_manager.models.scheduling import find_all_conflicts
+from flight_manager.models.stats import create_stats_tables
+
+logger = logging.getLogger("flight_manager.migrations")
+
+Migration = Tuple[int, str, Callable[[sqlite3.Connection], None]]
+
+# How many overlapping pairs migration 8 lists in its warning.
+_REPORTED_OVERLAPS = 10
+
+# Each migration runs the statements as they were when it was added, so a
+# later change to a model cannot change what an old migration does. Copy the
+# SQL into a new migration instead of calling the models from here.
+
+_LOOKUP_INDEXES = (
+    """
+    CREATE INDEX IF NOT EXISTS idx_flights_departure
+    ON flights (scheduled_departure_time)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_flights_pilot
+    ON flights (pilot_id, scheduled_departure_time)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_flights_origin
+    ON flights (origin_airport_code, scheduled_departure_time)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_flights_destination
+    ON flights (destination_airport_code, scheduled_departure_time)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_flights_status
+    ON flights (status, scheduled_departure_time)
+    """,
+)
+
+_EPOCH_FLIGHTS = (
+    """
+    CREATE TABLE flights_new (
+        flight_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        flight_number TEXT NOT NULL,
+        origin_airport_code TEXT NOT NULL,
+        destination_airport_code TEXT NOT NULL,
+        scheduled_departure_time INTEGER NOT NULL,
+        estimated_arrival_time INTEGER NOT NULL,
+        departure_time INTEGER,
+        arrival_time INTEGER,
+        status TEXT NOT NULL,
+        pilot_id TEXT,
+        company TEXT NOT NULL,
+        FOREIGN KEY(origin_airport_code) REFERENCES airports(code),
+        FOREIGN KEY(destination_airport_code) REFERENCES airports(code),
+        FOREIGN KEY(pilot_id) REFERENCES pilots(pilot_id)
+    )
+    """,
+    # strftime('%s') reads ISO text as UTC, matching timestamps.to_epoch.
+    """
+    INSERT INTO flights_new
+    SELECT
+        flight_id,
+        flight_number,
+        origin_airport_code,
+        destination_airport_code,
+        CAST(strftime('%s', scheduled_departure_time) AS INTEGER),
+        CAST(strftime('%s', estimated_arrival_time) AS INTEGER),
+        CAST(strftime('%s', departure_time) AS INTEGER),
+        CAST(strftime('%s', arrival_time) AS INTEGER),
+        status,
+        pilot_id,
+        company
+    FROM flights
+    """,
+    "DROP TABLE flights",
+    "ALTER TABLE flights_new RENAME TO flights",
+)
+
+_ARRIVAL_INDEX = (
+    """
+    CREATE INDEX IF NOT EXISTS idx_flights_arrival
+    ON flights (estimated_arrival_time)
+    """,
+)
+
+_SEARCH_INDEX = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS flights_search
+    USING fts5(flight_number, company, pilot_name, origin_name, destination_name,
+        tokenize = 'trigram')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_insert AFTER INSERT ON flights
+    BEGIN
+        INSERT INTO flights_search
+            (rowid, flight_number, company, pilot_name, origin_name, destination_name)
+        VALUES (
+            new.flight_id,
+            new.flight_number,
+            new.company,
+            (SELECT first_name || ' ' || last_name FROM pilots
+             WHERE pilot_id = new.pilot_id),
+            (SELECT name FROM airports WHERE code = new.origin_airport_code),
+            (SELECT name FROM airports WHERE code = new.destination_airport_code)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_update
+    AFTER UPDATE OF flight_number, company, pilot_id, origin_airport_code,
+        destination_airport_code ON flights
+    BEGIN
+        DELETE FROM flights_search WHERE rowid = old.flight_id;
+        INSERT INTO flights_search
+            (rowid, flight_number, company, pilot_name, origin_name, destination_name)
+        VALUES (
+            new.flight_id,
+            new.flight_number,
+            new.company,
+            (SELECT first_name || ' ' || last_name FROM pilots
+             WHERE pilot_id = new.pilot_id),
+            (SELECT name FROM airports WHERE code = new.origin_airport_code),
+            (SELECT name FROM airports WHERE code = new.destination_airport_code)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_delete AFTER DELETE ON flights
+    BEGIN
+        DELETE FROM flights_search WHERE rowid = old.flight_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_pilot_update
+    AFTER UPDATE OF first_name, last_name ON pilots
+    BEGIN
+        UPDATE flights_search SET pilot_name = new.first_name || ' ' || new.last_name
+        WHERE rowid IN (SELECT flight_id FROM flights WHERE pilot_id = new.pilot_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_pilot_delete
+    AFTER DELETE ON pilots
+    BEGIN
+        UPDATE flights_search SET pilot_name = NULL
+        WHERE rowid IN (SELECT flight_id FROM flights WHERE pilot_id = old.pilot_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_airport_update
+    AFTER UPDATE OF name ON airports
+    BEGIN
+        UPDATE flights_search SET origin_name = new.name
+        WHERE rowid IN (
+            SELECT flight_id FROM flights WHERE origin_airport_code = new.code
+        );
+        UPDATE flights_search SET destination_name = new.name
+        WHERE rowid IN (
+            SELECT flight_id FROM flights WHERE destination_airport_code = new.code
+        );
+    END
+    """,
+    """
+    INSERT INTO flights_search
+        (rowid, flight_number, company, pilot_name, origin_name, destination_name)
+    SELECT
+        f.flight_id,
+        f.flight_number,
+        f.company,
+        (SELECT first_name || ' ' || last_name FROM pilots
+         WHERE pilot_id = f.pilot_id),
+        (SELECT name FROM airports WHERE code = f.origin_airport_code),
+        (SELECT name FROM airports WHERE code = f.destination_airport_code)
+    FROM flights f
+    """,
+)
+
+
+_STATS_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS company_stats (
+        company TEXT PRIMARY KEY,
+        flights INTEGER NOT NULL,
+        departed INTEGER NOT NULL,
+        delayed_departures INTEGER NOT NULL,
+        departure_delay INTEGER NOT NULL,
+        arrived INTEGER NOT NULL,
+        delayed_arrivals INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS airport_day_stats (
+        airport_code TEXT NOT NULL,
+        day INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        departures INTEGER NOT NULL,
+        arrivals INTEGER NOT NULL,
+        PRIMARY KEY (airport_code, day, status)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_stats_insert AFTER INSERT ON flights
+    BEGIN
+        INSERT INTO company_stats (company, flights, departed, delayed_departures,
+            departure_delay, arrived, delayed_arrivals)
+        VALUES (
+            new.company,
+            1 * (1),
+            1 * (new.departure_time IS NOT NULL),
+            1 * (IFNULL(
+                new.departure_time - new.scheduled_departure_time > 900, 0
+            )),
+            1 * (IFNULL(
+                MAX(new.departure_time - new.scheduled_departure_time, 0), 0
+            )),
+            1 * (new.arrival_time IS NOT NULL),
+            1 * (IFNULL(
+                new.arrival_time - new.estimated_arrival_time > 900, 0
+            ))
+        )
+        ON CONFLICT (company) DO UPDATE SET
+            flights = flights + excluded.flights,
+            departed = departed + excluded.departed,
+            delayed_departures = delayed_departures + excluded.delayed_departures,
+            departure_delay = departure_delay + excluded.departure_delay,
+            arrived = arrived + excluded.arrived,
+            delayed_arrivals = delayed_arrivals + excluded.delayed_arrivals;
+        INSERT INTO airport_day_stats
+            (airport_code, day, status, departures, arrivals)
+        VALUES
+            (new.origin_airport_code, new.scheduled_departure_time / 86400,
+                new.status, 1, 0),
+            (new.destination_airport_code, new.estimated_arrival_time / 86400,
+                new.status, 0, 1)
+        ON CONFLICT (airport_code, day, status) DO UPDATE SET
+            departures = departures + excluded.departures,
+            arrivals = arrivals + excluded.arrivals;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_stats_update
+    AFTER UPDATE OF company, status, origin_airport_code, destination_airport_code,
+        scheduled_departure_time, estimated_arrival_time, departure_time,
+        arrival_time ON flights
+    BEGIN
+        INSERT INTO company_stats (company, flights, departed, delayed_departures,
+            departure_delay, arrived, delayed_arrivals)
+        VALUES (
+            old.company,
+            -1 * (1),
+            -1 * (old.departure_time IS NOT NULL),
+            -1 * (IFNULL(
+                old.departure_time - old.scheduled_departure_time > 900, 0
+            )),
+            -1 * (IFNULL(
+                MAX(old.departure_time - old.scheduled_departure_time, 0), 0
+            )),
+            -1 * (old.arrival_time IS NOT NULL),
+            -1 * (IFNULL(
+                old.arrival_time - old.estimated_arrival_time > 900, 0
+            ))
+        )
+        ON CONFLICT (company) DO UPDATE SET
+            flights = flights + excluded.flights,
+            departed = departed + excluded.departed,
+            delayed_departures = delayed_departures + excluded.delayed_departures,
+            departure_delay = departure_delay + excluded.departure_delay,
+            arrived = arrived + excluded.arrived,
+            delayed_arrivals = delayed_arrivals + excluded.delayed_arrivals;
+        INSERT INTO airport_day_stats
+            (airport_code, day, status, departures, arrivals)
+        VALUES
+            (old.origin_airport_code, old.scheduled_departure_time / 86400,
+                old.status, -1, 0),
+            (old.destination_airport_code, old.estimated_arrival_time / 86400,
+                old.status, 0, -1)
+        ON CONFLICT (airport_code, day, status) DO UPDATE SET
+            departures = departures + excluded.departures,
+            arrivals = arrivals + excluded.arrivals;
+    
+        INSERT INTO company_stats (company, flights, departed, delayed_departures,
+            departure_delay, arrived, delayed_arrivals)
+        VALUES (
+            new.company,
+            1 * (1),
+            1 * (new.departure_time IS NOT NULL),
+            1 * (IFNULL(
+                new.departure_time - new.scheduled_departure_time > 900, 0
+            )),
+            1 * (IFNULL(
+                MAX(new.departure_time - new.scheduled_departure_time, 0), 0
+            )),
+            1 * (new.arrival_time IS NOT NULL),
+            1 * (IFNULL(
+                new.arrival_time - new.estimated_arrival_time > 900, 0
+            ))
+        )
+        ON CONFLICT (company) DO UPDATE SET
+            flights = flights + excluded.flights,
+            departed = departed + excluded.departed,
+            delayed_departures = delayed_departures + excluded.delayed_departures,
+            departure_delay = departure_delay + excluded.departure_delay,
+            arrived = arrived + excluded.arrived,
+            delayed_arrivals = delayed_arrivals + excluded.delayed_arrivals;
+        INSERT INTO airport_day_stats
+            (airport_code, day, status, departures, arrivals)
+        VALUES
+            (new.origin_airport_code, new.scheduled_departure_time / 86400,
+                new.status, 1, 0),
+            (new.destination_airport_code, new.estimated_arrival_time / 86400,
+                new.status, 0, 1)
+        ON CONFLICT (airport_code, day, status) DO UPDATE SET
+            departures = departures + excluded.departures,
+            arrivals = arrivals + excluded.arrivals;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_stats_delete AFTER DELETE ON flights
+    BEGIN
+        INSERT INTO company_stats (company, flights, departed, delayed_departures,
+            departure_delay, arrived, delayed_arrivals)
+        VALUES (
+            old.company,
+            -1 * (1),
+            -1 * (old.departure_time IS NOT NULL),
+            -1 * (IFNULL(
+                old.departure_time - old.scheduled_departure_time > 900, 0
+            )),
+            -1 * (IFNULL(
+                MAX(old.departure_time - old.scheduled_departure_time, 0), 0
+            )),
+            -1 * (old.arrival_time IS NOT NULL),
+            -1 * (IFNULL(
+                old.arrival_time - old.estimated_arrival_time > 900, 0
+            ))
+        )
+        ON CONFLICT (company) DO UPDATE SET
+            flights = flights + excluded.flights,
+            departed = departed + excluded.departed,
+            delayed_departures = delayed_departures + excluded.delayed_departures,
+            departure_delay = departure_delay + excluded.departure_delay,
+            arrived = arrived + excluded.arrived,
+            delayed_arrivals = delayed_arrivals + excluded.delayed_arrivals;
+        INSERT INTO airport_day_stats
+            (airport_code, day, status, departures, arrivals)
+        VALUES
+            (old.origin_airport_code, old.scheduled_departure_time / 86400,
+                old.status, -1, 0),
+            (old.destination_airport_code, old.estimated_arrival_time / 86400,
+                old.status, 0, -1)
+        ON CONFLICT (airport_code, day, status) DO UPDATE SET
+            departures = departures + excluded.departures,
+            arrivals = arrivals + excluded.arrivals;
+    END
+    """,
+    """
+    INSERT INTO company_stats (company, flights, departed, delayed_departures,
+        departure_delay, arrived, delayed_arrivals)
+    SELECT
+        company,
+        COUNT(*),
+        SUM(departure_time IS NOT NULL),
+        SUM(IFNULL(departure_time - scheduled_departure_time > 900, 0)),
+        SUM(IFNULL(MAX(departure_time - scheduled_departure_time, 0), 0)),
+        SUM(arrival_time IS NOT NULL),
+        SUM(IFNULL(arrival_time - estimated_arrival_time > 900, 0))
+    FROM flights
+    GROUP BY company
+    """,
+    """
+    INSERT INTO airport_day_stats (airport_code, day, status, departures, arrivals)
+    SELECT airport_code, day, status, SUM(departures), SUM(arrivals)
+    FROM (
+        SELECT origin_airport_code AS airport_code,
+            scheduled_departure_time / 86400 AS day,
+            status, 1 AS departures, 0 AS arrivals
+        FROM flights
+        UNION ALL
+        SELECT destination_airport_code, estimated_arrival_time / 86400,
+            status, 0, 1
+        FROM flights
+    )
+    GROUP BY airport_code, day, status
+    """,
+)
+
+_CHANGE_LOG = (
+    """
+    CREATE TABLE IF NOT EXISTS flight_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        changed_at INTEGER NOT NULL,
+        operation TEXT NOT NULL,
+        flight_id INTEGER NOT NULL,
+        flight_number TEXT NOT NULL,
+        origin_airport_code TEXT NOT NULL,
+        destination_airport_code TEXT NOT NULL,
+        scheduled_departure_time INTEGER NOT NULL,
+        estimated_arrival_time INTEGER NOT NULL,
+        departure_time INTEGER,
+        arrival_time INTEGER,
+        status TEXT NOT NULL,
+        pilot_id TEXT,
+        company TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_changes_insert AFTER INSERT ON flights
+    BEGIN
+        INSERT INTO flight_changes (changed_at, operation, flight_id, flight_number,
+            origin_airport_code, destination_airport_code, scheduled_departure_time,
+            estimated_arrival_time, departure_time, arrival_time, status, pilot_id,
+            company)
+        VALUES (
+            CAST(strftime('%s', 'now') AS INTEGER),
+            'insert',
+            new.flight_id,
+            new.flight_number,
+            new.origin_airport_code,
+            new.destination_airport_code,
+            new.scheduled_departure_time,
+            new.estimated_arrival_time,
+            new.departure_time,
+            new.arrival_time,
+            new.status,
+            new.pilot_id,
+            new.company
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_changes_update
+    AFTER UPDATE OF flight_number, origin_airport_code, destination_airport_code,
+        scheduled_departure_time, estimated_arrival_time, departure_time,
+        arrival_time, status, pilot_id, company ON flights
+    WHEN old.flight_number IS NOT new.flight_number
+        OR old.origin_airport_code IS NOT new.origin_airport_code
+        OR old.destination_airport_code IS NOT new.destination_airport_code
+        OR old.scheduled_departure_time IS NOT new.scheduled_departure_time
+        OR old.estimated_arrival_time IS NOT new.estimated_arrival_time
+        OR old.departure_time IS NOT new.departure_time
+        OR old.arrival_time IS NOT new.arrival_time
+        OR old.status IS NOT new.status
+        OR old.pilot_id IS NOT new.pilot_id
+        OR old.company IS NOT new.company
+    BEGIN
+        INSERT INTO flight_changes (changed_at, operation, flight_id, flight_number,
+            origin_airport_code, destination_airport_code, scheduled_departure_time,
+            estimated_arrival_time, departure_time, arrival_time, status, pilot_id,
+            company)
+        VALUES (
+            CAST(strftime('%s', 'now') AS INTEGER),
+            'update',
+            new.flight_id,
+            new.flight_number,
+            new.origin_airport_code,
+            new.destination_airport_code,
+            new.scheduled_departure_time,
+            new.estimated_arrival_time,
+            new.departure_time,
+            new.arrival_time,
+            new.status,
+            new.pilot_id,
+            new.company
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_changes_delete AFTER DELETE ON flights
+    BEGIN
+        INSERT INTO flight_changes (changed_at, operation, flight_id, flight_number,
+            origin_airport_code, destination_airport_code, scheduled_departure_time,
+            estimated_arrival_time, departure_time, arrival_time, status, pilot_id,
+            company)
+        VALUES (
+            CAST(strftime('%s', 'now') AS INTEGER),
+            'delete',
+            old.flight_id,
+            old.flight_number,
+            old.origin_airport_code,
+            old.destination_airport_code,
+            old.scheduled_departure_time,
+            old.estimated_arrival_time,
+            old.departure_time,
+            old.arrival_time,
+            old.status,
+            old.pilot_id,
+            old.company
+        );
+    END
+    """,
+)
+
+_CLOSURE_DELAYS = (
+    """
+    CREATE TABLE IF NOT EXISTS closure_delays (
+        flight_id INTEGER PRIMARY KEY,
+        airport_code TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_closure_delays_update
+    AFTER UPDATE OF status ON flights
+    WHEN new.status != 'delayed'
+    BEGIN
+        DELETE FROM closure_delays WHERE flight_id = new.flight_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_closure_delays_delete
+    AFTER DELETE ON flights
+    BEGIN
+        DELETE FROM closure_delays WHERE flight_id = old.flight_id;
+    END
+    """,
+)
+
+
+def _run(conn: sqlite3.Connection, statements: Sequence[str]) -> None:
+    for statement in statements:
+        conn.execute(statement)
+
+
+def _add_flight_indexes(conn: sqlite3.Connection) -> None:
+    _run(conn, _LOOKUP_INDEXES)
+
+
+def _epoch_timestamps(conn: sqlite3.Connection) -> None:
+    """Rebuild flights with INTEGER epoch-second timestamps instead of ISO text"""
+    sequence = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'flights'"
+    ).fetchone()
+    _run(conn, _EPOCH_FLIGHTS)
+    if sequence is not None:
+        conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'flights'",
+            sequence,
+        )
+    _run(conn, _LOOKUP_INDEXES)
+
+
+def _add_arrival_index(conn: sqlite3.Connection) -> None:
+    _run(conn, _ARRIVAL_INDEX)
+
+
+def _add_search_index(conn: sqlite3.Connection) -> None:
+    _run(conn, _SEARCH_INDEX)
+
+
+def _add_stats_tables(conn: sqlite3.Connection) -> None:
+    _run(conn, _STATS_TABLES)
+
+
+def _add_change_log(conn: sqlite3.Connection) -> None:
+    # Existing flights are not logged; consumers list them once and follow
+    # the log from its start.
+    _run(conn, _CHANGE_LOG)
+
+
+def _add_closure_delays(conn: sqlite3.Connection) -> None:
+    # Flights already delayed are left to the operator, as the reason is not
+    # known.
+    _run(conn, _CLOSURE_DELAYS)
+
+
+def _report_schedule_overlaps(conn: sqlite3.Connection) -> None:
+    """Warn about pilots booked on overlapping flights before saves checked it.
+
+    scheduling.find_conflicts assumes there are none. Nothing is changed;
+    ``manage-flight flights conflicts`` lists them all for an operator.
+    """
+    conflicts = find_all_conflicts(conn)
+    sample = list(islice(conflicts, _REPORTED_OVERLAPS))
+    if not sample:
+        return
+    count = len(sample) + sum(1 for _ in conflicts)
+    logger.warning(
+        "pilots are booked on overlapping flights (%d pairs); bookings next to "
+        "them may not be checked correctly until they are resolved: %s",
+        count,
+        ", ".join(
+            f"{c.pilot_id} on {c.flight_id} and {c.other_flight_id}" for c in sample
+        ),
+    )
+
+
+# Append new migrations to the end; never renumber or edit applied ones.
+MIGRATIONS: List[Migration] = [
+    (1, "Add flight lookup indexes", _add_flight_indexes),
+    (2, "Store flight timestamps as epoch seconds", _epoch_timestamps),
+    (3, "Add estimated arrival index", _add_arrival_index),
+    (4, "Add flights_search full-text index", _add_search_index),
+    (5, "Add company and airport summary tables", _add_stats_tables),
+    (6, "Add flight_changes log", _add_change_log),
+    (7, "Record flights delayed by airport closures", _add_closure_delays),
+    (8, "Report overlapping pilot assignments", _report_schedule_overlaps),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def set_schema_version(conn: sqlite3.Connection, version: int) -> None:
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Bring the database schema up to SCHEMA_VERSION and return the version"""
+    version = get_schema_version(conn)
+
+    if version == 0 and not _table_exists(conn, "flights"):
+        # A new database gets the current schema directly.
+        with transaction(conn):
+            Airport.create_table(conn)
+            Pilot.create_table(conn)
+            Flight.create_table(conn)
+            create_stats_tables(conn)
+            create_change_log(conn)
+            create_closure_delays(conn)
+            set_schema_version(conn, SCHEMA_VERSION)
+        return SCHEMA_VERSION
+
+    for number, _, apply in MIGRATIONS:
+        if number <= version:
+            continue
+        with transaction(conn):
+            apply(conn)
+            set_schema_version(conn, number)
+        version = number
+
+    return version
@@ -2,15 +2,41 @@ from dataclasses import dataclass
 import sqlite3
 import random
 import string
-from typing import List, Optional
+from typing import List, Optional, Set
+
+from flight_manager.models.db import transaction
+from flight_manager.models.identity import identity_map
+from flight_manager.models.references import (
+    DEFAULT_SAMPLE_SIZE,
+    DeleteMode,
+    FlightReferences,
+    find_references,
+    has_references,
+    release_references,
+)
+from flight_manager.models.scheduling import ScheduleConflictError, find_all_conflicts
+from flight_manager.models.tracking import Tracked, as_is
 
 
 @dataclass
-class Pilot:
+class Pilot(Tracked):
     pilot_id: str
     first_name: str
     last_name: str
 
+    _key = "pilot_id"
+    _references = ("pilot_id",)
+    _columns = {
+        "first_name": ("first_name", as_is),
+        "last_name": ("last_name", as_is),
+    }
+
+    @classmethod
+    def _from_row(cls, row: tuple, start: int = 0) -> "Pilot":
+        pilot = cls(row[start], row[start + 1], row[start + 2])
+        pilot.mark_clean()
+        return pilot
+
     @classmethod
     def generate_pilot_id(cls, length: int = 6) -> str:
         """Generate a random pilot ID with letters and digits"""
@@ -34,14 +60,14 @@ class Pilot:
         conn.execute("DROP TABLE IF EXISTS pilots")
 
     def save(self, conn: sqlite3.Connection) -> None:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            UPDATE pilots 
-            SET first_name = ?, last_name = ?
-            WHERE pilot_id = ?
-        """,
-            (self.first_name, self.last_name, self.pilot_id),
+        changes = self.changed_columns()
+        if not changes:
+            return
+
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        cursor = conn.execute(
+            f"UPDATE pilots SET {assignments} WHERE pilot_id = ?",
+            (*changes.values(), self.pilot_id),
         )
 
         if cursor.rowcount == 0:
@@ -52,6 +78,8 @@ class Pilot:
             """,
                 (self.pilot_id, self.first_name, self.last_name),
             )
+        self.mark_clean()
+        identity_map(conn).put(self)
 
     @classmethod
     def create(
@@ -70,17 +98,75 @@ class Pilot:
             (pilot_id,),
         )
         row = cursor.fetchone()
-        return cls(*row) if row else None
+        return identity_map(conn).intern(cls, row) if row else None
 
     @classmethod
     def get_all(cls, conn: sqlite3.Connection) -> List["Pilot"]:
         cursor = conn.cursor()
         cursor.execute("SELECT pilot_id, first_name, last_name FROM pilots")
-        return [cls(*row) for row in cursor.fetchall()]
+        session = identity_map(conn)
+        return [session.intern(cls, row) for row in cursor.fetchall()]
+
+    def is_referenced(self, conn: sqlite3.Connection) -> bool:
+        """Whether the pilot is assigned to any flight"""
+        return has_references(conn, self._references, self.pilot_id)
+
+    def references(
+        self, conn: sqlite3.Connection, sample_size: int = DEFAULT_SAMPLE_SIZE
+    ) -> FlightReferences:
+        return find_references(conn, self._references, self.pilot_id, sample_size)
+
+    def delete(
+        self,
+        conn: sqlite3.Connection,
+        mode: DeleteMode = DeleteMode.RESTRICT,
+        reassign_to: Optional[str] = None,
+    ) -> int:
+        """Delete the pilot and return how many of their flights went with them.
 
-    def delete(self, conn: sqlite3.Connection) -> None:
-        conn.execute("DELETE FROM pilots WHERE pilot_id = ?", (self.pilot_id,))
+        RESTRICT raises ReferencedError if the pilot has flights. CASCADE
+        deletes them. REASSIGN gives them to the pilot ``reassign_to``, or
+        leaves them unassigned if it is None, and raises
+        ScheduleConflictError if that pilot would be double-booked.
+        """
+        reassigning = mode is DeleteMode.REASSIGN and reassign_to is not None
+        if reassigning and Pilot.get_by_id(conn, reassign_to) is None:
+            raise KeyError(f"Pilot with ID {reassign_to} not found")
+
+        with transaction(conn):
+            handed_over: Set[int] = set()
+            if reassigning:
+                handed_over = {
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT flight_id FROM flights WHERE pilot_id = ?",
+                        (self.pilot_id,),
+                    )
+                }
+            count = release_references(
+                conn,
+                f"pilot {self.pilot_id}",
+                self._references,
+                self.pilot_id,
+                mode,
+                reassign_to,
+            )
+            if reassigning:
+                # Only overlaps between a handed over flight and one the other
+                # pilot already had are new; any others were there before.
+                conflicts = [
+                    conflict
+                    for conflict in find_all_conflicts(conn, reassign_to)
+                    if (conflict.flight_id in handed_over)
+                    != (conflict.other_flight_id in handed_over)
+                ]
+                if conflicts:
+                    raise ScheduleConflictError(conflicts)
+            conn.execute("DELETE FROM pilots WHERE pilot_id = ?", (self.pilot_id,))
+        identity_map(conn).discard(type(self), self.pilot_id)
+        return count
 
     @classmethod
     def delete_by_id(cls, conn: sqlite3.Connection, pilot_id: str) -> None:
         conn.execute("DELETE FROM pilots WHERE pilot_id = ?", (pilot_id,))
+        identity_map(conn).discard(cls, pilot_id)
@@ -0,0 +1,258 @@
+import bisect
+import contextlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+logger = logging.getLogger("flight_manager.sql")
+
+# Upper bounds of the latency histogram buckets, in milliseconds.
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, float("inf"))
+
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+_PLUMBING = {
+    os.path.join(_MODELS_DIR, "db.py"),
+    os.path.join(_MODELS_DIR, "profiling.py"),
+    os.path.abspath(contextlib.__file__),
+}
+
+
+def _normalize(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _describe(frame) -> str:
+    filename = os.path.relpath(frame.f_code.co_filename, _PACKAGE_DIR)
+    return f"{filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+def call_site() -> str:
+    """Describe the code that issued a statement.
+
+    This is the first frame outside the database plumbing, usually a model
+    method, followed by the first caller outside ``models`` (a menu or CLI
+    handler) so hot user-facing paths stand out.
+    """
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename in _PLUMBING:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+
+    site = _describe(frame)
+    caller = frame
+    while caller is not None and caller.f_code.co_filename.startswith(_MODELS_DIR):
+        caller = caller.f_back
+    if caller is None or caller is frame:
+        return site
+    return f"{site} <- {_describe(caller)}"
+
+
+@dataclass
+class StatementStats:
+    sql: str
+    call_site: str
+    calls: int = 0
+    rows: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    histogram: List[int] = field(default_factory=lambda: [0] * len(BUCKETS_MS))
+
+    def add(self, elapsed_ms: float, rows: int) -> None:
+        self.calls += 1
+        self.rows += rows
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.histogram[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "call_site": self.call_site,
+            "calls": self.calls,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3),
+            "max_ms": round(self.max_ms, 3),
+            "histogram": {
+                f"<={bound}ms": count
+                for bound, count in zip(BUCKETS_MS, self.histogram)
+                if count
+            },
+        }
+
+
+class QueryProfiler:
+    """Collects per-statement latency, row counts and call sites.
+
+    Statements slower than ``slow_ms`` are logged on the ``flight_manager.sql``
+    logger together with their ``EXPLAIN QUERY PLAN``.
+    """
+
+    def __init__(self, slow_ms: float = 100.0, explain: bool = True) -> None:
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.started = time.time()
+        self._stats: Dict[Tuple[str, str], StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        conn: sqlite3.Connection,
+        sql: str,
+        parameters: Any,
+        site: str,
+        elapsed_ms: float,
+        rows: int,
+    ) -> None:
+        sql = _normalize(sql)
+        with self._lock:
+            stats = self._stats.get((sql, site))
+            if stats is None:
+                stats = self._stats[(sql, site)] = StatementStats(sql, site)
+            stats.add(elapsed_ms, rows)
+
+        if elapsed_ms >= self.slow_ms:
+            plan = self.query_plan(conn, sql, parameters) if self.explain else []
+            logger.warning(
+                "slow query (%.1f ms, %d rows) at %s: %s%s",
+                elapsed_ms,
+                rows,
+                site,
+                sql,
+                "".join(f"\n    {line}" for line in plan),
+            )
+
+    @staticmethod
+    def query_plan(conn: sqlite3.Connection, sql: str, parameters: Any) -> List[str]:
+        if not sql.upper().startswith(_EXPLAINABLE):
+            return []
+        try:
+            cursor = sqlite3.Cursor(conn)
+            rows = cursor.execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+        except sqlite3.Error:
+            return []
+        return [row[-1] for row in rows]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            statements = sorted(
+                (stats.as_dict() for stats in self._stats.values()),
+                key=lambda stats: stats["total_ms"],
+                reverse=True,
+            )
+        return {
+            "duration_s": round(time.time() - self.started, 3),
+            "statements": statements,
+        }
+
+    def report(self, out: TextIO) -> None:
+        json.dump(self.summary(), out, indent=2)
+        out.write("\n")
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor that reports each statement to a QueryProfiler once it finishes.
+
+    Reads are timed across execute and all fetches, so the figure covers the
+    work SQLite does while stepping through the result.
+    """
+
+    profiler: QueryProfiler
+
+    def _begin(self, sql: str, parameters: Any) -> None:
+        self._pending = (sql, parameters, call_site())
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def _finish(self) -> None:
+        pending = getattr(self, "_pending", None)
+        if pending is None:
+            return
+        self._pending = None
+        sql, parameters, site = pending
+        rows = self._rows if self.description is not None else max(self.rowcount, 0)
+        self.profiler.record(
+            self.connection, sql, parameters, site, self._elapsed * 1000, rows
+        )
+
+    def execute(self, sql: str, parameters: Any = ()) -> "ProfilingCursor":
+        self._finish()
+        self._begin(sql, parameters)
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            self._elapsed += time.perf_counter() - started
+        if self.description is None:
+            self._finish()
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "ProfilingCursor":
+        self._finish()
+        self._begin(sql, ())
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            self._elapsed += time.perf_counter() - started
+        self._finish()
+        return self
+
+    def fetchone(self) -> Any:
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._elapsed += time.perf_counter() - started
+        if row is None:
+            self._finish()
+        else:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Any]:
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._elapsed += time.perf_counter() - started
+        self._rows += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._elapsed += time.perf_counter() - started
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self) -> Any:
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._elapsed += time.perf_counter() - started
+            self._finish()
+            raise
+        self._elapsed += time.perf_counter() - started
+        self._rows += 1
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        try:
+            self._finish()
+        except sqlite3.Error:
+            pass
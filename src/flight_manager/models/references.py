@@ -0,0 +1,126 @@
+import sqlite3
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional, Sequence
+
+from flight_manager.models.db import transaction
+
+DEFAULT_SAMPLE_SIZE = 10
+
+
+class DeleteMode(Enum):
+    # Refuse to delete while any flight refers to the row.
+    RESTRICT = "restrict"
+    # Delete the referring flights as well.
+    CASCADE = "cascade"
+    # Point the referring flights at another row (for pilots, possibly none).
+    REASSIGN = "reassign"
+
+
+@dataclass
+class FlightReferences:
+    """How many flights refer to an airport or pilot, and a few of their IDs"""
+
+    count: int
+    # A sample of at most the requested size, in ascending order.
+    flight_ids: List[int]
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+
+class ReferencedError(ValueError):
+    def __init__(self, entity: str, references: FlightReferences) -> None:
+        self.references = references
+        sample = ", ".join(map(str, references.flight_ids))
+        more = ", ..." if references.count > len(references.flight_ids) else ""
+        super().__init__(
+            f"{entity} is referenced by {references.count} flights "
+            f"({sample}{more})"
+        )
+
+
+# Each column has an index leading with it, so these are answered by a
+# multi-index OR: EXISTS and the sample stop after the first few entries and
+# COUNT only walks the index ranges, without reading any flight.
+def _where(columns: Sequence[str]) -> str:
+    return " OR ".join(f"{column} = :key" for column in columns)
+
+
+def has_references(conn: sqlite3.Connection, columns: Sequence[str], key: str) -> bool:
+    row = conn.execute(
+        f"SELECT EXISTS (SELECT 1 FROM flights WHERE {_where(columns)})",
+        {"key": key},
+    ).fetchone()
+    return bool(row[0])
+
+
+def find_references(
+    conn: sqlite3.Connection,
+    columns: Sequence[str],
+    key: str,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> FlightReferences:
+    where = _where(columns)
+    count = conn.execute(
+        f"SELECT COUNT(*) FROM flights WHERE {where}", {"key": key}
+    ).fetchone()[0]
+    # No ORDER BY, which would read every match to sort them.
+    sample = conn.execute(
+        f"SELECT flight_id FROM flights WHERE {where} LIMIT :limit",
+        {"key": key, "limit": sample_size},
+    )
+    return FlightReferences(count, sorted(row[0] for row in sample))
+
+
+def delete_references(
+    conn: sqlite3.Connection, columns: Sequence[str], key: str
+) -> int:
+    """Delete the flights that refer to ``key`` and return how many there were"""
+    cursor = conn.execute(f"DELETE FROM flights WHERE {_where(columns)}", {"key": key})
+    return cursor.rowcount
+
+
+def reassign_references(
+    conn: sqlite3.Connection,
+    columns: Sequence[str],
+    key: str,
+    new_key: Optional[str],
+) -> int:
+    """Replace ``key`` with ``new_key`` in each column, one UPDATE per column.
+
+    Returns how many flights were changed.
+    """
+    with transaction(conn):
+        # Counted first, as a flight can match in more than one column.
+        count = conn.execute(
+            f"SELECT COUNT(*) FROM flights WHERE {_where(columns)}", {"key": key}
+        ).fetchone()[0]
+        for column in columns:
+            conn.execute(
+                f"UPDATE flights SET {column} = ? WHERE {column} = ?", (new_key, key)
+            )
+    return count
+
+
+def release_references(
+    conn: sqlite3.Connection,
+    entity: str,
+    columns: Sequence[str],
+    key: str,
+    mode: DeleteMode,
+    new_key: Optional[str] = None,
+) -> int:
+    """Clear the way for deleting ``key`` and return how many flights it took.
+
+    Raises ReferencedError under RESTRICT if any flight refers to ``key``.
+    """
+    if mode is DeleteMode.CASCADE:
+        return delete_references(conn, columns, key)
+    if mode is DeleteMode.REASSIGN:
+        if new_key == key:
+            raise ValueError(f"cannot reassign the flights of {entity} to itself")
+        return reassign_references(conn, columns, key, new_key)
+    if has_references(conn, columns, key):
+        raise ReferencedError(entity, find_references(conn, columns, key))
+    return 0
@@ -0,0 +1,203 @@
+import heapq
+import sqlite3
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import DefaultDict, List, Optional, Tuple
+
+from flight_manager.models.flight import Flight
+from flight_manager.models.pilot import Pilot
+from flight_manager.models.timestamps import to_epoch
+
+DEFAULT_MIN_REST = timedelta(hours=1)
+
+
+@dataclass
+class RosterPlan:
+    """Pilot assignments proposed for the unassigned flights of a window"""
+
+    assignments: List[Tuple[int, str]] = field(default_factory=list)
+    unstaffed: List[int] = field(default_factory=list)
+
+
+@dataclass
+class _PilotState:
+    pilot_id: str
+    # Unknown until the pilot has flown; such a pilot can start anywhere.
+    location: Optional[str] = None
+    free_from: int = 0
+    version: int = 0
+    # The pilot's already assigned flights still ahead in the sweep, as
+    # (departure, origin), earliest last.
+    booked: List[Tuple[int, str]] = field(default_factory=list)
+
+    def can_fly(
+        self, origin: str, destination: str, departure: int, arrival: int, rest: int
+    ) -> bool:
+        if self.free_from > departure:
+            return False
+        if self.location is not None and self.location != origin:
+            return False
+        if self.booked:
+            next_departure, next_origin = self.booked[-1]
+            return arrival + rest <= next_departure and destination == next_origin
+        return True
+
+    def fly(self, destination: str, arrival: int, rest: int) -> None:
+        self.location = destination
+        self.free_from = arrival + rest
+        self.version += 1
+
+
+def plan_roster(
+    conn: sqlite3.Connection,
+    start: datetime,
+    end: datetime,
+    min_rest: timedelta = DEFAULT_MIN_REST,
+) -> RosterPlan:
+    """Propose pilots for the flights departing in [start, end) without one.
+
+    Flights are staffed greedily in departure order, which is optimal for
+    the pure interval-scheduling part of the problem. A flight goes to the
+    pilot who has waited longest at its origin, falling back to a pilot with
+    no flight history. Assignments never overlap a pilot's other flights,
+    leave at least ``min_rest`` between flights and keep each pilot's
+    destination equal to their next origin, including flights that already
+    had a pilot.
+    """
+    rest = min_rest // timedelta(seconds=1)
+    start, end = to_epoch(start), to_epoch(end)
+
+    open_flights = conn.execute(
+        """
+        SELECT flight_id, origin_airport_code, destination_airport_code,
+            scheduled_departure_time, estimated_arrival_time
+        FROM flights
+        WHERE pilot_id IS NULL
+            AND scheduled_departure_time >= ? AND scheduled_departure_time < ?
+        ORDER BY scheduled_departure_time, flight_id
+    """,
+        (start, end),
+    ).fetchall()
+
+    pilots = {
+        pilot_id: _PilotState(pilot_id)
+        for (pilot_id,) in conn.execute("SELECT pilot_id FROM pilots")
+    }
+
+    # Where each pilot is when the window opens (SQLite takes the bare
+    # columns from the row holding the MAX).
+    for pilot_id, destination, _, arrival in conn.execute(
+        """
+        SELECT pilot_id, destination_airport_code,
+            MAX(scheduled_departure_time), estimated_arrival_time
+        FROM flights
+        WHERE pilot_id IS NOT NULL AND scheduled_departure_time < ?
+        GROUP BY pilot_id
+    """,
+        (start,),
+    ):
+        if pilot_id in pilots:
+            pilots[pilot_id].fly(destination, arrival, rest)
+
+    # Flights that already have a pilot and depart while the new assignments
+    # could still be flying, plus each pilot's first flight after that, which
+    # fixes where the pilot has to end up.
+    horizon = max((row[4] for row in open_flights), default=start) + rest
+    booked = conn.execute(
+        """
+        SELECT pilot_id, flight_id, origin_airport_code, destination_airport_code,
+            scheduled_departure_time, estimated_arrival_time
+        FROM flights
+        WHERE pilot_id IS NOT NULL
+            AND scheduled_departure_time >= ? AND scheduled_departure_time < ?
+        UNION ALL
+        SELECT pilot_id, flight_id, origin_airport_code, destination_airport_code,
+            MIN(scheduled_departure_time), estimated_arrival_time
+        FROM flights
+        WHERE pilot_id IS NOT NULL AND scheduled_departure_time >= ?
+        GROUP BY pilot_id
+        ORDER BY 5 DESC
+    """,
+        (start, horizon, horizon),
+    ).fetchall()
+    for pilot_id, _, origin, _, departure, _ in booked:
+        if pilot_id in pilots:
+            pilots[pilot_id].booked.append((departure, origin))
+    booked.reverse()
+
+    # Pilots waiting at each airport, and those with no history yet, as heaps
+    # of (free_from, version, pilot_id). Entries whose version is behind the
+    # pilot's are stale and skipped.
+    Waiting = List[Tuple[int, int, str]]
+    waiting: DefaultDict[Optional[str], Waiting] = defaultdict(list)
+    for state in pilots.values():
+        entry = (state.free_from, state.version, state.pilot_id)
+        waiting[state.location].append(entry)
+    for heap in waiting.values():
+        heapq.heapify(heap)
+
+    def take(
+        location: Optional[str],
+        origin: str,
+        destination: str,
+        departure: int,
+        arrival: int,
+    ) -> Optional[_PilotState]:
+        heap = waiting.get(location)
+        skipped = []
+        chosen = None
+        while heap and heap[0][0] <= departure:
+            entry = heapq.heappop(heap)
+            state = pilots[entry[2]]
+            if entry[1] != state.version:
+                continue
+            if state.can_fly(origin, destination, departure, arrival, rest):
+                chosen = state
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return chosen
+
+    plan = RosterPlan()
+    fixed = 0
+    for flight_id, origin, destination, departure, arrival in open_flights:
+        # Move pilots through their own flights that depart before this one.
+        while fixed < len(booked) and booked[fixed][4] <= departure:
+            pilot_id, _, _, booked_destination, _, booked_arrival = booked[fixed]
+            fixed += 1
+            state = pilots.get(pilot_id)
+            if state is None:
+                continue
+            state.booked.pop()
+            state.fly(booked_destination, booked_arrival, rest)
+            heapq.heappush(
+                waiting[state.location], (state.free_from, state.version, pilot_id)
+            )
+
+        state = take(origin, origin, destination, departure, arrival) or take(
+            None, origin, destination, departure, arrival
+        )
+        if state is None:
+            plan.unstaffed.append(flight_id)
+            continue
+        state.fly(destination, arrival, rest)
+        heapq.heappush(
+            waiting[destination], (state.free_from, state.version, state.pilot_id)
+        )
+        plan.assignments.append((flight_id, state.pilot_id))
+
+    return plan
+
+
+def apply_roster(conn: sqlite3.Connection, plan: RosterPlan) -> int:
+    """Save a plan's assignments in one transaction and return how many"""
+    flights = []
+    for flight_id, pilot_id in plan.assignments:
+        flight = Flight.get_by_id(conn, flight_id)
+        if flight is None or flight.pilot is not None:
+            raise ValueError(f"flight {flight_id} is no longer unassigned")
+        flight.pilot = Pilot.get_by_id(conn, pilot_id)
+        flights.append(flight)
+    return Flight.save_many(conn, flights)
@@ -0,0 +1,278 @@
+import bisect
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from flight_manager.models.changes import (
+    DEFAULT_PAGE_SIZE,
+    ChangeOperation,
+    FlightChange,
+    latest_seq,
+    read_changes,
+)
+from flight_manager.models.flight import Flight
+from flight_manager.models.timestamps import from_epoch, to_epoch
+
+DEFAULT_MIN_CONNECTION = timedelta(minutes=45)
+DEFAULT_MAX_HOPS = 4
+
+# (departure, arrival, flight_id, origin, destination, flight_number); the
+# tuples sort by departure and flight_id keeps them unique.
+Hop = Tuple[int, int, int, str, str, str]
+
+
+@dataclass(frozen=True)
+class Leg:
+    flight_id: int
+    flight_number: str
+    origin: str
+    destination: str
+    departure: datetime
+    arrival: datetime
+
+
+@dataclass(frozen=True)
+class Journey:
+    legs: Tuple[Leg, ...]
+
+    @property
+    def departure(self) -> datetime:
+        return self.legs[0].departure
+
+    @property
+    def arrival(self) -> datetime:
+        return self.legs[-1].arrival
+
+    @property
+    def hops(self) -> int:
+        return len(self.legs)
+
+
+def _journey(path: Tuple[Hop, ...]) -> Journey:
+    return Journey(
+        tuple(
+            Leg(c[2], c[5], c[3], c[4], from_epoch(c[0]), from_epoch(c[1]))
+            for c in path
+        )
+    )
+
+
+class RouteGraph:
+    """Time-dependent flight network for connection queries.
+
+    Holds one hop per flight, sorted by departure, which is all the
+    connection scan algorithm needs: a query walks forward from the first
+    departure after the requested time and stops as soon as nothing later
+    can improve the answer. Flights can be added, replaced or removed as they
+    change, without reloading.
+    """
+
+    def __init__(
+        self,
+        min_connection: timedelta = DEFAULT_MIN_CONNECTION,
+        airport_connections: Optional[Dict[str, timedelta]] = None,
+    ) -> None:
+        self.min_connection = min_connection // timedelta(seconds=1)
+        self.airport_connections = {
+            code: value // timedelta(seconds=1)
+            for code, value in (airport_connections or {}).items()
+        }
+        self._hops: List[Hop] = []
+        self._by_id: Dict[int, Hop] = {}
+        # Departure window in epoch seconds, as given to load; None is open.
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        # The newest flight_changes entry reflected in the graph.
+        self.seq = 0
+
+    def __len__(self) -> int:
+        return len(self._hops)
+
+    @classmethod
+    def load(
+        cls,
+        conn: sqlite3.Connection,
+        start: datetime,
+        end: datetime,
+        min_connection: timedelta = DEFAULT_MIN_CONNECTION,
+        airport_connections: Optional[Dict[str, timedelta]] = None,
+    ) -> "RouteGraph":
+        """Build the graph from the flights departing in [start, end)"""
+        graph = cls(min_connection, airport_connections)
+        graph.start, graph.end = to_epoch(start), to_epoch(end)
+        # Read first: changes logged while loading are applied again by
+        # refresh, which leaves the flights as the later change has them.
+        graph.seq = latest_seq(conn)
+        rows = conn.execute(
+            """
+            SELECT scheduled_departure_time, estimated_arrival_time, flight_id,
+                origin_airport_code, destination_airport_code, flight_number
+            FROM flights
+            WHERE scheduled_departure_time >= ? AND scheduled_departure_time < ?
+            ORDER BY scheduled_departure_time, flight_id
+        """,
+            (graph.start, graph.end),
+        ).fetchall()
+        graph._hops = [tuple(row) for row in rows]
+        graph._by_id = {row[2]: row for row in graph._hops}
+        return graph
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        """Whether every flight departing in [start, end) can be in the graph"""
+        return (self.start is None or self.start <= to_epoch(start)) and (
+            self.end is None or to_epoch(end) <= self.end
+        )
+
+    def add(self, flight: Flight) -> None:
+        """Add a flight, or replace it if the graph already has it"""
+        self._put(
+            (
+                to_epoch(flight.scheduled_departure_time),
+                to_epoch(flight.estimated_arrival_time),
+                flight.flight_id,
+                flight.origin_airport.code,
+                flight.destination_airport.code,
+                flight.flight_number,
+            )
+        )
+
+    def remove(self, flight_id: int) -> None:
+        hop = self._by_id.pop(flight_id, None)
+        if hop is not None:
+            index = bisect.bisect_left(self._hops, hop)
+            del self._hops[index]
+
+    def _put(self, hop: Hop) -> None:
+        self.remove(hop[2])
+        # A flight rescheduled out of the window leaves the graph.
+        if (self.start is None or hop[0] >= self.start) and (
+            self.end is None or hop[0] < self.end
+        ):
+            bisect.insort(self._hops, hop)
+            self._by_id[hop[2]] = hop
+
+    def apply(self, change: FlightChange) -> None:
+        """Bring the graph up to date with one entry of the change log"""
+        if change.operation is ChangeOperation.DELETE:
+            self.remove(change.flight_id)
+            return
+        self._put(
+            (
+                to_epoch(change.scheduled_departure_time),
+                to_epoch(change.estimated_arrival_time),
+                change.flight_id,
+                change.origin_airport_code,
+                change.destination_airport_code,
+                change.flight_number,
+            )
+        )
+
+    def refresh(self, conn: sqlite3.Connection) -> int:
+        """Apply the changes logged since the graph was loaded or last refreshed.
+
+        Returns how many were applied. While nothing changed it costs one
+        lookup in sqlite_sequence.
+        """
+        applied = 0
+        while True:
+            page = read_changes(conn, self.seq)
+            for change in page.changes:
+                self.apply(change)
+            applied += len(page.changes)
+            self.seq = page.last_seq
+            if len(page.changes) < DEFAULT_PAGE_SIZE:
+                return applied
+
+    def _transfer(self, airport: str) -> int:
+        return self.airport_connections.get(airport, self.min_connection)
+
+    def _first_after(self, time: int) -> int:
+        return bisect.bisect_left(self._hops, (time,))
+
+    def _departing(self, start: int, before: Optional[datetime]) -> List[Hop]:
+        first = self._first_after(start)
+        if before is None:
+            return self._hops[first:]
+        return self._hops[first : self._first_after(to_epoch(before))]
+
+    def earliest_arrival(
+        self,
+        origin: str,
+        destination: str,
+        depart_after: datetime,
+        depart_before: Optional[datetime] = None,
+    ) -> Optional[Journey]:
+        """Return the journey reaching ``destination`` soonest, or None.
+
+        Only flights departing before ``depart_before`` are taken, if given.
+        """
+        start = to_epoch(depart_after)
+        # Earliest arrival at each airport reached so far, with the legs taken.
+        reached: Dict[str, Tuple[int, Tuple[Hop, ...]]] = {origin: (start, ())}
+
+        for hop in self._departing(start, depart_before):
+            departure, arrival, _, source, target, _ = hop
+            best = reached.get(destination)
+            if best is not None and departure >= best[0]:
+                break
+            label = reached.get(source)
+            if label is None:
+                continue
+            ready = label[0] if source == origin else label[0] + self._transfer(source)
+            if departure < ready:
+                continue
+            current = reached.get(target)
+            if current is None or arrival < current[0]:
+                reached[target] = (arrival, label[1] + (hop,))
+
+        label = reached.get(destination)
+        if label is None or not label[1]:
+            return None
+        return _journey(label[1])
+
+    def fewest_hops(
+        self,
+        origin: str,
+        destination: str,
+        depart_after: datetime,
+        max_hops: int = DEFAULT_MAX_HOPS,
+        depart_before: Optional[datetime] = None,
+    ) -> Optional[Journey]:
+        """Return the journey with the fewest flights, arriving soonest among them.
+
+        Round ``k`` scans the connections once and extends only journeys of
+        ``k - 1`` flights, so the first round that reaches ``destination``
+        gives the answer. ``depart_before`` is as for earliest_arrival.
+        """
+        start = to_epoch(depart_after)
+        hops = self._departing(start, depart_before)
+        previous: Dict[str, Tuple[int, Tuple[Hop, ...]]] = {origin: (start, ())}
+
+        for _ in range(max_hops):
+            current = dict(previous)
+            improved = False
+            for hop in hops:
+                departure, arrival, _, source, target, _ = hop
+                label = previous.get(source)
+                if label is None:
+                    continue
+                ready = (
+                    label[0] if source == origin else label[0] + self._transfer(source)
+                )
+                if departure < ready:
+                    continue
+                best = current.get(target)
+                if best is None or arrival < best[0]:
+                    current[target] = (arrival, label[1] + (hop,))
+                    improved = True
+
+            label = current.get(destination)
+            if label is not None and label[1]:
+                return _journey(label[1])
+            if not improved:
+                # Another flight cannot reach anywhere sooner than this round.
+                return None
+            previous = current
+
+        return None
@@ -0,0 +1,131 @@
+import heapq
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from flight_manager.models.timestamps import from_epoch, to_epoch
+
+# idx_flights_pilot orders each pilot's flights by departure, which makes it a
+# sorted interval index: as long as a pilot's schedule has no overlaps, only
+# the flight departing just before a new one, or the first departing during
+# it, can overlap it. Each is a single index seek.
+_PREVIOUS = """
+    SELECT flight_id, scheduled_departure_time, estimated_arrival_time
+    FROM flights
+    WHERE pilot_id = ? AND scheduled_departure_time < ? AND flight_id != ?
+    ORDER BY scheduled_departure_time DESC
+    LIMIT 1
+"""
+
+_FOLLOWING = """
+    SELECT flight_id, scheduled_departure_time, estimated_arrival_time
+    FROM flights
+    WHERE pilot_id = ?
+        AND scheduled_departure_time >= ?
+        AND scheduled_departure_time < ?
+        AND flight_id != ?
+    ORDER BY scheduled_departure_time
+    LIMIT 1
+"""
+
+
+@dataclass(frozen=True)
+class Conflict:
+    """Two flights of the same pilot whose scheduled intervals overlap"""
+
+    pilot_id: str
+    flight_id: Optional[int]
+    other_flight_id: int
+    overlap_start: datetime
+    overlap_end: datetime
+
+
+class ScheduleConflictError(ValueError):
+    def __init__(self, conflicts: List[Conflict]) -> None:
+        self.conflicts = conflicts
+        first = conflicts[0]
+        super().__init__(
+            f"pilot {first.pilot_id} is already flying flight "
+            f"{first.other_flight_id} from {first.overlap_start:%Y-%m-%d %H:%M} "
+            f"to {first.overlap_end:%Y-%m-%d %H:%M}"
+        )
+
+
+def find_conflicts(
+    conn: sqlite3.Connection,
+    pilot_id: str,
+    departure: datetime,
+    arrival: datetime,
+    flight_id: Optional[int] = None,
+) -> List[Conflict]:
+    """Return the flights ``pilot_id`` flies during [departure, arrival).
+
+    ``flight_id`` is the flight being checked, if it is already stored, so it
+    is not reported against itself. Costs two index seeks.
+
+    Relies on the pilot's stored flights not overlapping each other, which
+    every save and import enforces: an earlier flight that overlaps one
+    departing after it could be missed otherwise. Databases upgraded from
+    before the check may break this; migration 8 logs their overlaps, and
+    find_all_conflicts finds them without relying on it.
+    """
+    start, end = to_epoch(departure), to_epoch(arrival)
+    exclude = flight_id or 0
+
+    conflicts = []
+    for query, params in (
+        (_PREVIOUS, (pilot_id, start, exclude)),
+        (_FOLLOWING, (pilot_id, start, end, exclude)),
+    ):
+        row = conn.execute(query, params).fetchone()
+        if row is not None and row[1] < end and row[2] > start:
+            conflicts.append(
+                Conflict(
+                    pilot_id,
+                    flight_id,
+                    row[0],
+                    from_epoch(max(start, row[1])),
+                    from_epoch(min(end, row[2])),
+                )
+            )
+    return conflicts
+
+
+def find_all_conflicts(
+    conn: sqlite3.Connection, pilot_id: Optional[str] = None
+) -> Iterator[Conflict]:
+    """Yield every overlapping pair of flights flown by the same pilot.
+
+    One pass over the flights in (pilot, departure) order, keeping a heap of
+    the pilot's flights still in the air, so the cost is O(n log n) plus the
+    number of conflicts rather than a comparison of every pair. With
+    ``pilot_id`` only that pilot's flights are read, from idx_flights_pilot.
+    """
+    condition = "pilot_id = ?" if pilot_id is not None else "pilot_id IS NOT NULL"
+    rows = conn.execute(
+        f"""
+        SELECT pilot_id, flight_id, scheduled_departure_time, estimated_arrival_time
+        FROM flights
+        WHERE {condition}
+        ORDER BY pilot_id, scheduled_departure_time, flight_id
+    """,
+        () if pilot_id is None else (pilot_id,),
+    )
+
+    current = None
+    airborne: List[Tuple[int, int]] = []
+    for pilot_id, flight_id, start, end in rows:
+        if pilot_id != current:
+            current, airborne = pilot_id, []
+        while airborne and airborne[0][0] <= start:
+            heapq.heappop(airborne)
+        for other_end, other_id in airborne:
+            yield Conflict(
+                pilot_id,
+                other_id,
+                flight_id,
+                from_epoch(start),
+                from_epoch(min(end, other_end)),
+            )
+        heapq.heappush(airborne, (end, flight_id))
@@ -0,0 +1,151 @@
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple
+
+# Text columns of the flights_search index, a trigram FTS5 table whose rowid is
+# the flight_id. Joined names are copied in so one lookup covers them all.
+SEARCH_COLUMNS = (
+    "flight_number",
+    "company",
+    "pilot_name",
+    "origin_name",
+    "destination_name",
+)
+
+# The trigram tokenizer can only use its index for substrings this long.
+MIN_MATCH_LENGTH = 3
+
+_ROW_VALUES = """
+    {flight}.flight_number,
+    {flight}.company,
+    (SELECT first_name || ' ' || last_name FROM pilots
+     WHERE pilot_id = {flight}.pilot_id),
+    (SELECT name FROM airports WHERE code = {flight}.origin_airport_code),
+    (SELECT name FROM airports WHERE code = {flight}.destination_airport_code)
+"""
+
+_INSERT_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS flights_search_insert AFTER INSERT ON flights
+    BEGIN
+        INSERT INTO flights_search (rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES (new.flight_id, {_ROW_VALUES.format(flight="new")});
+    END
+"""
+
+_TRIGGERS = (
+    _INSERT_TRIGGER,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS flights_search_update
+    AFTER UPDATE OF flight_number, company, pilot_id, origin_airport_code,
+        destination_airport_code ON flights
+    BEGIN
+        DELETE FROM flights_search WHERE rowid = old.flight_id;
+        INSERT INTO flights_search (rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES (new.flight_id, {_ROW_VALUES.format(flight="new")});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_delete AFTER DELETE ON flights
+    BEGIN
+        DELETE FROM flights_search WHERE rowid = old.flight_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_pilot_update
+    AFTER UPDATE OF first_name, last_name ON pilots
+    BEGIN
+        UPDATE flights_search SET pilot_name = new.first_name || ' ' || new.last_name
+        WHERE rowid IN (SELECT flight_id FROM flights WHERE pilot_id = new.pilot_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_pilot_delete
+    AFTER DELETE ON pilots
+    BEGIN
+        UPDATE flights_search SET pilot_name = NULL
+        WHERE rowid IN (SELECT flight_id FROM flights WHERE pilot_id = old.pilot_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS flights_search_airport_update
+    AFTER UPDATE OF name ON airports
+    BEGIN
+        UPDATE flights_search SET origin_name = new.name
+        WHERE rowid IN (
+            SELECT flight_id FROM flights WHERE origin_airport_code = new.code
+        );
+        UPDATE flights_search SET destination_name = new.name
+        WHERE rowid IN (
+            SELECT flight_id FROM flights WHERE destination_airport_code = new.code
+        );
+    END
+    """,
+)
+
+
+def create_search_index(conn: sqlite3.Connection) -> None:
+    """Create the flights_search table and the triggers that keep it in sync"""
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS flights_search
+        USING fts5({", ".join(SEARCH_COLUMNS)}, tokenize = 'trigram')
+    """
+    )
+    for trigger in _TRIGGERS:
+        conn.execute(trigger)
+
+
+@contextmanager
+def deferred_indexing(conn: sqlite3.Connection) -> Iterator[None]:
+    """Index flights inserted inside the block with one statement at the end.
+
+    FTS5 flushes its buffer on every trigger-driven write, so bulk inserts are
+    much faster without the insert trigger. The trigger is dropped and created
+    again inside the caller's transaction, so other connections never see it
+    missing. Flight ids only grow, which is how the new rows are found.
+    """
+    last_id = conn.execute(
+        "SELECT IFNULL(MAX(flight_id), 0) FROM flights"
+    ).fetchone()[0]
+    conn.execute("DROP TRIGGER IF EXISTS flights_search_insert")
+    try:
+        yield
+        conn.execute(
+            f"""
+            INSERT INTO flights_search (rowid, {", ".join(SEARCH_COLUMNS)})
+            SELECT f.flight_id, {_ROW_VALUES.format(flight="f")}
+            FROM flights f
+            WHERE f.flight_id > ?
+        """,
+            (last_id,),
+        )
+    finally:
+        conn.execute(_INSERT_TRIGGER)
+
+
+def like_condition(column: str, value: str) -> Tuple[str, List[Any]]:
+    """Match flights whose ``column`` contains ``value``, like ``LIKE '%value%'``"""
+    if column not in SEARCH_COLUMNS:
+        raise ValueError(f"{column} is not a search column")
+    return (
+        f"f.flight_id IN (SELECT rowid FROM flights_search WHERE {column} LIKE ?)",
+        [f"%{value}%"],
+    )
+
+
+def text_condition(text: str) -> Tuple[str, List[Any]]:
+    """Match flights where any search column contains ``text``"""
+    if len(text) >= MIN_MATCH_LENGTH:
+        phrase = '"' + text.replace('"', '""') + '"'
+        return (
+            "f.flight_id IN "
+            "(SELECT rowid FROM flights_search WHERE flights_search MATCH ?)",
+            [phrase],
+        )
+
+    # Too short for a trigram lookup, so this scans the index table instead.
+    likes = " OR ".join(f"{column} LIKE ?" for column in SEARCH_COLUMNS)
+    return (
+        f"f.flight_id IN (SELECT rowid FROM flights_search WHERE {likes})",
+        [f"%{text}%"] * len(SEARCH_COLUMNS),
+    )
@@ -0,0 +1,257 @@
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from flight_manager.models.flight import FlightStatus
+from flight_manager.models.timestamps import EPOCH
+
+# Departures and arrivals more than this many seconds behind schedule count as
+# delayed, following the usual 15 minute on-time definition.
+LATE_AFTER = 15 * 60
+
+_DAY = 86400
+
+_COMPANY_COLUMNS = (
+    "flights",
+    "departed",
+    "delayed_departures",
+    "departure_delay",
+    "arrived",
+    "delayed_arrivals",
+)
+
+
+def _company_values(row: str) -> List[str]:
+    departure_delay = f"{row}.departure_time - {row}.scheduled_departure_time"
+    arrival_delay = f"{row}.arrival_time - {row}.estimated_arrival_time"
+    return [
+        "1",
+        f"{row}.departure_time IS NOT NULL",
+        f"IFNULL({departure_delay} > {LATE_AFTER}, 0)",
+        f"IFNULL(MAX({departure_delay}, 0), 0)",
+        f"{row}.arrival_time IS NOT NULL",
+        f"IFNULL({arrival_delay} > {LATE_AFTER}, 0)",
+    ]
+
+
+def _apply(row: str, sign: int) -> str:
+    """Statements adding (sign 1) or removing (sign -1) one flight's counts"""
+    values = ", ".join(f"{sign} * ({value})" for value in _company_values(row))
+    counters = ", ".join(
+        f"{column} = {column} + excluded.{column}" for column in _COMPANY_COLUMNS
+    )
+    return f"""
+        INSERT INTO company_stats (company, {", ".join(_COMPANY_COLUMNS)})
+        VALUES ({row}.company, {values})
+        ON CONFLICT (company) DO UPDATE SET {counters};
+        INSERT INTO airport_day_stats
+            (airport_code, day, status, departures, arrivals)
+        VALUES
+            ({row}.origin_airport_code, {row}.scheduled_departure_time / {_DAY},
+                {row}.status, {sign}, 0),
+            ({row}.destination_airport_code, {row}.estimated_arrival_time / {_DAY},
+                {row}.status, 0, {sign})
+        ON CONFLICT (airport_code, day, status) DO UPDATE SET
+            departures = departures + excluded.departures,
+            arrivals = arrivals + excluded.arrivals;
+    """
+
+
+_TABLES = (
+    f"""
+    CREATE TABLE IF NOT EXISTS company_stats (
+        company TEXT PRIMARY KEY,
+        {", ".join(f"{column} INTEGER NOT NULL" for column in _COMPANY_COLUMNS)}
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS airport_day_stats (
+        airport_code TEXT NOT NULL,
+        day INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        departures INTEGER NOT NULL,
+        arrivals INTEGER NOT NULL,
+        PRIMARY KEY (airport_code, day, status)
+    ) WITHOUT ROWID
+    """,
+)
+
+_INSERT_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS flights_stats_insert AFTER INSERT ON flights
+    BEGIN
+        {_apply("new", 1)}
+    END
+"""
+
+_TRIGGERS = (
+    _INSERT_TRIGGER,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS flights_stats_update
+    AFTER UPDATE OF company, status, origin_airport_code, destination_airport_code,
+        scheduled_departure_time, estimated_arrival_time, departure_time,
+        arrival_time ON flights
+    BEGIN
+        {_apply("old", -1)}
+        {_apply("new", 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS flights_stats_delete AFTER DELETE ON flights
+    BEGIN
+        {_apply("old", -1)}
+    END
+    """,
+)
+
+
+def create_stats_tables(conn: sqlite3.Connection) -> None:
+    """Create the summary tables and the triggers that keep them current"""
+    for statement in _TABLES + _TRIGGERS:
+        conn.execute(statement)
+
+
+def _add_flights(conn: sqlite3.Connection, where: str, params: Any = ()) -> None:
+    """Add the counts of the flights matching ``where`` to the summary tables"""
+    sums = ", ".join(f"SUM({value})" for value in _company_values("flights"))
+    counters = ", ".join(
+        f"{column} = {column} + excluded.{column}" for column in _COMPANY_COLUMNS
+    )
+    conn.execute(
+        f"""
+        INSERT INTO company_stats (company, {", ".join(_COMPANY_COLUMNS)})
+        SELECT company, {sums} FROM flights WHERE {where} GROUP BY company
+        ON CONFLICT (company) DO UPDATE SET {counters}
+    """,
+        params,
+    )
+    conn.execute(
+        f"""
+        INSERT INTO airport_day_stats (airport_code, day, status, departures, arrivals)
+        SELECT airport_code, day, status, SUM(departures), SUM(arrivals)
+        FROM (
+            SELECT origin_airport_code AS airport_code,
+                scheduled_departure_time / {_DAY} AS day,
+                status, 1 AS departures, 0 AS arrivals
+            FROM flights
+            WHERE {where}
+            UNION ALL
+            SELECT destination_airport_code, estimated_arrival_time / {_DAY},
+                status, 0, 1
+            FROM flights
+            WHERE {where}
+        )
+        WHERE true
+        GROUP BY airport_code, day, status
+        ON CONFLICT (airport_code, day, status) DO UPDATE SET
+            departures = departures + excluded.departures,
+            arrivals = arrivals + excluded.arrivals
+    """,
+        [*params, *params],
+    )
+
+
+@contextmanager
+def deferred_stats(conn: sqlite3.Connection) -> Iterator[None]:
+    """Count flights inserted inside the block with one pass at the end.
+
+    Works like search.deferred_indexing: the per-row insert trigger is
+    dropped for the block and recreated inside the caller's transaction.
+    """
+    last_id = conn.execute(
+        "SELECT IFNULL(MAX(flight_id), 0) FROM flights"
+    ).fetchone()[0]
+    conn.execute("DROP TRIGGER IF EXISTS flights_stats_insert")
+    try:
+        yield
+        _add_flights(conn, "flight_id > ?", (last_id,))
+    finally:
+        conn.execute(_INSERT_TRIGGER)
+
+
+@dataclass
+class CompanyStats:
+    company: str
+    flights: int
+    departed: int
+    delayed_departures: int
+    departure_delay: int
+    arrived: int
+    delayed_arrivals: int
+
+    @property
+    def on_time_departure_rate(self) -> Optional[float]:
+        if not self.departed:
+            return None
+        return 1 - self.delayed_departures / self.departed
+
+    @property
+    def on_time_arrival_rate(self) -> Optional[float]:
+        if not self.arrived:
+            return None
+        return 1 - self.delayed_arrivals / self.arrived
+
+    @property
+    def average_departure_delay(self) -> Optional[timedelta]:
+        if not self.departed:
+            return None
+        return timedelta(seconds=self.departure_delay / self.departed)
+
+
+@dataclass
+class AirportDayStats:
+    airport_code: str
+    day: date
+    departures: Dict[FlightStatus, int] = field(default_factory=dict)
+    arrivals: Dict[FlightStatus, int] = field(default_factory=dict)
+
+
+def _epoch_day(day: date) -> int:
+    return (day - EPOCH.date()).days
+
+
+def get_company_stats(
+    conn: sqlite3.Connection, company: Optional[str] = None
+) -> List[CompanyStats]:
+    query = f"SELECT company, {', '.join(_COMPANY_COLUMNS)} FROM company_stats"
+    params = []
+    if company is not None:
+        query += " WHERE company = ?"
+        params.append(company)
+    query += " ORDER BY company"
+    return [
+        CompanyStats(*row) for row in conn.execute(query, params) if row[1] > 0
+    ]
+
+
+def get_airport_stats(
+    conn: sqlite3.Connection,
+    airport_code: str,
+    start: date,
+    end: Optional[date] = None,
+) -> List[AirportDayStats]:
+    """Flight counts by status for each day in [start, end] with any flights"""
+    end = end or start
+    days: Dict[int, AirportDayStats] = {}
+    for day, status, departures, arrivals in conn.execute(
+        """
+        SELECT day, status, departures, arrivals
+        FROM airport_day_stats
+        WHERE airport_code = ? AND day BETWEEN ? AND ?
+        ORDER BY day
+    """,
+        (airport_code, _epoch_day(start), _epoch_day(end)),
+    ):
+        if not departures and not arrivals:
+            continue
+        stats = days.get(day)
+        if stats is None:
+            stats = days[day] = AirportDayStats(
+                airport_code, EPOCH.date() + timedelta(days=day)
+            )
+        if departures:
+            stats.departures[FlightStatus(status)] = departures
+        if arrivals:
+            stats.arrivals[FlightStatus(status)] = arrivals
+    return list(days.values())
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Union
+
+# Naive datetimes are treated as UTC, so they round-trip unchanged.
+EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+Stored = Union[int, str]
+
+
+def to_epoch(value: Union[datetime, Stored, None]) -> Optional[int]:
+    """Convert a datetime (or an already stored value) to epoch seconds"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // _SECOND
+
+
+def from_epoch(value: Union[Stored, datetime, None]) -> Optional[datetime]:
+    """Convert a stored value back to a naive UTC datetime.
+
+    ISO strings from databases that predate the epoch columns are accepted too.
+    """
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return EPOCH + timedelta(seconds=value)
+
+
+class LazyDateTime:
+    """Dataclass field that holds the stored value until it is first read.
+
+    Hydration can pass the raw column value straight through; it is turned
+    into a ``datetime`` on first access and cached on the instance. Listings
+    that never look at a timestamp never pay for converting it.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, owner: Optional[type] = None) -> Any:
+        if obj is None:
+            # No class-level default, so dataclass treats the field as required.
+            raise AttributeError(self.name)
+        value = obj.__dict__[self.name]
+        if value is None or isinstance(value, datetime):
+            return value
+        value = obj.__dict__[self.name] = from_epoch(value)
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        obj.__dict__[self.name] = value
@@ -0,0 +1,50 @@
+from typing import Any, Callable, ClassVar, Dict, Tuple
+
+
+def as_is(value: Any) -> Any:
+    return value
+
+
+class Tracked:
+    """Mixin that records which persisted fields changed since the last load/save.
+
+    Subclasses list their persisted fields in ``_columns`` as
+    ``field -> (column, to_db)``, where ``to_db`` converts the attribute to the
+    value stored in the database. Tracking starts once ``mark_clean`` is called;
+    until then the instance is treated as entirely dirty.
+    """
+
+    _columns: ClassVar[Dict[str, Tuple[str, Callable[[Any], Any]]]] = {}
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        original = self.__dict__.get("_original")
+        if original is not None and name in self._columns and name not in original:
+            original[name] = getattr(self, name)
+        object.__setattr__(self, name, value)
+
+    def mark_clean(self) -> None:
+        object.__setattr__(self, "_original", {})
+
+    @property
+    def is_tracked(self) -> bool:
+        return self.__dict__.get("_original") is not None
+
+    def column_values(self) -> Dict[str, Any]:
+        return {
+            column: to_db(getattr(self, name))
+            for name, (column, to_db) in self._columns.items()
+        }
+
+    def changed_columns(self) -> Dict[str, Any]:
+        """Return the columns that need writing, mapped to their new values"""
+        if not self.is_tracked:
+            return self.column_values()
+
+        changes = {}
+        for name, (column, to_db) in self._columns.items():
+            if name not in self._original:
+                continue
+            new = to_db(getattr(self, name))
+            if new != to_db(self._original[name]):
+                changes[column] = new
+        return changes
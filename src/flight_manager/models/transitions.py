@@ -0,0 +1,155 @@
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from flight_manager.models.db import transaction
+from flight_manager.models.flight import STATUS_TRANSITIONS, FlightStatus
+from flight_manager.models.timestamps import to_epoch
+
+DEFAULT_BOARDING = timedelta(minutes=30)
+DEFAULT_ALIGHTING = timedelta(minutes=30)
+
+
+@dataclass(frozen=True)
+class TransitionRule:
+    """Move every flight in ``source`` matching ``condition`` to ``target``.
+
+    ``condition`` is an SQL expression over the flights columns. It is given
+    ``:now`` and the rule's ``params`` (times in epoch seconds, durations in
+    seconds) as named parameters.
+    """
+
+    name: str
+    source: FlightStatus
+    target: FlightStatus
+    condition: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.target not in STATUS_TRANSITIONS[self.source]:
+            raise ValueError(
+                f"rule {self.name}: {self.source.value} cannot go to "
+                f"{self.target.value}"
+            )
+
+    def sql(self) -> str:
+        # The status comes first in idx_flights_status, followed by the
+        # departure time most conditions bound, so each rule is a range scan.
+        return f"""
+            UPDATE flights SET status = '{self.target.value}'
+            WHERE status = '{self.source.value}' AND ({self.condition})
+        """
+
+
+# Neither end of the flight is closed or on warning.
+_AIRPORTS_CLEAR = """
+    NOT EXISTS (
+        SELECT 1 FROM airports
+        WHERE code IN (origin_airport_code, destination_airport_code)
+            AND status != 'all_clear'
+    )
+"""
+
+
+def default_rules(
+    boarding: timedelta = DEFAULT_BOARDING, alighting: timedelta = DEFAULT_ALIGHTING
+) -> List[TransitionRule]:
+    """The time-driven rules, in the order a sweep applies them.
+
+    Pending flights board ``boarding`` before their scheduled departure and
+    are delayed once it passes. Flights delayed by an airport closure
+    (closures.delay_flights_at) board again once they are back inside that
+    window and both airports are clear; other delays stay until an operator
+    lifts them. A flight whose departure has been recorded boards and is
+    in the air in the same sweep, whether it was pending or delayed. It
+    lands when its arrival is recorded and counts as arrived ``alighting``
+    later.
+    """
+    seconds = {"boarding": boarding // timedelta(seconds=1)}
+    return [
+        TransitionRule(
+            "delay_missed_departures",
+            FlightStatus.PENDING,
+            FlightStatus.DELAYED,
+            "scheduled_departure_time < :now AND departure_time IS NULL",
+        ),
+        TransitionRule(
+            "start_boarding",
+            FlightStatus.PENDING,
+            FlightStatus.BOARDING,
+            "(scheduled_departure_time BETWEEN :now AND :now + :boarding)"
+            " OR departure_time <= :now",
+            seconds,
+        ),
+        TransitionRule(
+            "resume_boarding",
+            FlightStatus.DELAYED,
+            FlightStatus.BOARDING,
+            "(flight_id IN (SELECT flight_id FROM closure_delays)"
+            " AND scheduled_departure_time BETWEEN :now AND :now + :boarding"
+            f" AND {_AIRPORTS_CLEAR}) OR departure_time <= :now",
+            seconds,
+        ),
+        TransitionRule(
+            "depart",
+            FlightStatus.BOARDING,
+            FlightStatus.IN_FLIGHT,
+            "departure_time <= :now",
+        ),
+        TransitionRule(
+            "land",
+            FlightStatus.IN_FLIGHT,
+            FlightStatus.ALIGHT,
+            "arrival_time <= :now",
+        ),
+        TransitionRule(
+            "finish_alighting",
+            FlightStatus.ALIGHT,
+            FlightStatus.ARRIVED,
+            "arrival_time <= :now - :alighting",
+            {"alighting": alighting // timedelta(seconds=1)},
+        ),
+    ]
+
+
+@dataclass
+class SweepResult:
+    now: datetime
+    # Rule name -> flights it moved, in the order the rules ran.
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+class _DryRun(Exception):
+    pass
+
+
+def sweep(
+    conn: sqlite3.Connection,
+    now: Optional[datetime] = None,
+    rules: Optional[Sequence[TransitionRule]] = None,
+    dry_run: bool = False,
+) -> SweepResult:
+    """Apply each rule as one UPDATE, in order, inside a single transaction.
+
+    A flight can take several steps in one sweep, e.g. land and finish
+    alighting if its arrival was recorded long enough ago. With ``dry_run``
+    the counts are reported and the changes rolled back.
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    rules = default_rules() if rules is None else rules
+    result = SweepResult(now)
+    try:
+        with transaction(conn):
+            for rule in rules:
+                cursor = conn.execute(rule.sql(), {**rule.params, "now": to_epoch(now)})
+                result.counts[rule.name] = cursor.rowcount
+            if dry_run:
+                raise _DryRun
+    except _DryRun:
+        pass
+    return result
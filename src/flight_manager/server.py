@@ -0,0 +1,987 @@
+"""HTTP/JSON API over the airport, pilot and flight models.
+
+An asyncio server speaks HTTP/1.1 with keep-alive and pipelining and hands
+each request to a thread pool, so the blocking sqlite3 calls never stall the
+event loop. Reads run on a bounded pool of worker threads; writes go through
+a single writer thread, which is all SQLite allows at once anyway, so they
+queue in memory instead of sleeping in SQLite's busy handler.
+
+``GET /changes?since=N&wait=30`` long-polls the flight change log: displays
+hold a request open until a change arrives, and one shared check of the log
+serves all of them.
+
+    python -m flight_manager.server --db airline.db --port 8080 --workers 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import re
+import signal
+import sqlite3
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from http import HTTPStatus
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from flight_manager.cli import (
+    FLIGHT_COLUMNS,
+    airport_record,
+    change_record,
+    flight_record,
+    flight_row_record,
+    impact_record,
+    leg_record,
+    pilot_record,
+    references_record,
+)
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.changes import latest_seq, read_changes
+from flight_manager.models.db import (
+    DEFAULT_DB_PATH,
+    DEFAULT_PROFILE,
+    ConnectionPool,
+    StorageProfile,
+    transaction,
+)
+from flight_manager.models.flight import Flight, FlightStatus, InvalidTransitionError
+from flight_manager.models.migrations import migrate
+from flight_manager.models.pilot import Pilot
+from flight_manager.models.references import (
+    DEFAULT_SAMPLE_SIZE,
+    DeleteMode,
+    ReferencedError,
+)
+from flight_manager.models.routes import (
+    DEFAULT_MAX_HOPS,
+    DEFAULT_MIN_CONNECTION,
+    Journey,
+    RouteGraph,
+)
+from flight_manager.models.scheduling import ScheduleConflictError
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 8
+
+# Requests read ahead on one connection before its responses are sent.
+MAX_PIPELINE = 32
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Longest a request may wait for changes, and how often the change log is
+# checked for writes from other processes while any request is waiting.
+MAX_WAIT_SECONDS = 60
+CHANGE_POLL_INTERVAL = 0.5
+
+# How far ahead of the start of the day the shared route graph reaches.
+ROUTE_WINDOW = timedelta(days=7)
+
+SAFE_METHODS = ("GET", "HEAD")
+
+Body = Any
+T = TypeVar("T")
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+    keep_alive: bool
+    # The FlightAPI serving the request, for handlers that use its caches.
+    app: Optional["FlightAPI"] = None
+
+    def json(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        return data
+
+
+Handler = Callable[..., Body]
+
+
+@dataclass(frozen=True)
+class Route:
+    method: str
+    pattern: "re.Pattern[str]"
+    handler: Handler
+    status: int = 200
+    long_poll: bool = False
+
+
+ROUTES: List[Route] = []
+
+
+def route(
+    method: str, path: str, status: int = 200, long_poll: bool = False
+) -> Callable[[Handler], Handler]:
+    """Register a handler for ``method`` on ``path``, a regex of the full path.
+
+    Handlers take the connection, the request and the path's groups, and
+    return the JSON body. ``long_poll`` handlers return ``{"changes": [...],
+    "next": seq}`` and are run again as the change log grows, for as long as
+    the request's ``wait`` allows, while they have no changes to return.
+    """
+
+    def register(handler: Handler) -> Handler:
+        ROUTES.append(Route(method, re.compile(path + "$"), handler, status, long_poll))
+        return handler
+
+    return register
+
+
+def _airport(conn: sqlite3.Connection, code: str) -> Airport:
+    airport = Airport.get_by_code(conn, code.upper())
+    if airport is None:
+        raise HTTPError(404, f"no airport found with code {code}")
+    return airport
+
+
+def _pilot(conn: sqlite3.Connection, pilot_id: str) -> Pilot:
+    pilot = Pilot.get_by_id(conn, pilot_id.upper())
+    if pilot is None:
+        raise HTTPError(404, f"no pilot found with ID {pilot_id}")
+    return pilot
+
+
+def _flight(conn: sqlite3.Connection, flight_id: str) -> Flight:
+    flight = Flight.get_by_id(conn, int(flight_id))
+    if flight is None:
+        raise HTTPError(404, f"no flight found with ID {flight_id}")
+    return flight
+
+
+def _required(data: Dict[str, Any], name: str) -> Any:
+    try:
+        return data[name]
+    except KeyError:
+        raise HTTPError(400, f"missing field {name!r}")
+
+
+def _datetime(value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"invalid time {value!r}, expected ISO 8601")
+
+
+def _limit(query: Dict[str, str]) -> int:
+    try:
+        limit = min(int(query.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        raise HTTPError(400, "limit must be an integer")
+    if limit < 1:
+        raise HTTPError(400, "limit must be positive")
+    return limit
+
+
+def _wait(request: Request) -> float:
+    try:
+        wait = float(request.query.get("wait", 0))
+    except ValueError:
+        raise HTTPError(400, "wait must be a number of seconds")
+    return min(max(wait, 0), MAX_WAIT_SECONDS)
+
+
+def _status(enum: type, value: str) -> Any:
+    try:
+        return enum(value)
+    except ValueError:
+        choices = ", ".join(member.value for member in enum)
+        raise HTTPError(400, f"invalid status {value!r}, expected one of {choices}")
+
+
+def _delete_mode(query: Dict[str, str]) -> DeleteMode:
+    try:
+        return DeleteMode(query.get("mode", DeleteMode.RESTRICT.value))
+    except ValueError:
+        choices = ", ".join(mode.value for mode in DeleteMode)
+        raise HTTPError(
+            400, f"invalid mode {query['mode']!r}, expected one of {choices}"
+        )
+
+
+def _sample(query: Dict[str, str]) -> int:
+    return _limit(query) if "limit" in query else DEFAULT_SAMPLE_SIZE
+
+
+@route("GET", r"/airports")
+def list_airports(conn: sqlite3.Connection, request: Request) -> Body:
+    return [airport_record(airport) for airport in Airport.get_all(conn)]
+
+
+@route("POST", r"/airports", status=201)
+def add_airport(conn: sqlite3.Connection, request: Request) -> Body:
+    data = request.json()
+    airport = Airport.create(
+        conn,
+        _required(data, "code").upper(),
+        _required(data, "name"),
+        _required(data, "address"),
+        _status(AirportStatus, data.get("status", AirportStatus.ALL_CLEAR.value)),
+    )
+    return airport_record(airport)
+
+
+@route("GET", r"/airports/(\w+)")
+def get_airport(conn: sqlite3.Connection, request: Request, code: str) -> Body:
+    return airport_record(_airport(conn, code))
+
+
+@route("PATCH", r"/airports/(\w+)")
+def update_airport(conn: sqlite3.Connection, request: Request, code: str) -> Body:
+    data = request.json()
+    airport = _airport(conn, code)
+    if "name" in data:
+        airport.name = data["name"]
+    if "address" in data:
+        airport.address = data["address"]
+    if "status" in data:
+        airport.status = _status(AirportStatus, data["status"])
+    impact = airport.update(conn)
+    if impact is None:
+        return airport_record(airport)
+    return {**airport_record(airport), "impact": impact_record(impact)}
+
+
+@route("GET", r"/airports/(\w+)/references")
+def airport_references(conn: sqlite3.Connection, request: Request, code: str) -> Body:
+    references = _airport(conn, code).references(conn, _sample(request.query))
+    return references_record(references)
+
+
+@route("DELETE", r"/airports/(\w+)", status=204)
+def delete_airport(conn: sqlite3.Connection, request: Request, code: str) -> Body:
+    """Takes ``mode=cascade``, or ``mode=reassign&to=CODE``"""
+    airport = _airport(conn, code)
+    mode = _delete_mode(request.query)
+    target = request.query.get("to")
+    if mode is DeleteMode.REASSIGN and not target:
+        raise HTTPError(400, "mode=reassign needs the airport code to move flights to")
+    airport.delete(conn, mode, target.upper() if target else None)
+
+
+@route("GET", r"/pilots")
+def list_pilots(conn: sqlite3.Connection, request: Request) -> Body:
+    return [pilot_record(pilot) for pilot in Pilot.get_all(conn)]
+
+
+@route("POST", r"/pilots", status=201)
+def add_pilot(conn: sqlite3.Connection, request: Request) -> Body:
+    data = request.json()
+    pilot = Pilot.create(
+        conn, _required(data, "first_name"), _required(data, "last_name")
+    )
+    return pilot_record(pilot)
+
+
+@route("GET", r"/pilots/(\w+)")
+def get_pilot(conn: sqlite3.Connection, request: Request, pilot_id: str) -> Body:
+    return pilot_record(_pilot(conn, pilot_id))
+
+
+@route("PATCH", r"/pilots/(\w+)")
+def update_pilot(conn: sqlite3.Connection, request: Request, pilot_id: str) -> Body:
+    data = request.json()
+    pilot = _pilot(conn, pilot_id)
+    if "first_name" in data:
+        pilot.first_name = data["first_name"]
+    if "last_name" in data:
+        pilot.last_name = data["last_name"]
+    pilot.save(conn)
+    return pilot_record(pilot)
+
+
+@route("GET", r"/pilots/(\w+)/references")
+def pilot_references(conn: sqlite3.Connection, request: Request, pilot_id: str) -> Body:
+    references = _pilot(conn, pilot_id).references(conn, _sample(request.query))
+    return references_record(references)
+
+
+@route("DELETE", r"/pilots/(\w+)", status=204)
+def delete_pilot(conn: sqlite3.Connection, request: Request, pilot_id: str) -> Body:
+    """Takes ``mode=cascade``, or ``mode=reassign`` with ``to=PILOT_ID``.
+
+    Without ``to`` the pilot's flights are left unassigned.
+    """
+    pilot = _pilot(conn, pilot_id)
+    target = request.query.get("to")
+    pilot.delete(conn, _delete_mode(request.query), target.upper() if target else None)
+
+
+@route("GET", r"/flights")
+def list_flights(conn: sqlite3.Connection, request: Request) -> Body:
+    """One page of flights in departure order.
+
+    Takes the filters of ``manage-flight flights list`` as query parameters.
+    ``next`` is the flight_id to pass as ``after`` for the following page.
+    """
+    query = request.query
+    limit = _limit(query)
+    after = query.get("after")
+    if after is not None and not after.isdigit():
+        raise HTTPError(400, "after must be a flight_id")
+
+    flights = Flight.iter_all(
+        conn,
+        flight_number=query.get("flight_number"),
+        status=_status(FlightStatus, query["status"]) if "status" in query else None,
+        company=query.get("company"),
+        pilot=_pilot(conn, query["pilot_id"]) if "pilot_id" in query else None,
+        origin_airport=_airport(conn, query["origin"]) if "origin" in query else None,
+        destination_airport=(
+            _airport(conn, query["destination"]) if "destination" in query else None
+        ),
+        departure_after=_datetime(query.get("departure_after")),
+        departure_before=_datetime(query.get("departure_before")),
+        arrival_after=_datetime(query.get("arrival_after")),
+        arrival_before=_datetime(query.get("arrival_before")),
+        q=query.get("q"),
+        page_size=limit + 1,
+        after=_flight(conn, after) if after is not None else None,
+        columns=FLIGHT_COLUMNS,
+    )
+    page = [flight_row_record(row) for row in itertools.islice(flights, limit + 1)]
+    more = len(page) > limit
+    del page[limit:]
+    return {"flights": page, "next": page[-1]["flight_id"] if more else None}
+
+
+def _apply_flight_fields(
+    conn: sqlite3.Connection, flight: Flight, data: Dict[str, Any]
+) -> None:
+    if "flight_number" in data:
+        flight.flight_number = data["flight_number"]
+    if "origin_airport_code" in data:
+        flight.origin_airport = _airport(conn, data["origin_airport_code"])
+    if "destination_airport_code" in data:
+        flight.destination_airport = _airport(conn, data["destination_airport_code"])
+    if "scheduled_departure_time" in data:
+        flight.scheduled_departure_time = _datetime(data["scheduled_departure_time"])
+    if "estimated_arrival_time" in data:
+        flight.estimated_arrival_time = _datetime(data["estimated_arrival_time"])
+    if "departure_time" in data:
+        flight.departure_time = _datetime(data["departure_time"])
+    if "arrival_time" in data:
+        flight.arrival_time = _datetime(data["arrival_time"])
+    if "status" in data:
+        flight.status = _status(FlightStatus, data["status"])
+    if "company" in data:
+        flight.company = data["company"]
+    if "pilot_id" in data:
+        pilot_id = data["pilot_id"]
+        flight.pilot = None if pilot_id is None else _pilot(conn, pilot_id)
+
+
+@route("POST", r"/flights", status=201)
+def add_flight(conn: sqlite3.Connection, request: Request) -> Body:
+    data = request.json()
+    pilot_id = data.get("pilot_id")
+    flight = Flight.create(
+        conn,
+        flight_number=_required(data, "flight_number"),
+        origin_airport=_airport(conn, _required(data, "origin_airport_code")),
+        destination_airport=_airport(
+            conn, _required(data, "destination_airport_code")
+        ),
+        scheduled_departure_time=_datetime(_required(data, "scheduled_departure_time")),
+        estimated_arrival_time=_datetime(_required(data, "estimated_arrival_time")),
+        company=_required(data, "company"),
+        pilot=_pilot(conn, pilot_id) if pilot_id else None,
+        status=_status(FlightStatus, data.get("status", FlightStatus.PENDING.value)),
+    )
+    return flight_record(flight)
+
+
+@route("GET", r"/flights/(\d+)")
+def get_flight(conn: sqlite3.Connection, request: Request, flight_id: str) -> Body:
+    return flight_record(_flight(conn, flight_id))
+
+
+@route("PATCH", r"/flights/(\d+)")
+def update_flight(conn: sqlite3.Connection, request: Request, flight_id: str) -> Body:
+    data = request.json()
+    flight = _flight(conn, flight_id)
+    _apply_flight_fields(conn, flight, data)
+    flight.save(conn)
+    return flight_record(flight)
+
+
+@route("DELETE", r"/flights/(\d+)", status=204)
+def delete_flight(conn: sqlite3.Connection, request: Request, flight_id: str) -> Body:
+    _flight(conn, flight_id).delete(conn)
+
+
+@route("GET", r"/changes", long_poll=True)
+def list_changes(conn: sqlite3.Connection, request: Request) -> Body:
+    """Changes to flights logged after ``since``, oldest first.
+
+    ``next`` is the seq to pass as ``since`` for the following request.
+    Without ``since`` no changes are returned, only the current ``next``:
+    take it before listing flights, then follow the log from there.
+    """
+    query = request.query
+    airport = _airport(conn, query["airport"]).code if "airport" in query else None
+    since = query.get("since")
+    if since is None:
+        return {"changes": [], "next": latest_seq(conn)}
+    if not since.isdigit():
+        raise HTTPError(400, "since must be a change seq")
+    page = read_changes(conn, int(since), airport, _limit(query))
+    return {
+        "changes": [change_record(change) for change in page.changes],
+        "next": page.last_seq,
+    }
+
+
+def _int(query: Dict[str, str], name: str, default: int) -> int:
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+    if value < 1:
+        raise HTTPError(400, f"{name} must be positive")
+    return value
+
+
+@route("GET", r"/routes")
+def find_route(conn: sqlite3.Connection, request: Request) -> Body:
+    """The connection ``manage-flight flights route`` finds, as its legs.
+
+    Takes ``origin``, ``destination`` and ``after``, and optionally
+    ``window_hours``, ``min_connection_minutes``, ``fewest_hops`` and
+    ``max_hops`` with the same defaults as the command.
+    """
+    query = request.query
+    origin = _airport(conn, _required(query, "origin")).code
+    destination = _airport(conn, _required(query, "destination")).code
+    after = _datetime(_required(query, "after"))
+    window_hours = _int(query, "window_hours", 24)
+    before = after + timedelta(hours=window_hours)
+    default_minutes = DEFAULT_MIN_CONNECTION // timedelta(minutes=1)
+    min_connection = timedelta(
+        minutes=_int(query, "min_connection_minutes", default_minutes)
+    )
+    max_hops = _int(query, "max_hops", DEFAULT_MAX_HOPS)
+
+    def search(graph: RouteGraph) -> Optional[Journey]:
+        if query.get("fewest_hops") in ("1", "true"):
+            return graph.fewest_hops(origin, destination, after, max_hops, before)
+        return graph.earliest_arrival(origin, destination, after, before)
+
+    assert request.app is not None
+    journey = request.app.routes.search(conn, after, before, min_connection, search)
+    if journey is None:
+        raise HTTPError(
+            404,
+            f"no connection from {origin} to {destination} "
+            f"within {window_hours} hours",
+        )
+    return {"legs": [leg_record(leg) for leg in journey.legs]}
+
+
+def _match(method: str, path: str) -> Tuple[Route, Tuple[str, ...]]:
+    allowed = False
+    for candidate in ROUTES:
+        match = candidate.pattern.match(path)
+        if match is None:
+            continue
+        if candidate.method == method or (
+            method == "HEAD" and candidate.method == "GET"
+        ):
+            return candidate, tuple(map(unquote, match.groups()))
+        allowed = True
+    if allowed:
+        raise HTTPError(405, f"{method} is not allowed on {path}")
+    raise HTTPError(404, f"no such resource {path}")
+
+
+def _response(
+    status: int, body: Body, keep_alive: bool = True, head_only: bool = False
+) -> bytes:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    payload = b""
+    if status != 204:
+        payload = json.dumps(body).encode()
+        lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(payload)}")
+    if not keep_alive:
+        lines.append("Connection: close")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return head if head_only else head + payload
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read the next request, or return None once the client is done"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HTTPError(400, "incomplete request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "request headers are too large")
+
+    request_line, *header_lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = request_line.split(" ")
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+
+    headers = {}
+    for line in header_lines:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", ""):
+        raise HTTPError(501, "chunked request bodies are not supported")
+    try:
+        length = int(headers.get("content-length", 0))
+        if length < 0:
+            raise ValueError(length)
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "request body is too large")
+    body = await reader.readexactly(length) if length else b""
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = (
+        connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+    )
+    url = urlsplit(target)
+    return Request(
+        method.upper(), url.path, dict(parse_qsl(url.query)), headers, body, keep_alive
+    )
+
+
+# A queued request: the future to resolve, its route, the request and the
+# route's path arguments.
+_Call = Tuple[asyncio.Future, Route, Request, Tuple[str, ...]]
+_Result = Tuple[asyncio.Future, Body, Optional[BaseException]]
+
+
+def _resolve(results: List[_Result]) -> None:
+    for future, body, error in results:
+        if future.cancelled():
+            continue
+        if error is None:
+            future.set_result(body)
+        else:
+            future.set_exception(error)
+
+
+class RouteCache:
+    """One RouteGraph of the flights departing from the start of the day
+    through ROUTE_WINDOW, shared by every route search.
+
+    Before each search the graph applies the changes logged since the last
+    one, so it is loaded once a day rather than once per request. Searches
+    outside that window, or with another minimum connection time, load a
+    graph of their own as the CLI does.
+    """
+
+    def __init__(self) -> None:
+        self._graph: Optional[RouteGraph] = None
+        self._day: Optional[date] = None
+        # Searches run on several worker threads; the graph is not safe to
+        # read while it is being refreshed.
+        self._lock = threading.Lock()
+
+    def search(
+        self,
+        conn: sqlite3.Connection,
+        start: datetime,
+        end: datetime,
+        min_connection: timedelta,
+        search: Callable[[RouteGraph], T],
+    ) -> T:
+        if min_connection == DEFAULT_MIN_CONNECTION:
+            today = datetime.now(timezone.utc).date()
+            with self._lock:
+                graph = self._graph
+                if graph is None or self._day != today:
+                    midnight = datetime.combine(today, time())
+                    graph = RouteGraph.load(conn, midnight, midnight + ROUTE_WINDOW)
+                    self._graph, self._day = graph, today
+                if graph.covers(start, end):
+                    graph.refresh(conn)
+                    return search(graph)
+        return search(RouteGraph.load(conn, start, end, min_connection))
+
+
+class ChangeWatcher:
+    """Wakes long-polling requests once the change log grows past their seq.
+
+    Writes made through the API report the newest seq when they commit.
+    Writes from other processes are picked up by a single poll of the log
+    that runs while any request is waiting, however many there are.
+    """
+
+    def __init__(self, latest: Callable[[], Awaitable[int]]) -> None:
+        self.seq = 0
+        self._latest = latest
+        self._changed = asyncio.Event()
+        self._waiting = 0
+        self._poller: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def advance(self, seq: int) -> None:
+        if seq > self.seq:
+            self.seq = seq
+            self._changed.set()
+            self._changed = asyncio.Event()
+
+    async def wait(self, seq: int, timeout: float) -> bool:
+        """Wait for a change after ``seq``; False on timeout or shutdown"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self._waiting += 1
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll())
+        try:
+            while self.seq <= seq and not self._closed:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    return False
+            return not self._closed
+        finally:
+            self._waiting -= 1
+
+    async def _poll(self) -> None:
+        try:
+            while self._waiting and not self._closed:
+                self.advance(await self._latest())
+                await asyncio.sleep(CHANGE_POLL_INTERVAL)
+        finally:
+            self._poller = None
+
+    async def close(self) -> None:
+        """Release every waiting request and stop polling"""
+        self._closed = True
+        self._changed.set()
+        if self._poller is not None:
+            self._poller.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._poller
+
+
+class FlightAPI:
+    """Serves ROUTES from a pool of worker threads and one writer thread.
+
+    Handing a request to a thread and waking the event loop again costs
+    more than most lookups, so requests that arrive in the same event loop
+    iteration travel together: reads are split across the workers and each
+    batch of writes is committed as one transaction.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        workers: int = DEFAULT_WORKERS,
+        profile: StorageProfile = DEFAULT_PROFILE,
+    ) -> None:
+        # One connection per thread, so acquiring never waits.
+        self.pool = ConnectionPool(db_path, max_size=workers + 1, profile=profile)
+        self.workers = workers
+        self._readers = ThreadPoolExecutor(workers, thread_name_prefix="api-read")
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="api-write")
+        self._queued: Dict[bool, List[_Call]] = {False: [], True: []}
+        self._connections: Dict[asyncio.Task, asyncio.StreamReader] = {}
+        self.changes = ChangeWatcher(self._latest_change)
+        self.routes = RouteCache()
+
+    def _latest_seq(self) -> int:
+        with self.pool.connection() as conn:
+            return latest_seq(conn)
+
+    def _latest_change(self) -> Awaitable[int]:
+        return asyncio.get_running_loop().run_in_executor(
+            self._readers, self._latest_seq
+        )
+
+    def _run(self, route: Route, request: Request, args: Tuple[str, ...]) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        writes = request.method not in SAFE_METHODS
+        queue = self._queued[writes]
+        if not queue:
+            loop.call_soon(self._dispatch, loop, writes)
+        queue.append((future, route, request, args))
+        return future
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop, writes: bool) -> None:
+        calls, self._queued[writes] = self._queued[writes], []
+        if writes:
+            self._writer.submit(self._write_batch, loop, calls)
+            return
+        size = -(-len(calls) // self.workers)
+        for start in range(0, len(calls), size):
+            self._readers.submit(self._read_batch, loop, calls[start : start + size])
+
+    def _read_batch(self, loop: asyncio.AbstractEventLoop, calls: List[_Call]) -> None:
+        results: List[_Result] = []
+        with self.pool.connection() as conn:
+            for future, route, request, args in calls:
+                conn.identity_map.clear()
+                try:
+                    results.append((future, route.handler(conn, request, *args), None))
+                except Exception as e:
+                    results.append((future, None, e))
+        loop.call_soon_threadsafe(_resolve, results)
+
+    def _write_batch(self, loop: asyncio.AbstractEventLoop, calls: List[_Call]) -> None:
+        results: List[_Result] = []
+        with self.pool.connection() as conn:
+            try:
+                # Take the write lock up front; a read transaction upgraded
+                # later can fail with SQLITE_BUSY instead of waiting.
+                conn.execute("BEGIN IMMEDIATE")
+                for future, route, request, args in calls:
+                    try:
+                        with transaction(conn):
+                            body = route.handler(conn, request, *args)
+                        results.append((future, body, None))
+                    except Exception as e:
+                        results.append((future, None, e))
+                conn.commit()
+                loop.call_soon_threadsafe(self.changes.advance, latest_seq(conn))
+            except Exception as e:
+                conn.rollback()
+                results = [(call[0], None, e) for call in calls]
+        loop.call_soon_threadsafe(_resolve, results)
+
+    async def respond(self, request: Request) -> bytes:
+        """Run one request and return the complete HTTP response"""
+        status, body = 200, None
+        try:
+            route, args = _match(request.method, request.path)
+            request.app = self
+            wait = _wait(request) if route.long_poll else 0
+            body = await self._run(route, request, args)
+            if wait and "since" in request.query:
+                body = await self._long_poll(route, request, args, body, wait)
+            status = route.status
+        except HTTPError as e:
+            status, body = e.status, {"error": str(e)}
+        except (ScheduleConflictError, InvalidTransitionError, ReferencedError) as e:
+            status, body = 409, {"error": str(e)}
+        except sqlite3.IntegrityError as e:
+            status, body = 409, {"error": str(e)}
+        except KeyError as e:
+            status, body = 404, {"error": str(e.args[0]) if e.args else str(e)}
+        except ValueError as e:
+            status, body = 400, {"error": str(e)}
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+            status, body = 500, {"error": "internal server error"}
+        return _response(
+            status, body, request.keep_alive, head_only=request.method == "HEAD"
+        )
+
+    async def _long_poll(
+        self,
+        route: Route,
+        request: Request,
+        args: Tuple[str, ...],
+        body: Body,
+        wait: float,
+    ) -> Body:
+        """Run ``route`` again after each new change until it has some to return"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while not body["changes"]:
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await self.changes.wait(body["next"], remaining):
+                break
+            body = await self._run(route, request, args)
+        return body
+
+    async def serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer pipelined requests on one connection in order.
+
+        Consecutive reads run concurrently. A write waits for the requests
+        before it and holds back the ones after it, so a client sees its own
+        writes in the order it sent them.
+        """
+        responses: "asyncio.Queue[Optional[asyncio.Future]]" = asyncio.Queue(
+            MAX_PIPELINE
+        )
+        sender = asyncio.create_task(self._send(responses, writer))
+        handler = asyncio.current_task()
+        self._connections[handler] = reader
+        running: Set[asyncio.Future] = set()
+        last_write: Optional[asyncio.Future] = None
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as e:
+                    error = asyncio.get_running_loop().create_future()
+                    error.set_result(_response(e.status, {"error": str(e)}, False))
+                    await responses.put(error)
+                    break
+                if request is None:
+                    break
+
+                if request.method in SAFE_METHODS:
+                    if last_write is not None and not last_write.done():
+                        await asyncio.wait({last_write})
+                elif running:
+                    await asyncio.wait(running)
+
+                task = asyncio.create_task(self.respond(request))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                if request.method not in SAFE_METHODS:
+                    last_write = task
+                await responses.put(task)
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            await responses.put(None)
+            await sender
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+            # Only now, so shutdown waits for the responses still being sent.
+            del self._connections[handler]
+
+    @staticmethod
+    async def _send(
+        responses: "asyncio.Queue[Optional[asyncio.Future]]",
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        connected = True
+        while True:
+            response = await responses.get()
+            if response is None:
+                return
+            data = await response
+            if not connected:
+                continue
+            try:
+                writer.write(data)
+                # Batch the responses to a pipeline into as few writes as
+                # possible.
+                if responses.empty():
+                    await writer.drain()
+            except ConnectionError:
+                connected = False
+
+    async def start(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ) -> asyncio.AbstractServer:
+        return await asyncio.start_server(
+            self.serve_connection, host, port, limit=MAX_HEADER_BYTES
+        )
+
+    async def close_connections(self) -> None:
+        """Answer the requests already read, then close every connection"""
+        await self.changes.close()
+        for reader in self._connections.values():
+            reader.feed_eof()
+        if self._connections:
+            await asyncio.wait(list(self._connections))
+
+    def close(self) -> None:
+        self._readers.shutdown()
+        self._writer.shutdown()
+        self.pool.close()
+
+
+async def serve(
+    db_path: str = DEFAULT_DB_PATH,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = DEFAULT_WORKERS,
+) -> None:
+    api = FlightAPI(db_path, workers)
+    with api.pool.connection() as conn:
+        migrate(conn)
+        conn.commit()
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    server = await api.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving on http://{address[0]}:{address[1]}", flush=True)
+    try:
+        await stop.wait()
+    finally:
+        server.close()
+        await api.close_connections()
+        await server.wait_closed()
+        api.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="manage-flight-server",
+        description="Serve the airports, pilots and flights as an HTTP/JSON API.",
+    )
+    parser.add_argument(
+        "--db", default=DEFAULT_DB_PATH, help="database file (default: %(default)s)"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="default: %(default)s")
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="0 picks a free port"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="threads running reads (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    asyncio.run(serve(args.db, args.host, args.port, args.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
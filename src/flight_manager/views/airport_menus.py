@@ -1,6 +1,5 @@
 from flight_manager.models.db import get_connection
 from flight_manager.models.airports import Airport, AirportStatus
-from flight_manager.models.flight import Flight
 
 
 def add_airport():
@@ -76,9 +75,15 @@ def update_airport():
             choice = input("\nEnter your choice: ").strip().lower()
 
             if choice == "s":
-                airport.update(conn)
+                impact = airport.update(conn)
                 print("\nAirport updated successfully!")
                 print(f"Updated airport {airport.code}")
+                if impact is not None:
+                    print(
+                        f"Delayed {impact.delayed} of {impact.flights} upcoming "
+                        f"flights ({len(impact.companies)} companies, "
+                        f"{len(impact.pilots)} pilots)"
+                    )
                 break
             elif choice == "c":
                 print("\nUpdate cancelled. No changes were made.")
@@ -144,15 +149,13 @@ def delete_airport():
         )
         if confirmation == "y":
             try:
-                flights = Flight.get_all(conn, origin_airport=airport) + Flight.get_all(
-                    conn, destination_airport=airport
-                )
-                if flights:
+                references = airport.references(conn)
+                if references:
                     print(
-                        "\nCannot delete airport - it is referenced in the following flights:"
+                        f"\nCannot delete airport - it is referenced in "
+                        f"{references.count} flights, including IDs:"
                     )
-                    for flight in flights:
-                        print(f"Flight {flight.flight_number} (ID: {flight.flight_id})")
+                    print(", ".join(map(str, references.flight_ids)))
                     print("\nPlease delete or update these flights first.")
                     return
 
@@ -1,10 +1,29 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from flight_manager.models.db import get_connection
-from flight_manager.models.flight import FlightStatus, Flight
+from flight_manager.models.flight import STATUS_TRANSITIONS, FlightStatus, Flight
 from flight_manager.models.pilot import Pilot
 from flight_manager.models.airports import Airport
+from flight_manager.models.roster import apply_roster, plan_roster
+from flight_manager.models.routes import RouteGraph
+from flight_manager.models.scheduling import ScheduleConflictError, find_conflicts
+from flight_manager.models.transitions import sweep
 from flight_manager.views.airport_menus import view_airports
 
+# The only columns view_flights prints.
+LISTING_COLUMNS = (
+    "flight_id",
+    "flight_number",
+    "origin_airport_code",
+    "destination_airport_code",
+    "scheduled_departure_time",
+    "status",
+    "company",
+    "pilot_first_name",
+    "pilot_last_name",
+)
+
+TIME_FILTERS = ("departure_after", "departure_before", "arrival_after", "arrival_before")
+
 
 def add_flight():
     with get_connection() as conn:
@@ -52,6 +71,17 @@ def assign_pilot_to_flight(flight: Flight):
             print(f"{i}. {pilot.first_name} {pilot.last_name} (ID: {pilot.pilot_id})")
         pilot_idx = int(input("Select pilot (number): ")) - 1
 
+        conflicts = find_conflicts(
+            conn,
+            pilots[pilot_idx].pilot_id,
+            flight.scheduled_departure_time,
+            flight.estimated_arrival_time,
+            flight.flight_id,
+        )
+        if conflicts:
+            print(f"Pilot not assigned: {ScheduleConflictError(conflicts)}")
+            return
+
         flight.pilot = pilots[pilot_idx]
         print(
             f"Pilot {pilots[pilot_idx].first_name} {pilots[pilot_idx].last_name} assigned to flight {flight.flight_number}"
@@ -64,6 +94,11 @@ def view_flights():
     print(
         "Available filters: flight_number, status, company, pilot_id, origin, destination"
     )
+    print(
+        "Time filters (YYYY-MM-DD HH:MM): departure_after, departure_before, "
+        "arrival_after, arrival_before"
+    )
+    print("Free text (flight, company, pilot or airport names): q")
     print("Example: status=boarding,company=Delta,origin=JFK")
     print("Leave empty to show all flights")
 
@@ -88,6 +123,15 @@ def view_flights():
         origin_code = filters.get("origin")
         destination_code = filters.get("destination")
 
+        window = {}
+        for key in TIME_FILTERS:
+            if key in filters:
+                try:
+                    window[key] = datetime.strptime(filters[key], "%Y-%m-%d %H:%M")
+                except ValueError:
+                    print(f"\nError: {key} must be formatted as YYYY-MM-DD HH:MM")
+                    return
+
         pilot = None
         if pilot_id:
             pilot = Pilot.get_by_id(conn, pilot_id)
@@ -109,7 +153,7 @@ def view_flights():
                 print(f"\nError: No airport found with code {destination_code}")
                 return
 
-        flights = Flight.get_all(
+        flights = Flight.iter_all(
             conn,
             flight_number=flight_number,
             status=status,
@@ -117,27 +161,31 @@ def view_flights():
             pilot=pilot,
             origin_airport=origin_airport,
             destination_airport=destination_airport,
+            q=filters.get("q"),
+            columns=LISTING_COLUMNS,
+            **window,
         )
 
         print(f"\nFlights ({'all' if not filters else 'filtered'}):")
-        if not flights:
-            print("No flights found matching the criteria")
-            return
-
+        found = False
         for flight in flights:
+            found = True
             pilot_name = (
-                f"{flight.pilot.first_name} {flight.pilot.last_name}"
-                if flight.pilot
+                f"{flight.pilot_first_name} {flight.pilot_last_name}"
+                if flight.pilot_first_name is not None
                 else "Unassigned"
             )
             print(
                 f"ID: {flight.flight_id} | {flight.flight_number} | "
-                f"{flight.origin_airport.code} → {flight.destination_airport.code} | "
+                f"{flight.origin_airport_code} → {flight.destination_airport_code} | "
                 f"Depart: {flight.scheduled_departure_time.strftime('%Y-%m-%d %H:%M')} | "
                 f"Pilot: {pilot_name} | Status: {flight.status.value} | "
                 f"Company: {flight.company}"
             )
 
+        if not found:
+            print("No flights found matching the criteria")
+
 
 def update_flight_number(flight: Flight):
     new_value = input(
@@ -210,14 +258,16 @@ def update_estimated_arrival(flight: Flight):
 
 
 def update_status(flight: Flight):
+    # Only the moves allowed from the saved status, which save() checks.
+    statuses = [flight.saved_status, *STATUS_TRANSITIONS[flight.saved_status]]
     print("\nAvailable statuses:")
-    for i, status in enumerate(FlightStatus, 1):
+    for i, status in enumerate(statuses, 1):
         print(f"{i}. {status.value}")
     status_choice = input(
         f"\nSelect new status (current: {flight.status.value}): "
     ).strip()
-    if status_choice.isdigit() and 1 <= int(status_choice) <= len(FlightStatus):
-        flight.status = list(FlightStatus)[int(status_choice) - 1]
+    if status_choice.isdigit() and 1 <= int(status_choice) <= len(statuses):
+        flight.status = statuses[int(status_choice) - 1]
     else:
         print("Invalid status selection")
 
@@ -391,9 +441,87 @@ def delete_flight():
             print("\nDeletion cancelled. No changes were made.")
 
 
+def auto_assign_pilots():
+    """Propose pilots for unassigned flights in a window and save on confirmation"""
+    try:
+        start = datetime.strptime(
+            input("Window start (YYYY-MM-DD HH:MM): "), "%Y-%m-%d %H:%M"
+        )
+        end = datetime.strptime(
+            input("Window end (YYYY-MM-DD HH:MM): "), "%Y-%m-%d %H:%M"
+        )
+    except ValueError:
+        print("Invalid datetime format. Please use YYYY-MM-DD HH:MM")
+        return
+
+    with get_connection() as conn:
+        plan = plan_roster(conn, start, end)
+        if not plan.assignments and not plan.unstaffed:
+            print("\nNo unassigned flights in that window")
+            return
+        if not plan.assignments:
+            print(f"\nNo pilots available for {len(plan.unstaffed)} unassigned flights")
+            return
+
+        print(f"\nProposed assignments ({len(plan.assignments)}):")
+        for flight_id, pilot_id in plan.assignments:
+            print(f"Flight ID: {flight_id} -> Pilot: {pilot_id}")
+        if plan.unstaffed:
+            print(f"{len(plan.unstaffed)} flights could not be staffed")
+
+        confirmation = input("\nSave these assignments? (y/n): ").strip().lower()
+        if confirmation == "y":
+            apply_roster(conn, plan)
+            print(f"\n{len(plan.assignments)} pilots assigned")
+        else:
+            print("\nNo changes were made.")
+
+
+def find_connection():
+    """Show the earliest-arriving connection between two airports"""
+    origin = input("Origin airport (3 letters): ").strip().upper()
+    destination = input("Destination airport (3 letters): ").strip().upper()
+    try:
+        after = datetime.strptime(
+            input("Depart after (YYYY-MM-DD HH:MM): "), "%Y-%m-%d %H:%M"
+        )
+    except ValueError:
+        print("Invalid datetime format. Please use YYYY-MM-DD HH:MM")
+        return
+
+    with get_connection() as conn:
+        graph = RouteGraph.load(conn, after, after + timedelta(days=1))
+    journey = graph.earliest_arrival(origin, destination, after)
+    if journey is None:
+        print(f"\nNo connection from {origin} to {destination} within 24 hours")
+        return
+
+    arrival = journey.arrival.strftime("%Y-%m-%d %H:%M")
+    print(f"\nArrive {arrival} ({journey.hops} flights):")
+    for leg in journey.legs:
+        print(
+            f"{leg.flight_number} | {leg.origin} → {leg.destination} | "
+            f"Depart: {leg.departure.strftime('%Y-%m-%d %H:%M')} | "
+            f"Arrive: {leg.arrival.strftime('%Y-%m-%d %H:%M')}"
+        )
+
+
+def sweep_statuses():
+    """Move flights along their statuses as the clock and recorded times say"""
+    with get_connection() as conn:
+        result = sweep(conn)
+    print(f"\nStatuses updated at {result.now.strftime('%Y-%m-%d %H:%M')} (UTC):")
+    for rule, count in result.counts.items():
+        print(f"{rule.replace('_', ' ').capitalize()}: {count}")
+    print(f"{result.total} flights changed status")
+
+
 menu_options = [
     ("View Flights", view_flights),
     ("Add Flight", add_flight),
     ("Edit Flights", update_flight),
     ("Delete Flight", delete_flight),
+    ("Auto-assign Pilots", auto_assign_pilots),
+    ("Find Connection", find_connection),
+    ("Update Statuses", sweep_statuses),
 ]
@@ -1,6 +1,5 @@
 from flight_manager.models.db import get_connection
 from flight_manager.models.pilot import Pilot
-from flight_manager.models.flight import Flight
 
 
 def add_pilot():
@@ -99,11 +98,13 @@ def delete_pilot():
         print("\nPilot to be deleted:")
         print(f"ID: {pilot.pilot_id} | Name: {pilot.first_name} {pilot.last_name}")
 
-        flights = Flight.get_all(conn, pilot=pilot)
-        if flights:
-            print("\nCannot delete pilot - assigned to the following flights:")
-            for flight in flights:
-                print(f"Flight {flight.flight_number} (ID: {flight.flight_id})")
+        references = pilot.references(conn)
+        if references:
+            print(
+                f"\nCannot delete pilot - assigned to {references.count} flights, "
+                "including IDs:"
+            )
+            print(", ".join(map(str, references.flight_ids)))
             print("\nPlease reassign or delete these flights first.")
             return
 
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from flight_manager.models.db import get_connection
+from flight_manager.models.flight import FlightStatus
+from flight_manager.models.stats import get_airport_stats, get_company_stats
+
+
+def _percent(rate):
+    return "n/a" if rate is None else f"{rate:.1%}"
+
+
+def view_company_stats():
+    company = input("Company (leave empty for all): ").strip() or None
+
+    with get_connection() as conn:
+        all_stats = get_company_stats(conn, company)
+
+    if not all_stats:
+        print("\nNo flights found")
+        return
+
+    print("\nCompany statistics:")
+    for stats in all_stats:
+        delay = stats.average_departure_delay
+        delay_text = "n/a" if delay is None else f"{delay.total_seconds() / 60:.1f} min"
+        print(
+            f"{stats.company} | Flights: {stats.flights} | "
+            f"On-time departures: {_percent(stats.on_time_departure_rate)} | "
+            f"Average departure delay: {delay_text} | "
+            f"On-time arrivals: {_percent(stats.on_time_arrival_rate)}"
+        )
+
+
+def view_airport_stats():
+    code = input("Airport code (3 letters): ").strip().upper()
+    try:
+        start = datetime.strptime(input("From date (YYYY-MM-DD): "), "%Y-%m-%d").date()
+        end = datetime.strptime(input("To date (YYYY-MM-DD): "), "%Y-%m-%d").date()
+    except ValueError:
+        print("Invalid date format. Please use YYYY-MM-DD")
+        return
+
+    with get_connection() as conn:
+        days = get_airport_stats(conn, code, start, end)
+
+    if not days:
+        print(f"\nNo flights at {code} between {start} and {end}")
+        return
+
+    print(f"\nDaily flights at {code}:")
+    for stats in days:
+        print(
+            f"{stats.day} | Departures: {sum(stats.departures.values())} | "
+            f"Arrivals: {sum(stats.arrivals.values())}"
+        )
+        for status in FlightStatus:
+            departures = stats.departures.get(status, 0)
+            arrivals = stats.arrivals.get(status, 0)
+            if departures or arrivals:
+                print(f"    {status.value}: {departures} out, {arrivals} in")
+
+
+menu_options = [
+    ("Company Statistics", view_company_stats),
+    ("Airport Daily Statistics", view_airport_stats),
+]
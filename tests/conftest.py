@@ -0,0 +1,48 @@
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Iterator, Tuple
+
+import pytest
+
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.flight import Flight, FlightStatus
+from flight_manager.models.migrations import migrate
+
+NOW = datetime(2025, 6, 10, 12, 0)
+
+
+@pytest.fixture
+def conn(tmp_path) -> Iterator[sqlite3.Connection]:
+    conn = sqlite3.connect(tmp_path / "airline.db")
+    conn.execute("PRAGMA foreign_keys = ON")
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def airports(conn: sqlite3.Connection) -> Tuple[Airport, Airport]:
+    clear = AirportStatus.ALL_CLEAR
+    return (
+        Airport.create(conn, "HKG", "Hong Kong", "Chek Lap Kok", clear),
+        Airport.create(conn, "LHR", "Heathrow", "London", clear),
+    )
+
+
+def make_flight(
+    conn: sqlite3.Connection,
+    airports: Tuple[Airport, Airport],
+    departs_in: timedelta,
+    status: FlightStatus = FlightStatus.PENDING,
+) -> Flight:
+    departure = NOW + departs_in
+    return Flight.create(
+        conn,
+        "CX251",
+        airports[0],
+        airports[1],
+        departure,
+        departure + timedelta(hours=12),
+        "Cathay",
+        status=status,
+    )
@@ -0,0 +1,78 @@
+import sqlite3
+from datetime import timedelta
+from typing import Dict, List
+
+from conftest import NOW, make_flight
+from flight_manager.models.bulk import import_flights, import_pilots
+from flight_manager.models.pilot import Pilot
+from flight_manager.models.scheduling import find_all_conflicts
+from flight_manager.models.timestamps import to_epoch
+
+
+def _flight(departs_in: timedelta, hours: int = 3) -> Dict[str, str]:
+    departure = NOW + departs_in
+    return {
+        "flight_number": "CX251",
+        "origin_airport_code": "HKG",
+        "destination_airport_code": "LHR",
+        "scheduled_departure_time": departure.isoformat(),
+        "estimated_arrival_time": (departure + timedelta(hours=hours)).isoformat(),
+        "pilot_id": "KL1WI",
+        "company": "Cathay",
+    }
+
+
+def _departures(conn: sqlite3.Connection) -> List[int]:
+    rows = conn.execute(
+        "SELECT scheduled_departure_time FROM flights ORDER BY flight_id"
+    )
+    return [row[0] for row in rows]
+
+
+def _import_pilot(conn: sqlite3.Connection) -> None:
+    import_pilots(conn, [{"pilot_id": "KL1WI", "first_name": "A", "last_name": "B"}])
+
+
+def test_overlapping_flights_in_one_chunk_are_rejected(conn, airports):
+    _import_pilot(conn)
+    records = [
+        _flight(timedelta(hours=0)),
+        _flight(timedelta(hours=2)),
+        _flight(timedelta(hours=4)),
+        _flight(timedelta(hours=1), hours=1),
+    ]
+
+    result = import_flights(conn, records)
+
+    # The second overlaps the first; the third only overlapped the second.
+    assert (result.inserted, result.rejected) == (2, 2)
+    assert [error.split(":")[0] for error in result.errors] == [
+        "record 2",
+        "record 4",
+    ]
+    assert "record 1" in result.errors[0]
+    assert _departures(conn) == [
+        to_epoch(NOW),
+        to_epoch(NOW + timedelta(hours=4)),
+    ]
+    assert list(find_all_conflicts(conn)) == []
+    # The rolled back rows left nothing in the change log or search index.
+    logged = conn.execute("SELECT COUNT(*) FROM flight_changes").fetchone()[0]
+    indexed = conn.execute("SELECT COUNT(*) FROM flights_search").fetchone()[0]
+    assert logged == indexed == 2
+
+
+def test_flight_overlapping_a_stored_flight_is_rejected(conn, airports):
+    _import_pilot(conn)
+    stored = make_flight(conn, airports, timedelta(hours=0))
+    stored.pilot = Pilot.get_by_id(conn, "KL1WI")
+    stored.save(conn)
+
+    result = import_flights(
+        conn, [_flight(timedelta(hours=13)), _flight(timedelta(hours=6))]
+    )
+
+    assert (result.inserted, result.rejected) == (1, 1)
+    assert result.errors[0].startswith(
+        f"record 2: pilot KL1WI is already flying flight {stored.flight_id}"
+    )
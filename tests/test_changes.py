@@ -0,0 +1,171 @@
+import asyncio
+import sqlite3
+from datetime import timedelta
+from itertools import islice
+from typing import List
+
+from conftest import NOW, make_flight
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.bulk import import_flights
+from flight_manager.models.changes import (
+    ChangeOperation,
+    FlightChange,
+    follow_changes,
+    latest_seq,
+    read_changes,
+    subscribe,
+)
+from flight_manager.models.db import ConnectionPool
+from flight_manager.models.flight import FlightStatus
+
+
+def _operations(changes: List[FlightChange]) -> List[ChangeOperation]:
+    return [change.operation for change in changes]
+
+
+def test_insert_update_and_delete_are_logged(conn, airports):
+    flight = make_flight(conn, airports, timedelta(hours=2))
+    flight.status = FlightStatus.BOARDING
+    flight.save(conn)
+    flight.delete(conn)
+
+    changes = read_changes(conn).changes
+
+    assert _operations(changes) == [
+        ChangeOperation.INSERT,
+        ChangeOperation.UPDATE,
+        ChangeOperation.DELETE,
+    ]
+    assert [change.seq for change in changes] == [1, 2, 3]
+    assert {change.flight_id for change in changes} == {flight.flight_id}
+    # A delete carries the row as it was.
+    assert changes[2].status is FlightStatus.BOARDING
+    assert changes[2].scheduled_departure_time == NOW + timedelta(hours=2)
+
+
+def test_update_that_changes_nothing_is_not_logged(conn, airports):
+    make_flight(conn, airports, timedelta(hours=2))
+    conn.execute("UPDATE flights SET status = status, company = company")
+
+    assert latest_seq(conn) == 1
+
+
+def test_read_changes_pages_through_the_log(conn, airports):
+    for hours in range(5):
+        make_flight(conn, airports, timedelta(hours=hours))
+
+    seqs = []
+    since = 0
+    while True:
+        page = read_changes(conn, since, limit=2)
+        seqs.append([change.seq for change in page.changes])
+        since = page.last_seq
+        if len(page.changes) < 2:
+            break
+
+    assert seqs == [[1, 2], [3, 4], [5]]
+    assert read_changes(conn, since).changes == []
+    assert read_changes(conn, since).last_seq == 5
+
+
+def test_airport_filter_skips_other_flights(conn, airports):
+    clear = AirportStatus.ALL_CLEAR
+    others = (
+        Airport.create(conn, "JFK", "John F. Kennedy", "New York", clear),
+        Airport.create(conn, "SIN", "Changi", "Singapore", clear),
+    )
+    make_flight(conn, others, timedelta(hours=1))
+    make_flight(conn, airports, timedelta(hours=2))
+    make_flight(conn, others, timedelta(hours=3))
+
+    page = read_changes(conn, airport_code="LHR")
+
+    assert [change.seq for change in page.changes] == [2]
+    # Read past the entries that did not match, so they are not read again.
+    assert page.last_seq == 3
+
+
+def test_bulk_import_logs_each_flight_in_order(conn, airports):
+    records = [
+        {
+            "flight_number": f"CX{number}",
+            "origin_airport_code": "HKG",
+            "destination_airport_code": "LHR",
+            "scheduled_departure_time": "2025-06-10T12:00:00",
+            "estimated_arrival_time": "2025-06-11T00:00:00",
+            "company": "Cathay",
+        }
+        for number in (251, 255, 257)
+    ]
+
+    result = import_flights(conn, records)
+
+    changes = read_changes(conn).changes
+    assert result.inserted == 3
+    assert _operations(changes) == [ChangeOperation.INSERT] * 3
+    assert [change.flight_number for change in changes] == ["CX251", "CX255", "CX257"]
+    assert [change.flight_id for change in changes] == sorted(
+        change.flight_id for change in changes
+    )
+    # The insert trigger is back once the import is done.
+    make_flight(conn, airports, timedelta(hours=2))
+    assert latest_seq(conn) == 4
+
+
+def test_follow_changes_resumes_after_since(conn, airports):
+    for hours in range(3):
+        make_flight(conn, airports, timedelta(hours=hours))
+    conn.commit()
+
+    changes = list(islice(follow_changes(conn, since=1, poll_interval=0), 2))
+
+    assert [change.seq for change in changes] == [2, 3]
+
+
+def test_subscribe_resumes_from_an_older_seq(tmp_path, conn, airports):
+    for hours in range(3):
+        make_flight(conn, airports, timedelta(hours=hours))
+    conn.commit()
+    pool = ConnectionPool(str(tmp_path / "airline.db"))
+
+    async def first(count: int, since: int) -> List[FlightChange]:
+        changes = []
+        async for change in subscribe(pool, since, poll_interval=0.01):
+            changes.append(change)
+            if len(changes) == count:
+                return changes
+        return changes
+
+    try:
+        changes = asyncio.run(asyncio.wait_for(first(3, since=0), timeout=5))
+    finally:
+        pool.close()
+
+    assert [change.seq for change in changes] == [1, 2, 3]
+
+
+def test_subscribe_without_since_waits_for_new_changes(tmp_path, conn, airports):
+    make_flight(conn, airports, timedelta(hours=1))
+    conn.commit()
+    pool = ConnectionPool(str(tmp_path / "airline.db"))
+
+    async def next_change() -> FlightChange:
+        changes = subscribe(pool, poll_interval=0.01)
+        # Start the subscription before the change, then make it on a thread.
+        waiting = asyncio.ensure_future(anext(changes))
+        await asyncio.sleep(0.2)
+
+        def add() -> None:
+            with pool.connection() as other:
+                make_flight(other, airports, timedelta(hours=2))
+                other.commit()
+
+        await asyncio.to_thread(add)
+        return await asyncio.wait_for(waiting, timeout=5)
+
+    try:
+        change = asyncio.run(next_change())
+    finally:
+        pool.close()
+
+    assert (change.seq, change.operation) == (2, ChangeOperation.INSERT)
@@ -0,0 +1,91 @@
+import sqlite3
+import threading
+
+import pytest
+
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.db import ConnectionPool, get_connection, transaction
+from flight_manager.models.migrations import migrate
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    path = str(tmp_path / "airline.db")
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _codes(path: str) -> list:
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT code FROM airports")]
+    finally:
+        conn.close()
+
+
+def _add(conn: sqlite3.Connection, code: str) -> None:
+    Airport.create(conn, code, code, "Somewhere", AirportStatus.ALL_CLEAR)
+
+
+def test_nested_connection_is_shared_and_reused(db_path):
+    pool = ConnectionPool(db_path)
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+    with pool.connection() as again:
+        assert again is outer
+    pool.close()
+
+    assert (pool.stats.opened, pool.stats.nested, pool.stats.reused) == (1, 1, 1)
+
+
+def test_threads_get_their_own_connections(db_path):
+    pool = ConnectionPool(db_path, max_size=2)
+    seen = []
+    ready = threading.Barrier(2)
+
+    def work() -> None:
+        with pool.connection() as conn:
+            seen.append(conn)
+            ready.wait(timeout=5)
+
+    threads = [threading.Thread(target=work) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.close()
+
+    assert seen[0] is not seen[1]
+
+
+def test_inner_transaction_rolls_back_alone(db_path):
+    pool = ConnectionPool(db_path)
+    with pool.connection() as conn:
+        with transaction(conn):
+            _add(conn, "HKG")
+            with pytest.raises(ValueError):
+                with transaction(conn):
+                    _add(conn, "LHR")
+                    raise ValueError("inner failure")
+            _add(conn, "JFK")
+        conn.commit()
+    pool.close()
+
+    assert sorted(_codes(db_path)) == ["HKG", "JFK"]
+
+
+def test_nested_get_connection_keeps_the_outer_work(db_path, capsys):
+    with get_connection(db_path) as conn:
+        _add(conn, "HKG")
+        with get_connection(db_path) as inner:
+            assert inner is conn
+            _add(inner, "LHR")
+            # Reported and rolled back to the nested block's savepoint.
+            raise ValueError("bad input")
+
+    assert _codes(db_path) == ["HKG"]
+    assert "bad input" in capsys.readouterr().out
@@ -0,0 +1,71 @@
+import sqlite3
+from datetime import timedelta
+from typing import Iterator, List
+
+import pytest
+
+from conftest import make_flight
+from flight_manager.models.flight import Flight, FlightStatus
+
+
+@pytest.fixture
+def updates(conn: sqlite3.Connection) -> Iterator[List[str]]:
+    """The UPDATE statements run on flights, with their values expanded.
+
+    The trace repeats a statement for each trigger it fires, so only the
+    set of statements is meaningful.
+    """
+    statements: List[str] = []
+
+    def trace(sql: str) -> None:
+        if sql.lstrip().startswith("UPDATE flights SET"):
+            statements.append(sql.split(" WHERE")[0].strip())
+
+    conn.set_trace_callback(trace)
+    yield statements
+    conn.set_trace_callback(None)
+
+
+def test_save_writes_only_changed_columns(conn, airports, updates):
+    flight = make_flight(conn, airports, timedelta(hours=2))
+    flight.status = FlightStatus.BOARDING
+    flight.company = "Cathay"  # unchanged value
+
+    flight.save(conn)
+
+    assert set(updates) == {"UPDATE flights SET status = 'boarding'"}
+
+
+def test_save_without_changes_writes_nothing(conn, airports, updates):
+    flight = make_flight(conn, airports, timedelta(hours=2))
+    loaded = Flight.get_by_id(conn, flight.flight_id)
+
+    loaded.save(conn)
+    flight.save(conn)
+
+    assert updates == []
+
+
+def test_save_many_batches_by_changed_columns(conn, airports, updates):
+    flights = [make_flight(conn, airports, timedelta(hours=h)) for h in range(4)]
+    flights[0].company = "Dragonair"
+    flights[1].company = "Cathay Cargo"
+    flights[2].flight_number = "CX999"
+
+    written = Flight.save_many(conn, flights)
+
+    assert written == 3
+    assert sorted(set(updates)) == [
+        "UPDATE flights SET company = 'Cathay Cargo'",
+        "UPDATE flights SET company = 'Dragonair'",
+        "UPDATE flights SET flight_number = 'CX999'",
+    ]
+    assert all(not flight.changed_columns() for flight in flights)
+    stored = [Flight.get_by_id(conn, flight.flight_id) for flight in flights]
+    assert [flight.company for flight in stored] == [
+        "Dragonair",
+        "Cathay Cargo",
+        "Cathay",
+        "Cathay",
+    ]
+    assert stored[2].flight_number == "CX999"
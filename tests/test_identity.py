@@ -0,0 +1,117 @@
+import sqlite3
+from datetime import timedelta
+
+import pytest
+
+from conftest import NOW
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.db import ConnectionPool, transaction
+from flight_manager.models.flight import Flight
+from flight_manager.models.migrations import migrate
+from flight_manager.models.pilot import Pilot
+
+
+def _pool(tmp_path) -> ConnectionPool:
+    pool = ConnectionPool(str(tmp_path / "airline.db"))
+    with pool.connection() as conn:
+        migrate(conn)
+        conn.commit()
+    return pool
+
+
+def test_requery_sees_another_connections_write(tmp_path):
+    pool = _pool(tmp_path)
+    with pool.connection() as conn:
+        clear = AirportStatus.ALL_CLEAR
+        Airport.create(conn, "HKG", "Hong Kong", "Chek Lap Kok", clear)
+        conn.commit()
+        airport = Airport.get_by_code(conn, "HKG")
+
+        other = sqlite3.connect(str(tmp_path / "airline.db"))
+        other.execute("UPDATE airports SET status = 'closed' WHERE code = 'HKG'")
+        other.commit()
+        other.close()
+
+        again = Airport.get_by_code(conn, "HKG")
+
+    pool.close()
+    assert again is airport
+    assert airport.status is AirportStatus.CLOSED
+    assert airport.changed_columns() == {}
+
+
+def test_requery_keeps_unsaved_changes(tmp_path):
+    pool = _pool(tmp_path)
+    with pool.connection() as conn:
+        pilot = Pilot.create(conn, "Alex", "Leung")
+        pilot.last_name = "Leung-Smith"
+
+        again = Pilot.get_by_id(conn, pilot.pilot_id)
+
+    pool.close()
+    assert again is pilot
+    assert pilot.changed_columns() == {"last_name": "Leung-Smith"}
+
+
+def _flights(conn: sqlite3.Connection, pilot: Pilot) -> None:
+    clear = AirportStatus.ALL_CLEAR
+    hkg = Airport.create(conn, "HKG", "Hong Kong", "Chek Lap Kok", clear)
+    lhr = Airport.create(conn, "LHR", "Heathrow", "London", clear)
+    for day in range(3):
+        departure = NOW + timedelta(days=day)
+        Flight.create(
+            conn,
+            f"CX25{day}",
+            hkg,
+            lhr,
+            departure,
+            departure + timedelta(hours=12),
+            "Cathay",
+            pilot,
+        )
+
+
+def test_flights_share_airport_and_pilot_instances(tmp_path):
+    pool = _pool(tmp_path)
+    with pool.connection() as conn:
+        pilot = Pilot.create(conn, "Alex", "Leung")
+        _flights(conn, pilot)
+
+        flights = Flight.get_all(conn)
+        origin = Airport.get_by_code(conn, "HKG")
+
+    pool.close()
+    assert len(flights) == 3
+    assert all(flight.origin_airport is origin for flight in flights)
+    assert all(flight.pilot is pilot for flight in flights)
+
+
+def test_deleted_and_released_instances_leave_the_map(tmp_path):
+    pool = _pool(tmp_path)
+    with pool.connection() as conn:
+        pilot = Pilot.create(conn, "Alex", "Leung")
+        pilot_id = pilot.pilot_id
+        Pilot.delete_by_id(conn, pilot_id)
+        assert conn.identity_map.get(Pilot, pilot_id) is None
+
+        kept = Pilot.create(conn, "Sam", "Kim")
+        conn.commit()
+        assert conn.identity_map.get(Pilot, kept.pilot_id) is kept
+    # Going back to the pool ends the session.
+    with pool.connection() as conn:
+        assert len(conn.identity_map) == 0
+        assert Pilot.get_by_id(conn, kept.pilot_id) is not kept
+
+    pool.close()
+
+
+def test_rollback_clears_the_map(tmp_path):
+    pool = _pool(tmp_path)
+    with pool.connection() as conn:
+        with pytest.raises(ValueError):
+            with transaction(conn):
+                Pilot.create(conn, "Alex", "Leung")
+                raise ValueError("abandon")
+
+        assert len(conn.identity_map) == 0
+    pool.close()
@@ -0,0 +1,164 @@
+import re
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from flight_manager.models.migrations import SCHEMA_VERSION, get_schema_version, migrate
+from flight_manager.models.timestamps import to_epoch
+
+# The schema before the first migration, with ISO text timestamps.
+BASELINE = (
+    """
+    CREATE TABLE airports (
+        code TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        address TEXT NOT NULL,
+        status TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE pilots (
+        pilot_id TEXT PRIMARY KEY,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE flights (
+        flight_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        flight_number TEXT NOT NULL,
+        origin_airport_code TEXT NOT NULL,
+        destination_airport_code TEXT NOT NULL,
+        scheduled_departure_time TEXT NOT NULL,
+        estimated_arrival_time TEXT NOT NULL,
+        departure_time TEXT,
+        arrival_time TEXT,
+        status TEXT NOT NULL,
+        pilot_id TEXT,
+        company TEXT NOT NULL,
+        FOREIGN KEY(origin_airport_code) REFERENCES airports(code),
+        FOREIGN KEY(destination_airport_code) REFERENCES airports(code),
+        FOREIGN KEY(pilot_id) REFERENCES pilots(pilot_id)
+    )
+    """,
+)
+
+# Both text forms the baseline wrote: str(datetime) and isoformat().
+FLIGHTS = [
+    ("CX251", "HKG", "LHR", "2025-06-10 12:00:00", "2025-06-11 00:00:00", None,
+     None, "pending", "KL1WI"),
+    ("BA32", "LHR", "HKG", "2025-06-09T08:30:00", "2025-06-09T20:15:00",
+     "2025-06-09T08:50:00", "2025-06-09T20:30:00", "arrived", None),
+    ("CX255", "HKG", "LHR", "2025-06-11 23:45:00", "2025-06-12 11:45:00", None,
+     None, "delayed", "KL1WI"),
+]
+
+
+def _baseline(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    for statement in BASELINE:
+        conn.execute(statement)
+    conn.executemany(
+        "INSERT INTO airports VALUES (?, ?, ?, 'all_clear')",
+        [("HKG", "Hong Kong", "Chek Lap Kok"), ("LHR", "Heathrow", "London")],
+    )
+    conn.execute("INSERT INTO pilots VALUES ('KL1WI', 'Alex', 'Leung')")
+    conn.executemany(
+        """
+        INSERT INTO flights (flight_number, origin_airport_code,
+            destination_airport_code, scheduled_departure_time,
+            estimated_arrival_time, departure_time, arrival_time, status, pilot_id,
+            company)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'Cathay')
+        """,
+        FLIGHTS + [FLIGHTS[0]],
+    )
+    # The newest flight is gone, so its id must not be handed out again.
+    conn.execute("DELETE FROM flights WHERE flight_id = 4")
+    conn.commit()
+    return conn
+
+
+def _schema(conn: sqlite3.Connection) -> Dict[Tuple[str, str], str]:
+    """sqlite_master without the whitespace differences between DDL layouts"""
+    rows = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL"
+    )
+    schema = {}
+    for type_, name, sql in rows:
+        sql = re.sub(r"\s+", " ", sql).replace('"', "")
+        schema[type_, name] = re.sub(r" ?([(),;]) ?", r"\1", sql).strip()
+    return schema
+
+
+def _column(conn: sqlite3.Connection, column: str) -> List[int]:
+    rows = conn.execute(f"SELECT {column} FROM flights ORDER BY flight_id")
+    return [row[0] for row in rows]
+
+
+def _epoch(text: str) -> int:
+    return to_epoch(datetime.fromisoformat(text))
+
+
+def test_baseline_upgrades_to_current_schema(tmp_path):
+    conn = _baseline(str(tmp_path / "old.db"))
+
+    assert migrate(conn) == SCHEMA_VERSION
+    conn.commit()
+
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    counts = [
+        conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("airports", "pilots", "flights")
+    ]
+    assert counts == [2, 1, 3]
+    assert _column(conn, "flight_id") == [1, 2, 3]
+    assert _column(conn, "scheduled_departure_time") == [
+        _epoch(flight[3]) for flight in FLIGHTS
+    ]
+    assert _column(conn, "estimated_arrival_time") == [
+        _epoch(flight[4]) for flight in FLIGHTS
+    ]
+    assert _column(conn, "departure_time") == [
+        None,
+        _epoch("2025-06-09T08:50:00"),
+        None,
+    ]
+    sequence = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'flights'"
+    ).fetchone()
+    assert sequence == (4,)
+
+    # The summary tables and the search index were filled from the flights.
+    assert conn.execute("SELECT SUM(flights) FROM company_stats").fetchone() == (3,)
+    matches = conn.execute(
+        "SELECT rowid FROM flights_search WHERE flights_search MATCH 'Leung'"
+    )
+    assert sorted(row[0] for row in matches) == [1, 3]
+
+    fresh = sqlite3.connect(str(tmp_path / "new.db"))
+    migrate(fresh)
+    assert _schema(conn) == _schema(fresh)
+
+
+def test_upgrade_reports_overlapping_pilot_assignments(tmp_path, caplog):
+    conn = _baseline(str(tmp_path / "old.db"))
+    # Overlaps CX251, which the same pilot flies from 12:00 to midnight.
+    conn.execute(
+        """
+        INSERT INTO flights (flight_number, origin_airport_code,
+            destination_airport_code, scheduled_departure_time,
+            estimated_arrival_time, status, pilot_id, company)
+        VALUES ('CX261', 'HKG', 'LHR', '2025-06-10 18:00:00',
+            '2025-06-11 02:00:00', 'pending', 'KL1WI', 'Cathay')
+        """
+    )
+    conn.commit()
+
+    with caplog.at_level("WARNING", logger="flight_manager.migrations"):
+        migrate(conn)
+
+    [record] = caplog.records
+    message = record.getMessage()
+    assert message.startswith("pilots are booked on overlapping flights (1 pairs)")
+    assert "KL1WI on 1 and 5" in message
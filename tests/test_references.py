@@ -0,0 +1,138 @@
+import sqlite3
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+import pytest
+
+from conftest import NOW
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.flight import Flight
+from flight_manager.models.pilot import Pilot
+from flight_manager.models.references import (
+    DeleteMode,
+    ReferencedError,
+    find_references,
+)
+from flight_manager.models.scheduling import ScheduleConflictError
+
+
+def _flights(
+    conn: sqlite3.Connection,
+    airports: Tuple[Airport, Airport],
+    pilot: Optional[Pilot],
+    count: int,
+    reverse: bool = False,
+) -> List[Flight]:
+    origin, destination = reversed(airports) if reverse else airports
+    return [
+        Flight.create(
+            conn,
+            f"CX{i}",
+            origin,
+            destination,
+            NOW + timedelta(days=i),
+            NOW + timedelta(days=i, hours=12),
+            "Cathay",
+            pilot,
+        )
+        for i in range(count)
+    ]
+
+
+def _plan(conn: sqlite3.Connection, query: str, key: str) -> str:
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", {"key": key})
+    return "\n".join(row[3] for row in rows)
+
+
+def test_airport_references_count_both_ends(conn, airports):
+    pilot = Pilot.create(conn, "Alex", "Leung")
+    outbound = _flights(conn, airports, pilot, 3)
+    inbound = _flights(conn, airports, None, 2, reverse=True)
+    sin = Airport.create(conn, "SIN", "Changi", "Singapore", AirportStatus.ALL_CLEAR)
+
+    references = airports[0].references(conn, sample_size=4)
+
+    assert references.count == 5
+    assert len(references.flight_ids) == 4
+    assert set(references.flight_ids) <= {f.flight_id for f in outbound + inbound}
+    assert references.flight_ids == sorted(references.flight_ids)
+    assert airports[0].is_referenced(conn) and pilot.is_referenced(conn)
+    assert not sin.is_referenced(conn)
+    assert not sin.references(conn)
+
+
+def test_reference_checks_use_the_indexes(conn, airports):
+    columns = ["origin_airport_code", "destination_airport_code"]
+    where = " OR ".join(f"{column} = :key" for column in columns)
+
+    airport = _plan(conn, f"SELECT COUNT(*) FROM flights WHERE {where}", "HKG")
+    pilot = _plan(conn, "SELECT COUNT(*) FROM flights WHERE pilot_id = :key", "1")
+
+    assert "MULTI-INDEX OR" in airport
+    assert "idx_flights_origin" in airport and "idx_flights_destination" in airport
+    assert "COVERING INDEX idx_flights_pilot" in pilot
+    assert "SCAN flights" not in airport + pilot
+    assert find_references(conn, columns, "HKG").count == 0
+
+
+def test_restrict_refuses_while_flights_refer(conn, airports):
+    pilot = Pilot.create(conn, "Alex", "Leung")
+    flights = _flights(conn, airports, pilot, 12)
+
+    with pytest.raises(ReferencedError) as error:
+        airports[1].delete(conn)
+    with pytest.raises(ReferencedError):
+        pilot.delete(conn)
+
+    assert error.value.references.count == 12
+    assert str(error.value).endswith(", ...)")
+    assert Airport.get_by_code(conn, "LHR") is not None
+    assert len(Flight.get_all(conn)) == len(flights)
+
+
+def test_cascade_deletes_the_flights(conn, airports):
+    pilot = Pilot.create(conn, "Alex", "Leung")
+    _flights(conn, airports, pilot, 3)
+
+    assert airports[0].delete(conn, DeleteMode.CASCADE) == 3
+
+    assert Airport.get_by_code(conn, "HKG") is None
+    assert Flight.get_all(conn) == []
+    assert not pilot.is_referenced(conn)
+
+
+def test_reassign_moves_the_flights_to_another_airport(conn, airports):
+    sin = Airport.create(conn, "SIN", "Changi", "Singapore", AirportStatus.ALL_CLEAR)
+    _flights(conn, airports, None, 2)
+    _flights(conn, airports, None, 1, reverse=True)
+
+    assert airports[0].delete(conn, DeleteMode.REASSIGN, "SIN") == 3
+
+    assert sin.references(conn).count == 3
+    with pytest.raises(KeyError):
+        airports[1].delete(conn, DeleteMode.REASSIGN, "XXX")
+
+
+def test_pilot_flights_can_be_unassigned_or_reassigned(conn, airports):
+    alex = Pilot.create(conn, "Alex", "Leung")
+    sam = Pilot.create(conn, "Sam", "Chan")
+    flights = _flights(conn, airports, alex, 2)
+
+    assert alex.delete(conn, DeleteMode.REASSIGN, sam.pilot_id) == 2
+    assert sam.references(conn).flight_ids == [f.flight_id for f in flights]
+
+    assert sam.delete(conn, DeleteMode.REASSIGN) == 2
+    assert all(flight.pilot is None for flight in Flight.get_all(conn))
+
+
+def test_reassign_refuses_to_double_book_a_pilot(conn, airports):
+    alex = Pilot.create(conn, "Alex", "Leung")
+    sam = Pilot.create(conn, "Sam", "Chan")
+    _flights(conn, airports, alex, 1)
+    _flights(conn, airports, sam, 1, reverse=True)
+
+    with pytest.raises(ScheduleConflictError):
+        alex.delete(conn, DeleteMode.REASSIGN, sam.pilot_id)
+
+    assert Pilot.get_by_id(conn, alex.pilot_id) is not None
+    assert alex.references(conn).count == 1
@@ -0,0 +1,105 @@
+import random
+import sqlite3
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+import pytest
+
+from conftest import NOW
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.flight import Flight
+from flight_manager.models.pilot import Pilot
+from flight_manager.models.roster import DEFAULT_MIN_REST, apply_roster, plan_roster
+from flight_manager.models.scheduling import find_all_conflicts
+
+CODES = ["HKG", "LHR", "SIN"]
+
+
+def _network(conn: sqlite3.Connection, seed: int) -> Dict[str, Airport]:
+    rng = random.Random(seed)
+    airports = {
+        code: Airport.create(conn, code, code, "Somewhere", AirportStatus.ALL_CLEAR)
+        for code in CODES
+    }
+    pilots = [Pilot.create(conn, "Pilot", str(i)) for i in range(4)]
+    for i in range(40):
+        origin, destination = rng.sample(CODES, 2)
+        departure = NOW + timedelta(minutes=rng.randrange(3 * 24 * 60))
+        Flight.create(
+            conn,
+            f"CX{i}",
+            airports[origin],
+            airports[destination],
+            departure,
+            departure + timedelta(minutes=rng.randint(60, 8 * 60)),
+            "Cathay",
+        )
+    # One pilot already has a flight in the middle of the window.
+    departure = NOW + timedelta(days=1)
+    Flight.create(
+        conn,
+        "CX999",
+        airports["HKG"],
+        airports["LHR"],
+        departure,
+        departure + timedelta(hours=3),
+        "Cathay",
+        pilots[0],
+    )
+    return airports
+
+
+def _schedules(conn: sqlite3.Connection) -> Dict[str, List[Tuple[int, int, str, str]]]:
+    schedules: Dict[str, List[Tuple[int, int, str, str]]] = {}
+    for pilot_id, departure, arrival, origin, destination in conn.execute(
+        """
+        SELECT pilot_id, scheduled_departure_time, estimated_arrival_time,
+            origin_airport_code, destination_airport_code
+        FROM flights WHERE pilot_id IS NOT NULL
+        ORDER BY pilot_id, scheduled_departure_time
+    """
+    ):
+        schedules.setdefault(pilot_id, []).append(
+            (departure, arrival, origin, destination)
+        )
+    return schedules
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_applied_roster_never_double_books_a_pilot(conn, seed):
+    _network(conn, seed)
+
+    plan = plan_roster(conn, NOW, NOW + timedelta(days=4))
+    applied = apply_roster(conn, plan)
+
+    assert applied == len(plan.assignments) > 0
+    assert list(find_all_conflicts(conn)) == []
+    rest = DEFAULT_MIN_REST // timedelta(seconds=1)
+    for schedule in _schedules(conn).values():
+        for before, after in zip(schedule, schedule[1:]):
+            assert before[1] + rest <= after[0]
+            assert before[3] == after[2]
+
+
+def test_overlapping_flights_need_two_pilots(conn):
+    clear = AirportStatus.ALL_CLEAR
+    hkg = Airport.create(conn, "HKG", "Hong Kong", "Chek Lap Kok", clear)
+    lhr = Airport.create(conn, "LHR", "Heathrow", "London", clear)
+    Pilot.create(conn, "Alex", "Leung")
+    flights = [
+        Flight.create(
+            conn,
+            f"CX{i}",
+            hkg,
+            lhr,
+            NOW + timedelta(hours=i),
+            NOW + timedelta(hours=i + 12),
+            "Cathay",
+        )
+        for i in range(2)
+    ]
+
+    plan = plan_roster(conn, NOW, NOW + timedelta(days=1))
+
+    assert [flight_id for flight_id, _ in plan.assignments] == [flights[0].flight_id]
+    assert plan.unstaffed == [flights[1].flight_id]
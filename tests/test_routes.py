@@ -0,0 +1,158 @@
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from conftest import NOW
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.flight import Flight
+from flight_manager.models.routes import RouteGraph
+
+DAY = NOW.replace(hour=0)
+
+
+def _airports(conn: sqlite3.Connection, *codes: str) -> Dict[str, Airport]:
+    return {
+        code: Airport.create(conn, code, code, "Somewhere", AirportStatus.ALL_CLEAR)
+        for code in codes
+    }
+
+
+def _flight(
+    conn: sqlite3.Connection,
+    airports: Dict[str, Airport],
+    origin: str,
+    destination: str,
+    departure: datetime,
+    arrival: datetime,
+) -> Flight:
+    return Flight.create(
+        conn,
+        f"{origin}{destination}",
+        airports[origin],
+        airports[destination],
+        departure,
+        arrival,
+        "Cathay",
+    )
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    return DAY + timedelta(hours=hour, minutes=minute)
+
+
+@pytest.fixture
+def network(conn: sqlite3.Connection) -> Dict[str, Flight]:
+    airports = _airports(conn, "HKG", "LHR", "SIN", "DXB")
+    return {
+        "direct": _flight(conn, airports, "HKG", "LHR", _at(10), _at(23)),
+        "to_sin": _flight(conn, airports, "HKG", "SIN", _at(8), _at(12)),
+        "sin_lhr": _flight(conn, airports, "SIN", "LHR", _at(13), _at(20)),
+        # Only 30 minutes to change planes in Dubai.
+        "to_dxb": _flight(conn, airports, "HKG", "DXB", _at(7), _at(9)),
+        "dxb_lhr": _flight(conn, airports, "DXB", "LHR", _at(9, 30), _at(18)),
+    }
+
+
+def _legs(journey) -> List[int]:
+    return [leg.flight_id for leg in journey.legs]
+
+
+def test_earliest_arrival_takes_the_connection(conn, network):
+    graph = RouteGraph.load(conn, DAY, DAY + timedelta(days=1))
+
+    journey = graph.earliest_arrival("HKG", "LHR", DAY)
+
+    assert _legs(journey) == [network["to_sin"].flight_id, network["sin_lhr"].flight_id]
+    assert journey.arrival == _at(20)
+
+
+def test_short_connection_is_allowed_with_a_shorter_minimum(conn, network):
+    graph = RouteGraph.load(
+        conn, DAY, DAY + timedelta(days=1), min_connection=timedelta(minutes=20)
+    )
+
+    journey = graph.earliest_arrival("HKG", "LHR", DAY)
+
+    assert _legs(journey) == [network["to_dxb"].flight_id, network["dxb_lhr"].flight_id]
+
+
+def test_fewest_hops_prefers_the_direct_flight(conn, network):
+    graph = RouteGraph.load(conn, DAY, DAY + timedelta(days=1))
+
+    journey = graph.fewest_hops("HKG", "LHR", DAY)
+
+    assert _legs(journey) == [network["direct"].flight_id]
+    assert graph.fewest_hops("HKG", "LHR", _at(11)) is None
+    assert graph.earliest_arrival("HKG", "LHR", DAY, depart_before=_at(8)) is None
+
+
+def test_refresh_applies_the_change_log(conn, network):
+    graph = RouteGraph.load(conn, DAY, DAY + timedelta(days=1))
+    airports = {code: Airport.get_by_code(conn, code) for code in ("HKG", "LHR")}
+    faster = _flight(conn, airports, "HKG", "LHR", _at(9), _at(19))
+    Flight.delete_by_id(conn, network["direct"].flight_id)
+
+    assert graph.refresh(conn) == 2
+
+    assert _legs(graph.earliest_arrival("HKG", "LHR", DAY)) == [faster.flight_id]
+    assert len(graph) == 5
+
+
+Hop = Tuple[str, str, int, int]
+
+
+def _brute_force(
+    flights: List[Hop], origin: str, destination: str, start: int, transfer: int
+) -> Optional[int]:
+    """Earliest arrival over every journey of up to four flights, which is
+    enough for five airports as going back to one never arrives sooner"""
+    best = None
+
+    def extend(at: str, ready: int, hops: int) -> None:
+        nonlocal best
+        for source, target, departure, arrival in flights:
+            if source != at or departure < ready:
+                continue
+            if target == destination and (best is None or arrival < best):
+                best = arrival
+            if hops < 4:
+                extend(target, arrival + transfer, hops + 1)
+
+    extend(origin, start, 1)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_earliest_arrival_matches_brute_force(conn, seed):
+    rng = random.Random(seed)
+    codes = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+    airports = _airports(conn, *codes)
+    hops: List[Hop] = []
+    for _ in range(30):
+        origin, destination = rng.sample(codes, 2)
+        departure = rng.randrange(24 * 60)
+        arrival = departure + rng.randint(30, 6 * 60)
+        _flight(
+            conn,
+            airports,
+            origin,
+            destination,
+            DAY + timedelta(minutes=departure),
+            DAY + timedelta(minutes=arrival),
+        )
+        hops.append((origin, destination, departure, arrival))
+    graph = RouteGraph.load(conn, DAY, DAY + timedelta(days=1))
+
+    for origin in codes:
+        for destination in codes:
+            if origin == destination:
+                continue
+            expected = _brute_force(hops, origin, destination, 0, 45)
+            journey = graph.earliest_arrival(origin, destination, DAY)
+            arrival = None if journey is None else journey.arrival
+            assert arrival == (
+                None if expected is None else DAY + timedelta(minutes=expected)
+            )
@@ -0,0 +1,101 @@
+import sqlite3
+from datetime import timedelta
+from typing import List, Set
+
+import pytest
+
+from conftest import NOW
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.flight import Flight
+from flight_manager.models.pilot import Pilot
+
+NEEDLES = ["X", "cx", "CX25", "251", "pacific", "Air", 'O"B', "Lon", "ong K", "zzz"]
+
+# What q matched before the index: a substring of any of these, any case.
+_SUBSTRING = """
+    SELECT f.flight_id FROM flights f
+    JOIN airports a1 ON f.origin_airport_code = a1.code
+    JOIN airports a2 ON f.destination_airport_code = a2.code
+    LEFT JOIN pilots p ON f.pilot_id = p.pilot_id
+    WHERE f.flight_number LIKE :like OR f.company LIKE :like
+        OR p.first_name || ' ' || p.last_name LIKE :like
+        OR a1.name LIKE :like OR a2.name LIKE :like
+"""
+
+
+@pytest.fixture
+def flights(conn: sqlite3.Connection) -> List[Flight]:
+    clear = AirportStatus.ALL_CLEAR
+    hkg = Airport.create(conn, "HKG", "Hong Kong", "Chek Lap Kok", clear)
+    lhr = Airport.create(conn, "LHR", "London Heathrow", "London", clear)
+    sin = Airport.create(conn, "SIN", "Changi", "Singapore", clear)
+    pilots = [
+        Pilot.create(conn, "Alex", "Leung"),
+        Pilot.create(conn, "Sam", 'O"Brien'),
+    ]
+    created = []
+    for i, (number, company, route, pilot) in enumerate(
+        [
+            ("CX251", "Cathay Pacific", (hkg, lhr), pilots[0]),
+            ("CX255", "Cathay Pacific", (lhr, hkg), None),
+            ("BA32", "British Airways", (lhr, hkg), pilots[1]),
+            ("SQ1", "Singapore Airlines", (sin, hkg), None),
+            ("sq251", "Air Asia", (hkg, sin), pilots[0]),
+        ]
+    ):
+        departure = NOW + timedelta(days=i)
+        created.append(
+            Flight.create(
+                conn,
+                number,
+                *route,
+                departure,
+                departure + timedelta(hours=2),
+                company,
+                pilot,
+            )
+        )
+    return created
+
+
+def _ids(flights: List[Flight]) -> Set[int]:
+    return {flight.flight_id for flight in flights}
+
+
+def _like(conn: sqlite3.Connection, column: str, needle: str) -> Set[int]:
+    rows = conn.execute(
+        f"SELECT flight_id FROM flights WHERE {column} LIKE ?", (f"%{needle}%",)
+    )
+    return {row[0] for row in rows}
+
+
+@pytest.mark.parametrize("needle", NEEDLES)
+def test_column_filters_match_like(conn, flights, needle):
+    assert _ids(Flight.get_all(conn, flight_number=needle)) == _like(
+        conn, "flight_number", needle
+    )
+    assert _ids(Flight.get_all(conn, company=needle)) == _like(
+        conn, "company", needle
+    )
+
+
+@pytest.mark.parametrize("needle", NEEDLES)
+def test_q_matches_a_substring_of_any_search_column(conn, flights, needle):
+    expected = {row[0] for row in conn.execute(_SUBSTRING, {"like": f"%{needle}%"})}
+
+    assert _ids(Flight.get_all(conn, q=needle)) == expected
+
+
+def test_q_follows_renamed_pilots_and_airports(conn, flights):
+    pilot = flights[0].pilot
+    pilot.last_name = "Wong"
+    pilot.save(conn)
+    airport = Airport.get_by_code(conn, "SIN")
+    airport.name = "Jewel Changi"
+    airport.update(conn)
+
+    assert _ids(Flight.get_all(conn, q="Leung")) == set()
+    assert _ids(Flight.get_all(conn, q="Alex Wong")) == _ids(
+        [flights[0], flights[4]]
+    )
+    assert _ids(Flight.get_all(conn, q="Jewel")) == _ids([flights[3], flights[4]])
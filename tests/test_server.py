@@ -0,0 +1,107 @@
+import asyncio
+import json
+from typing import Any, List, Tuple
+
+from flight_manager.models.migrations import migrate
+from flight_manager.server import MAX_BODY_BYTES, FlightAPI
+
+Response = Tuple[int, Any]
+
+
+def _request(method: str, path: str, body: Any = None, close: bool = False) -> bytes:
+    payload = b"" if body is None else json.dumps(body).encode()
+    lines = [f"{method} {path} HTTP/1.1", "Host: test"]
+    if payload:
+        lines.append(f"Content-Length: {len(payload)}")
+    if close:
+        lines.append("Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+
+def _parse(data: bytes) -> List[Response]:
+    responses = []
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        headers = dict(line.lower().split(": ", 1) for line in header_lines)
+        length = int(headers.get("content-length", 0))
+        payload, data = data[:length], data[length:]
+        responses.append(
+            (int(status_line.split(" ")[1]), json.loads(payload) if payload else None)
+        )
+    return responses
+
+
+def _exchange(db_path: str, data: bytes) -> List[Response]:
+    """Send ``data`` on one connection and parse every response to it"""
+
+    async def run() -> bytes:
+        api = FlightAPI(db_path, 4)
+        with api.pool.connection() as conn:
+            migrate(conn)
+            conn.commit()
+        server = await api.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(data)
+            await writer.drain()
+            received = await asyncio.wait_for(reader.read(), 10)
+            writer.close()
+            return received
+        finally:
+            server.close()
+            await api.close_connections()
+            await server.wait_closed()
+            api.close()
+
+    return _parse(asyncio.run(run()))
+
+
+def test_pipelined_requests_are_answered_in_order(tmp_path):
+    airport = {"code": "HKG", "name": "Hong Kong", "address": "Chek Lap Kok"}
+    data = b"".join(
+        [
+            _request("POST", "/airports", airport),
+            _request("GET", "/airports/HKG"),
+            _request("PATCH", "/airports/HKG", {"name": "Hong Kong International"}),
+            _request("GET", "/airports/HKG"),
+            _request("GET", "/airports/LHR"),
+            _request("GET", "/airports", close=True),
+        ]
+    )
+
+    responses = _exchange(str(tmp_path / "airline.db"), data)
+
+    assert [status for status, _ in responses] == [201, 200, 200, 200, 404, 200]
+    assert responses[1][1]["name"] == "Hong Kong"
+    # Each read sees the writes sent before it.
+    assert responses[3][1]["name"] == "Hong Kong International"
+    assert [record["code"] for record in responses[5][1]] == ["HKG"]
+
+
+def _bad_length(tmp_path, length: str) -> List[Response]:
+    data = b"".join(
+        [
+            _request("GET", "/airports"),
+            f"POST /airports HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode(),
+            _request("GET", "/airports"),
+        ]
+    )
+    return _exchange(str(tmp_path / "airline.db"), data)
+
+
+def test_invalid_content_length_is_rejected(tmp_path):
+    for length in ["-1", "twelve"]:
+        responses = _bad_length(tmp_path, length)
+
+        # The connection closes after the error, so the last request is dropped.
+        assert [status for status, _ in responses] == [200, 400]
+        assert responses[1][1] == {"error": "invalid Content-Length"}
+
+
+def test_oversized_body_is_rejected_without_reading_it(tmp_path):
+    responses = _bad_length(tmp_path, str(MAX_BODY_BYTES + 1))
+
+    assert [status for status, _ in responses] == [200, 413]
+    assert responses[1][1] == {"error": "request body is too large"}
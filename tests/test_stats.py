@@ -0,0 +1,124 @@
+import random
+import sqlite3
+from datetime import timedelta
+from typing import List, Set
+
+from conftest import NOW
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.bulk import import_flights
+from flight_manager.models.flight import Flight, FlightStatus
+from flight_manager.models.stats import LATE_AFTER
+
+CODES = ["HKG", "LHR", "SIN"]
+COMPANIES = ["Cathay", "British Airways", "Qantas"]
+
+_COMPANY_STATS = """
+    SELECT company, flights, departed, delayed_departures, departure_delay,
+        arrived, delayed_arrivals
+    FROM company_stats WHERE flights != 0
+"""
+
+_COMPANY_GROUPS = f"""
+    SELECT company, COUNT(*),
+        COUNT(departure_time),
+        SUM(IFNULL(departure_time - scheduled_departure_time > {LATE_AFTER}, 0)),
+        SUM(IFNULL(MAX(departure_time - scheduled_departure_time, 0), 0)),
+        COUNT(arrival_time),
+        SUM(IFNULL(arrival_time - estimated_arrival_time > {LATE_AFTER}, 0))
+    FROM flights GROUP BY company
+"""
+
+_AIRPORT_STATS = """
+    SELECT airport_code, day, status, departures, arrivals
+    FROM airport_day_stats WHERE departures != 0 OR arrivals != 0
+"""
+
+_AIRPORT_GROUPS = """
+    SELECT airport_code, day, status, SUM(departures), SUM(arrivals)
+    FROM (
+        SELECT origin_airport_code AS airport_code,
+            scheduled_departure_time / 86400 AS day, status,
+            1 AS departures, 0 AS arrivals
+        FROM flights
+        UNION ALL
+        SELECT destination_airport_code, estimated_arrival_time / 86400, status, 0, 1
+        FROM flights
+    )
+    GROUP BY airport_code, day, status
+"""
+
+
+def _rows(conn: sqlite3.Connection, query: str) -> Set[tuple]:
+    return set(conn.execute(query).fetchall())
+
+
+def _assert_stats_match(conn: sqlite3.Connection) -> None:
+    assert _rows(conn, _COMPANY_STATS) == _rows(conn, _COMPANY_GROUPS)
+    assert _rows(conn, _AIRPORT_STATS) == _rows(conn, _AIRPORT_GROUPS)
+
+
+def _create(conn: sqlite3.Connection, rng: random.Random, count: int) -> List[Flight]:
+    airports = {
+        code: Airport.create(conn, code, code, "Somewhere", AirportStatus.ALL_CLEAR)
+        for code in CODES
+    }
+    flights = []
+    for i in range(count):
+        origin, destination = rng.sample(CODES, 2)
+        departure = NOW + timedelta(minutes=rng.randrange(5 * 24 * 60))
+        flights.append(
+            Flight.create(
+                conn,
+                f"CX{i}",
+                airports[origin],
+                airports[destination],
+                departure,
+                departure + timedelta(hours=rng.randint(1, 20)),
+                rng.choice(COMPANIES),
+            )
+        )
+    return flights
+
+
+def test_stats_follow_inserts_updates_and_deletes(conn):
+    rng = random.Random(0)
+    flights = _create(conn, rng, 60)
+    _assert_stats_match(conn)
+
+    for flight in flights[:40]:
+        late = timedelta(minutes=rng.choice([0, 5, 16, 90]))
+        flight.record_departure(conn, flight.scheduled_departure_time + late)
+    for flight in flights[:25]:
+        late = timedelta(minutes=rng.choice([-10, 0, 20]))
+        flight.record_arrival(conn, flight.estimated_arrival_time + late)
+    for flight in flights[40:50]:
+        flight.company = rng.choice(COMPANIES)
+        flight.scheduled_departure_time += timedelta(days=1)
+        flight.estimated_arrival_time += timedelta(days=1)
+        flight.status = FlightStatus.DELAYED
+        flight.save(conn)
+    _assert_stats_match(conn)
+
+    for flight in flights[::3]:
+        flight.delete(conn)
+    _assert_stats_match(conn)
+
+
+def test_stats_count_bulk_imported_flights(conn):
+    _create(conn, random.Random(1), 10)
+    records = [
+        {
+            "flight_number": f"BA{i}",
+            "origin_airport_code": "LHR",
+            "destination_airport_code": "HKG",
+            "scheduled_departure_time": f"2025-06-1{i}T08:00:00",
+            "estimated_arrival_time": f"2025-06-1{i}T20:00:00",
+            "departure_time": f"2025-06-1{i}T08:{i * 10:02d}:00",
+            "status": "in_flight",
+            "company": "British Airways",
+        }
+        for i in range(5)
+    ]
+
+    assert import_flights(conn, records).inserted == 5
+    _assert_stats_match(conn)
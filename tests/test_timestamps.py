@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conftest import NOW, make_flight
+from flight_manager.models.flight import Flight
+from flight_manager.models.timestamps import from_epoch, to_epoch
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        datetime(1970, 1, 1),
+        datetime(2025, 6, 10, 12, 0),
+        datetime(2025, 12, 31, 23, 59, 59),
+        datetime(1969, 7, 20, 20, 17, 40),
+    ],
+)
+def test_epoch_round_trip(value):
+    assert from_epoch(to_epoch(value)) == value
+
+
+def test_aware_datetimes_are_stored_as_utc():
+    hong_kong = timezone(timedelta(hours=8))
+    value = datetime(2025, 6, 10, 20, 0, tzinfo=hong_kong)
+
+    assert to_epoch(value) == to_epoch(datetime(2025, 6, 10, 12, 0))
+
+
+def test_stored_values_pass_through():
+    assert to_epoch(1749556800) == 1749556800
+    assert to_epoch("2025-06-10T12:00:00") == to_epoch(NOW)
+    assert from_epoch("2025-06-10 12:00:00") == NOW
+    assert to_epoch(None) is None and from_epoch(None) is None
+
+
+def test_loaded_flight_converts_timestamps_on_first_read(conn, airports):
+    flight = make_flight(conn, airports, timedelta(hours=2))
+
+    loaded = Flight.get_by_id(conn, flight.flight_id)
+
+    # Still the stored epoch value until read.
+    assert loaded.__dict__["scheduled_departure_time"] == to_epoch(
+        NOW + timedelta(hours=2)
+    )
+    assert loaded.scheduled_departure_time == NOW + timedelta(hours=2)
+    assert loaded.__dict__["scheduled_departure_time"] == NOW + timedelta(hours=2)
+    assert loaded.departure_time is None
+    assert loaded.changed_columns() == {}
@@ -0,0 +1,124 @@
+import sqlite3
+from datetime import timedelta
+from typing import List, Tuple
+
+import pytest
+
+from conftest import NOW, make_flight
+from flight_manager.models.airports import Airport, AirportStatus
+from flight_manager.models.closures import delay_flights_at
+from flight_manager.models.flight import Flight, FlightStatus, InvalidTransitionError
+from flight_manager.models.timestamps import to_epoch
+from flight_manager.models.transitions import sweep
+
+
+def _status(conn: sqlite3.Connection, flight: Flight) -> FlightStatus:
+    row = conn.execute(
+        "SELECT status FROM flights WHERE flight_id = ?", (flight.flight_id,)
+    ).fetchone()
+    return FlightStatus(row[0])
+
+
+def _logged_statuses(conn: sqlite3.Connection, flight: Flight) -> List[FlightStatus]:
+    rows = conn.execute(
+        "SELECT status FROM flight_changes WHERE flight_id = ? ORDER BY seq",
+        (flight.flight_id,),
+    )
+    return [FlightStatus(row[0]) for row in rows]
+
+
+def test_invalid_transition_is_refused(conn, airports):
+    flight = make_flight(conn, airports, timedelta(hours=2))
+    flight.status = FlightStatus.ARRIVED
+    with pytest.raises(InvalidTransitionError):
+        flight.save(conn)
+    assert _status(conn, flight) is FlightStatus.PENDING
+
+
+def test_missed_departure_stays_delayed(conn, airports):
+    flight = make_flight(conn, airports, -timedelta(hours=1))
+    assert sweep(conn, NOW).counts["delay_missed_departures"] == 1
+    assert sweep(conn, NOW + timedelta(minutes=5)).total == 0
+    assert _status(conn, flight) is FlightStatus.DELAYED
+
+
+def test_delayed_flight_departs_once_departure_is_recorded(conn, airports):
+    flight = make_flight(conn, airports, -timedelta(hours=1))
+    sweep(conn, NOW)
+    conn.execute(
+        "UPDATE flights SET departure_time = ? WHERE flight_id = ?",
+        (to_epoch(NOW - timedelta(minutes=5)), flight.flight_id),
+    )
+
+    result = sweep(conn, NOW)
+
+    assert result.counts["resume_boarding"] == 1
+    assert result.counts["depart"] == 1
+    assert _status(conn, flight) is FlightStatus.IN_FLIGHT
+
+
+def test_closure_delay_boards_again_after_the_airport_reopens(
+    conn, airports: Tuple[Airport, Airport]
+):
+    flight = make_flight(conn, airports, timedelta(hours=2))
+    origin = airports[0]
+    origin.status = AirportStatus.CLOSED
+    origin.update(conn)
+    # update delays the flights departing from the real now on.
+    assert delay_flights_at(conn, "HKG", NOW).delayed == 1
+
+    later = NOW + timedelta(hours=1, minutes=45)
+    assert sweep(conn, later).total == 0
+    assert _status(conn, flight) is FlightStatus.DELAYED
+
+    origin.status = AirportStatus.ALL_CLEAR
+    origin.update(conn)
+    assert sweep(conn, later).counts["resume_boarding"] == 1
+    assert _status(conn, flight) is FlightStatus.BOARDING
+
+
+def test_manual_delay_is_not_lifted_by_the_sweep(conn, airports):
+    flight = make_flight(conn, airports, timedelta(hours=2))
+    flight.status = FlightStatus.DELAYED
+    flight.save(conn)
+
+    later = NOW + timedelta(hours=1, minutes=45)
+    assert sweep(conn, later).counts["resume_boarding"] == 0
+    assert _status(conn, flight) is FlightStatus.DELAYED
+
+
+def test_closure_delay_is_forgotten_once_the_flight_leaves_delayed(conn, airports):
+    flight = make_flight(conn, airports, timedelta(hours=2))
+    delay_flights_at(conn, "HKG", NOW)
+    flight = Flight.get_by_id(conn, flight.flight_id)
+    flight.status = FlightStatus.PENDING
+    flight.save(conn)
+    # Delayed again by the operator, this time for another reason.
+    flight.status = FlightStatus.DELAYED
+    flight.save(conn)
+
+    assert conn.execute("SELECT COUNT(*) FROM closure_delays").fetchone() == (0,)
+    assert sweep(conn, NOW + timedelta(hours=1, minutes=45)).total == 0
+    assert _status(conn, flight) is FlightStatus.DELAYED
+
+
+@pytest.mark.parametrize("status", [FlightStatus.PENDING, FlightStatus.DELAYED])
+def test_record_departure_boards_first(conn, airports, status):
+    flight = make_flight(conn, airports, timedelta(minutes=10), status)
+
+    flight.record_departure(conn, NOW)
+
+    assert _status(conn, flight) is FlightStatus.IN_FLIGHT
+    assert _logged_statuses(conn, flight)[-2:] == [
+        FlightStatus.BOARDING,
+        FlightStatus.IN_FLIGHT,
+    ]
+
+
+def test_record_departure_refuses_a_landed_flight(conn, airports):
+    flight = make_flight(conn, airports, timedelta(minutes=10), FlightStatus.BOARDING)
+    flight.record_departure(conn, NOW)
+    flight.record_arrival(conn, NOW + timedelta(hours=12))
+
+    with pytest.raises(InvalidTransitionError):
+        flight.record_departure(conn, NOW)